@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import logging
+from time import monotonic
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -11,18 +13,39 @@ if TYPE_CHECKING:
 
 PLATFORMS = ("sensor", "switch", "select")
 
+_LOGGER = logging.getLogger(__name__)
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Energy Control Pro from a config entry."""
+    """Set up Energy Control Pro from a config entry.
+
+    Setup does not wait for data: entities start from their restored state and
+    the first refresh runs in the background, so an input entity that is not
+    ready at boot neither fails nor delays Home Assistant startup.
+    """
+    started = monotonic()
+    from .const import DATA_HUB
     from .coordinator import EnergyControlProCoordinator
+    from .hub import EnergyControlProHub
 
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     coordinator = EnergyControlProCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(coordinator.async_cancel_eligibility_wakeup)
+    if (unsub_fast_path := coordinator.async_start_fast_path()) is not None:
+        entry.async_on_unload(unsub_fast_path)
+    if (hub := hass.data.get(DATA_HUB)) is None:
+        hub = hass.data[DATA_HUB] = EnergyControlProHub(hass)
+    entry.async_on_unload(coordinator.async_attach_arbiter(hub.arbiter))
+    entry.async_on_unload(hub.async_register(coordinator))
 
     hass.data.setdefault(entry.domain, {})[entry.entry_id] = coordinator
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_create_background_task(
+        hass, coordinator.async_start(), f"{entry.domain} first refresh {entry.entry_id}"
+    )
+    coordinator.startup_timings["setup_s"] = round(monotonic() - started, 3)
+    _LOGGER.debug("Setup took %.3f s", coordinator.startup_timings["setup_s"])
     return True
 
 
@@ -13,43 +13,102 @@ from homeassistant.core import callback
 from homeassistant.helpers import selector
 
 from .const import (
+    CONF_BATTERY_POWER_ENTITY,
+    CONF_BATTERY_SOC_ENTITY,
+    CONF_BATTERY_SOC_TARGET_PCT,
+    CONF_CONSTRAINT_GROUPS,
+    CONF_CONTINUOUS_LOAD_DEADBAND_W,
+    CONF_CONTINUOUS_LOAD_ENTITY,
+    CONF_CONTINUOUS_LOAD_MAX_POWER_W,
+    CONF_CONTINUOUS_LOAD_MIN_POWER_W,
+    CONF_CONTINUOUS_LOAD_RATE_LIMIT_S,
+    CONF_CONTINUOUS_LOAD_STEP_W,
+    CONF_CONTINUOUS_LOAD_W_PER_UNIT,
+    CONF_CURTAILMENT_ENTITY,
     CONF_DURATION_THRESHOLD_MIN,
+    CONF_EXPORT_LIMIT_ENABLED,
+    CONF_EXPORT_LIMIT_W,
+    CONF_EXPORT_PRICE_ENTITY,
     CONF_EXPORT_THRESHOLD_W,
+    CONF_FORECAST_HORIZON_MIN,
+    CONF_IMPORT_LIMIT_W,
+    CONF_IMPORT_PRICE_ENTITY,
     CONF_IMPORT_THRESHOLD_W,
     CONF_LOAD_1_COOLDOWN_MIN,
+    CONF_LOAD_1_DEADLINE,
     CONF_LOAD_1_ENTITY,
     CONF_LOAD_1_MIN_ON_TIME_MIN,
     CONF_LOAD_1_MIN_SURPLUS_W,
+    CONF_LOAD_1_POWER_ENTITY,
     CONF_LOAD_1_PRIORITY,
+    CONF_LOAD_1_REQUIRED_RUNTIME_MIN,
     CONF_LOAD_2_COOLDOWN_MIN,
+    CONF_LOAD_2_DEADLINE,
     CONF_LOAD_2_ENTITY,
     CONF_LOAD_2_MIN_ON_TIME_MIN,
     CONF_LOAD_2_MIN_SURPLUS_W,
+    CONF_LOAD_2_POWER_ENTITY,
     CONF_LOAD_2_PRIORITY,
+    CONF_LOAD_2_REQUIRED_RUNTIME_MIN,
     CONF_LOAD_3_COOLDOWN_MIN,
+    CONF_LOAD_3_DEADLINE,
     CONF_LOAD_3_ENTITY,
     CONF_LOAD_3_MIN_ON_TIME_MIN,
     CONF_LOAD_3_MIN_SURPLUS_W,
+    CONF_LOAD_3_POWER_ENTITY,
     CONF_LOAD_3_PRIORITY,
+    CONF_LOAD_3_REQUIRED_RUNTIME_MIN,
     CONF_LOAD_POWER_ENTITY,
     CONF_OPTIMIZATION_ENABLED,
+    CONF_PRICE_LOOKAHEAD_H,
     CONF_PROFILE,
+    CONF_SAFETY_MIN_ON_S,
+    CONF_SHADOW_MODE,
     CONF_SIMULATION,
+    CONF_SOLAR_FORECAST_ENTITY,
     CONF_SOLAR_POWER_ENTITY,
     CONF_STRATEGY,
+    CONF_THERMAL_LOAD_BOOST_TEMP_C,
+    CONF_THERMAL_LOAD_ENTITY,
+    CONF_THERMAL_LOAD_NORMAL_TEMP_C,
+    CONF_THERMAL_LOAD_POWER_W,
+    CONF_THERMAL_LOAD_RATE_LIMIT_S,
+    CONF_THERMAL_LOAD_VOLUME_L,
+    DEFAULT_BATTERY_SOC_TARGET_PCT,
+    DEFAULT_CONTINUOUS_LOAD_DEADBAND_W,
+    DEFAULT_CONTINUOUS_LOAD_MAX_POWER_W,
+    DEFAULT_CONTINUOUS_LOAD_MIN_POWER_W,
+    DEFAULT_CONTINUOUS_LOAD_RATE_LIMIT_S,
+    DEFAULT_CONTINUOUS_LOAD_STEP_W,
+    DEFAULT_CONTINUOUS_LOAD_W_PER_UNIT,
     DEFAULT_DURATION_THRESHOLD_MIN,
+    DEFAULT_EXPORT_LIMIT_ENABLED,
+    DEFAULT_EXPORT_LIMIT_W,
     DEFAULT_EXPORT_THRESHOLD_W,
+    DEFAULT_FORECAST_HORIZON_MIN,
+    DEFAULT_IMPORT_LIMIT_W,
     DEFAULT_LOAD_COOLDOWN_MIN,
+    DEFAULT_LOAD_DEADLINE,
     DEFAULT_LOAD_MIN_ON_TIME_MIN,
     DEFAULT_LOAD_MIN_SURPLUS_W,
     DEFAULT_IMPORT_THRESHOLD_W,
+    DEFAULT_LOAD_REQUIRED_RUNTIME_MIN,
     DEFAULT_OPTIMIZATION_ENABLED,
+    DEFAULT_PRICE_LOOKAHEAD_H,
+    DEFAULT_SAFETY_MIN_ON_S,
+    DEFAULT_SHADOW_MODE,
     DEFAULT_STRATEGY,
+    DEFAULT_THERMAL_LOAD_BOOST_TEMP_C,
+    DEFAULT_THERMAL_LOAD_NORMAL_TEMP_C,
+    DEFAULT_THERMAL_LOAD_POWER_W,
+    DEFAULT_THERMAL_LOAD_RATE_LIMIT_S,
+    DEFAULT_THERMAL_LOAD_VOLUME_L,
     DOMAIN,
     PROFILE_SUNNY_DAY,
     PROFILES,
     STRATEGIES,
 )
+from .optimization.constraints import parse_constraint_groups
 
 DEFAULT_PROFILE = PROFILE_SUNNY_DAY
 
@@ -73,9 +132,26 @@ def _sanitize_user_input(user_input: dict[str, Any]) -> dict[str, Any]:
     cleaned[CONF_LOAD_POWER_ENTITY] = _normalize_entity_value(
         cleaned.get(CONF_LOAD_POWER_ENTITY)
     )
+    cleaned[CONF_BATTERY_POWER_ENTITY] = _normalize_entity_value(
+        cleaned.get(CONF_BATTERY_POWER_ENTITY)
+    )
+    cleaned[CONF_BATTERY_SOC_ENTITY] = _normalize_entity_value(
+        cleaned.get(CONF_BATTERY_SOC_ENTITY)
+    )
     cleaned[CONF_LOAD_1_ENTITY] = _normalize_entity_value(cleaned.get(CONF_LOAD_1_ENTITY))
     cleaned[CONF_LOAD_2_ENTITY] = _normalize_entity_value(cleaned.get(CONF_LOAD_2_ENTITY))
     cleaned[CONF_LOAD_3_ENTITY] = _normalize_entity_value(cleaned.get(CONF_LOAD_3_ENTITY))
+    cleaned[CONF_LOAD_1_POWER_ENTITY] = _normalize_entity_value(cleaned.get(CONF_LOAD_1_POWER_ENTITY))
+    cleaned[CONF_LOAD_2_POWER_ENTITY] = _normalize_entity_value(cleaned.get(CONF_LOAD_2_POWER_ENTITY))
+    cleaned[CONF_LOAD_3_POWER_ENTITY] = _normalize_entity_value(cleaned.get(CONF_LOAD_3_POWER_ENTITY))
+    cleaned[CONF_THERMAL_LOAD_ENTITY] = _normalize_entity_value(cleaned.get(CONF_THERMAL_LOAD_ENTITY))
+    cleaned[CONF_EXPORT_PRICE_ENTITY] = _normalize_entity_value(cleaned.get(CONF_EXPORT_PRICE_ENTITY))
+    cleaned[CONF_IMPORT_PRICE_ENTITY] = _normalize_entity_value(cleaned.get(CONF_IMPORT_PRICE_ENTITY))
+    cleaned[CONF_SOLAR_FORECAST_ENTITY] = _normalize_entity_value(cleaned.get(CONF_SOLAR_FORECAST_ENTITY))
+    cleaned[CONF_CURTAILMENT_ENTITY] = _normalize_entity_value(cleaned.get(CONF_CURTAILMENT_ENTITY))
+    cleaned[CONF_CONTINUOUS_LOAD_ENTITY] = _normalize_entity_value(
+        cleaned.get(CONF_CONTINUOUS_LOAD_ENTITY)
+    )
     return cleaned
 
 
@@ -99,12 +175,18 @@ class EnergyControlProConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             if _real_mode_missing_entities(cleaned_input):
                 errors["base"] = "real_entities_required"
             else:
-                validation_error = _validate_real_mode_entities(self.hass, cleaned_input)
+                validation_error = _validate_real_mode_entities(
+                    self.hass, cleaned_input
+                ) or _validate_constraint_groups(cleaned_input) or _validate_thermal_load(cleaned_input)
                 if validation_error:
                     errors["base"] = validation_error
                 else:
-                    await self.async_set_unique_id(DOMAIN)
-                    self._abort_if_unique_id_configured()
+                    if not cleaned_input.get(CONF_SIMULATION, True):
+                        # One entry per site: the same meters cannot be configured twice.
+                        await self.async_set_unique_id(
+                            f"{cleaned_input[CONF_SOLAR_POWER_ENTITY]}_{cleaned_input[CONF_LOAD_POWER_ENTITY]}"
+                        )
+                        self._abort_if_unique_id_configured()
                     return self.async_create_entry(
                         title="Energy Control Pro",
                         data={},
@@ -116,6 +198,9 @@ class EnergyControlProConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             profile_default=DEFAULT_PROFILE,
             solar_entity_default=None,
             load_entity_default=None,
+            battery_power_entity_default=None,
+            battery_soc_entity_default=None,
+            battery_soc_target_pct_default=DEFAULT_BATTERY_SOC_TARGET_PCT,
             import_threshold_w_default=DEFAULT_IMPORT_THRESHOLD_W,
             export_threshold_w_default=DEFAULT_EXPORT_THRESHOLD_W,
             duration_threshold_min_default=DEFAULT_DURATION_THRESHOLD_MIN,
@@ -136,6 +221,40 @@ class EnergyControlProConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             load_3_min_on_time_min_default=DEFAULT_LOAD_MIN_ON_TIME_MIN,
             load_3_cooldown_min_default=DEFAULT_LOAD_COOLDOWN_MIN,
             load_3_priority_default=3,
+            continuous_load_entity_default=None,
+            continuous_load_min_power_w_default=DEFAULT_CONTINUOUS_LOAD_MIN_POWER_W,
+            continuous_load_max_power_w_default=DEFAULT_CONTINUOUS_LOAD_MAX_POWER_W,
+            continuous_load_step_w_default=DEFAULT_CONTINUOUS_LOAD_STEP_W,
+            continuous_load_deadband_w_default=DEFAULT_CONTINUOUS_LOAD_DEADBAND_W,
+            continuous_load_rate_limit_s_default=DEFAULT_CONTINUOUS_LOAD_RATE_LIMIT_S,
+            continuous_load_w_per_unit_default=DEFAULT_CONTINUOUS_LOAD_W_PER_UNIT,
+            import_limit_w_default=DEFAULT_IMPORT_LIMIT_W,
+            safety_min_on_s_default=DEFAULT_SAFETY_MIN_ON_S,
+            export_limit_enabled_default=DEFAULT_EXPORT_LIMIT_ENABLED,
+            export_limit_w_default=DEFAULT_EXPORT_LIMIT_W,
+            curtailment_entity_default=None,
+            solar_forecast_entity_default=None,
+            forecast_horizon_min_default=DEFAULT_FORECAST_HORIZON_MIN,
+            load_1_required_runtime_min_default=DEFAULT_LOAD_REQUIRED_RUNTIME_MIN,
+            load_1_deadline_default=DEFAULT_LOAD_DEADLINE,
+            load_2_required_runtime_min_default=DEFAULT_LOAD_REQUIRED_RUNTIME_MIN,
+            load_2_deadline_default=DEFAULT_LOAD_DEADLINE,
+            load_3_required_runtime_min_default=DEFAULT_LOAD_REQUIRED_RUNTIME_MIN,
+            load_3_deadline_default=DEFAULT_LOAD_DEADLINE,
+            import_price_entity_default=None,
+            export_price_entity_default=None,
+            price_lookahead_h_default=DEFAULT_PRICE_LOOKAHEAD_H,
+            shadow_mode_default=DEFAULT_SHADOW_MODE,
+            load_1_power_entity_default=None,
+            load_2_power_entity_default=None,
+            load_3_power_entity_default=None,
+            constraint_groups_default="",
+            thermal_load_entity_default=None,
+            thermal_load_normal_temp_c_default=DEFAULT_THERMAL_LOAD_NORMAL_TEMP_C,
+            thermal_load_boost_temp_c_default=DEFAULT_THERMAL_LOAD_BOOST_TEMP_C,
+            thermal_load_power_w_default=DEFAULT_THERMAL_LOAD_POWER_W,
+            thermal_load_volume_l_default=DEFAULT_THERMAL_LOAD_VOLUME_L,
+            thermal_load_rate_limit_s_default=DEFAULT_THERMAL_LOAD_RATE_LIMIT_S,
         )
         return self.async_show_form(step_id="user", data_schema=schema, errors=errors)
 
@@ -156,7 +275,9 @@ class EnergyControlProOptionsFlowHandler(config_entries.OptionsFlow):
             if _real_mode_missing_entities(cleaned_input):
                 errors["base"] = "real_entities_required"
             else:
-                validation_error = _validate_real_mode_entities(self.hass, cleaned_input)
+                validation_error = _validate_real_mode_entities(
+                    self.hass, cleaned_input
+                ) or _validate_constraint_groups(cleaned_input) or _validate_thermal_load(cleaned_input)
                 if validation_error:
                     errors["base"] = validation_error
                 else:
@@ -178,6 +299,20 @@ class EnergyControlProOptionsFlowHandler(config_entries.OptionsFlow):
             CONF_LOAD_POWER_ENTITY,
             self._config_entry.data.get(CONF_LOAD_POWER_ENTITY),
         ))
+        battery_power_entity_default = _normalize_entity_value(self._config_entry.options.get(
+            CONF_BATTERY_POWER_ENTITY,
+            self._config_entry.data.get(CONF_BATTERY_POWER_ENTITY),
+        ))
+        battery_soc_entity_default = _normalize_entity_value(self._config_entry.options.get(
+            CONF_BATTERY_SOC_ENTITY,
+            self._config_entry.data.get(CONF_BATTERY_SOC_ENTITY),
+        ))
+        battery_soc_target_pct_default = int(
+            self._config_entry.options.get(
+                CONF_BATTERY_SOC_TARGET_PCT,
+                self._config_entry.data.get(CONF_BATTERY_SOC_TARGET_PCT, DEFAULT_BATTERY_SOC_TARGET_PCT),
+            )
+        )
         import_threshold_w_default = int(
             self._config_entry.options.get(
                 CONF_IMPORT_THRESHOLD_W,
@@ -293,11 +428,210 @@ class EnergyControlProOptionsFlowHandler(config_entries.OptionsFlow):
             )
         )
 
+        continuous_load_entity_default = _normalize_entity_value(self._config_entry.options.get(
+            CONF_CONTINUOUS_LOAD_ENTITY,
+            self._config_entry.data.get(CONF_CONTINUOUS_LOAD_ENTITY),
+        ))
+        continuous_load_min_power_w_default = int(
+            self._config_entry.options.get(
+                CONF_CONTINUOUS_LOAD_MIN_POWER_W,
+                self._config_entry.data.get(CONF_CONTINUOUS_LOAD_MIN_POWER_W, DEFAULT_CONTINUOUS_LOAD_MIN_POWER_W),
+            )
+        )
+        continuous_load_max_power_w_default = int(
+            self._config_entry.options.get(
+                CONF_CONTINUOUS_LOAD_MAX_POWER_W,
+                self._config_entry.data.get(CONF_CONTINUOUS_LOAD_MAX_POWER_W, DEFAULT_CONTINUOUS_LOAD_MAX_POWER_W),
+            )
+        )
+        continuous_load_step_w_default = int(
+            self._config_entry.options.get(
+                CONF_CONTINUOUS_LOAD_STEP_W,
+                self._config_entry.data.get(CONF_CONTINUOUS_LOAD_STEP_W, DEFAULT_CONTINUOUS_LOAD_STEP_W),
+            )
+        )
+        continuous_load_deadband_w_default = int(
+            self._config_entry.options.get(
+                CONF_CONTINUOUS_LOAD_DEADBAND_W,
+                self._config_entry.data.get(CONF_CONTINUOUS_LOAD_DEADBAND_W, DEFAULT_CONTINUOUS_LOAD_DEADBAND_W),
+            )
+        )
+        continuous_load_rate_limit_s_default = int(
+            self._config_entry.options.get(
+                CONF_CONTINUOUS_LOAD_RATE_LIMIT_S,
+                self._config_entry.data.get(CONF_CONTINUOUS_LOAD_RATE_LIMIT_S, DEFAULT_CONTINUOUS_LOAD_RATE_LIMIT_S),
+            )
+        )
+        continuous_load_w_per_unit_default = int(
+            self._config_entry.options.get(
+                CONF_CONTINUOUS_LOAD_W_PER_UNIT,
+                self._config_entry.data.get(CONF_CONTINUOUS_LOAD_W_PER_UNIT, DEFAULT_CONTINUOUS_LOAD_W_PER_UNIT),
+            )
+        )
+
+        import_limit_w_default = int(
+            self._config_entry.options.get(
+                CONF_IMPORT_LIMIT_W,
+                self._config_entry.data.get(CONF_IMPORT_LIMIT_W, DEFAULT_IMPORT_LIMIT_W),
+            )
+        )
+        safety_min_on_s_default = int(
+            self._config_entry.options.get(
+                CONF_SAFETY_MIN_ON_S,
+                self._config_entry.data.get(CONF_SAFETY_MIN_ON_S, DEFAULT_SAFETY_MIN_ON_S),
+            )
+        )
+
+        export_limit_enabled_default = bool(
+            self._config_entry.options.get(
+                CONF_EXPORT_LIMIT_ENABLED,
+                self._config_entry.data.get(CONF_EXPORT_LIMIT_ENABLED, DEFAULT_EXPORT_LIMIT_ENABLED),
+            )
+        )
+        export_limit_w_default = int(
+            self._config_entry.options.get(
+                CONF_EXPORT_LIMIT_W,
+                self._config_entry.data.get(CONF_EXPORT_LIMIT_W, DEFAULT_EXPORT_LIMIT_W),
+            )
+        )
+        curtailment_entity_default = _normalize_entity_value(self._config_entry.options.get(
+            CONF_CURTAILMENT_ENTITY,
+            self._config_entry.data.get(CONF_CURTAILMENT_ENTITY),
+        ))
+
+        solar_forecast_entity_default = _normalize_entity_value(self._config_entry.options.get(
+            CONF_SOLAR_FORECAST_ENTITY,
+            self._config_entry.data.get(CONF_SOLAR_FORECAST_ENTITY),
+        ))
+        forecast_horizon_min_default = int(
+            self._config_entry.options.get(
+                CONF_FORECAST_HORIZON_MIN,
+                self._config_entry.data.get(CONF_FORECAST_HORIZON_MIN, DEFAULT_FORECAST_HORIZON_MIN),
+            )
+        )
+
+        load_1_required_runtime_min_default = int(
+            self._config_entry.options.get(
+                CONF_LOAD_1_REQUIRED_RUNTIME_MIN,
+                self._config_entry.data.get(CONF_LOAD_1_REQUIRED_RUNTIME_MIN, DEFAULT_LOAD_REQUIRED_RUNTIME_MIN),
+            )
+        )
+        load_1_deadline_default = str(
+            self._config_entry.options.get(
+                CONF_LOAD_1_DEADLINE,
+                self._config_entry.data.get(CONF_LOAD_1_DEADLINE, DEFAULT_LOAD_DEADLINE),
+            )
+        )
+        load_2_required_runtime_min_default = int(
+            self._config_entry.options.get(
+                CONF_LOAD_2_REQUIRED_RUNTIME_MIN,
+                self._config_entry.data.get(CONF_LOAD_2_REQUIRED_RUNTIME_MIN, DEFAULT_LOAD_REQUIRED_RUNTIME_MIN),
+            )
+        )
+        load_2_deadline_default = str(
+            self._config_entry.options.get(
+                CONF_LOAD_2_DEADLINE,
+                self._config_entry.data.get(CONF_LOAD_2_DEADLINE, DEFAULT_LOAD_DEADLINE),
+            )
+        )
+        load_3_required_runtime_min_default = int(
+            self._config_entry.options.get(
+                CONF_LOAD_3_REQUIRED_RUNTIME_MIN,
+                self._config_entry.data.get(CONF_LOAD_3_REQUIRED_RUNTIME_MIN, DEFAULT_LOAD_REQUIRED_RUNTIME_MIN),
+            )
+        )
+        load_3_deadline_default = str(
+            self._config_entry.options.get(
+                CONF_LOAD_3_DEADLINE,
+                self._config_entry.data.get(CONF_LOAD_3_DEADLINE, DEFAULT_LOAD_DEADLINE),
+            )
+        )
+
+        import_price_entity_default = _normalize_entity_value(self._config_entry.options.get(
+            CONF_IMPORT_PRICE_ENTITY,
+            self._config_entry.data.get(CONF_IMPORT_PRICE_ENTITY),
+        ))
+        export_price_entity_default = _normalize_entity_value(self._config_entry.options.get(
+            CONF_EXPORT_PRICE_ENTITY,
+            self._config_entry.data.get(CONF_EXPORT_PRICE_ENTITY),
+        ))
+        price_lookahead_h_default = int(
+            self._config_entry.options.get(
+                CONF_PRICE_LOOKAHEAD_H,
+                self._config_entry.data.get(CONF_PRICE_LOOKAHEAD_H, DEFAULT_PRICE_LOOKAHEAD_H),
+            )
+        )
+
+        shadow_mode_default = bool(
+            self._config_entry.options.get(
+                CONF_SHADOW_MODE,
+                self._config_entry.data.get(CONF_SHADOW_MODE, DEFAULT_SHADOW_MODE),
+            )
+        )
+
+        load_1_power_entity_default = _normalize_entity_value(self._config_entry.options.get(
+            CONF_LOAD_1_POWER_ENTITY,
+            self._config_entry.data.get(CONF_LOAD_1_POWER_ENTITY),
+        ))
+        load_2_power_entity_default = _normalize_entity_value(self._config_entry.options.get(
+            CONF_LOAD_2_POWER_ENTITY,
+            self._config_entry.data.get(CONF_LOAD_2_POWER_ENTITY),
+        ))
+        load_3_power_entity_default = _normalize_entity_value(self._config_entry.options.get(
+            CONF_LOAD_3_POWER_ENTITY,
+            self._config_entry.data.get(CONF_LOAD_3_POWER_ENTITY),
+        ))
+
+        constraint_groups_default = str(
+            self._config_entry.options.get(
+                CONF_CONSTRAINT_GROUPS,
+                self._config_entry.data.get(CONF_CONSTRAINT_GROUPS, ""),
+            )
+        )
+
+        thermal_load_entity_default = _normalize_entity_value(self._config_entry.options.get(
+            CONF_THERMAL_LOAD_ENTITY,
+            self._config_entry.data.get(CONF_THERMAL_LOAD_ENTITY),
+        ))
+        thermal_load_normal_temp_c_default = int(
+            self._config_entry.options.get(
+                CONF_THERMAL_LOAD_NORMAL_TEMP_C,
+                self._config_entry.data.get(CONF_THERMAL_LOAD_NORMAL_TEMP_C, DEFAULT_THERMAL_LOAD_NORMAL_TEMP_C),
+            )
+        )
+        thermal_load_boost_temp_c_default = int(
+            self._config_entry.options.get(
+                CONF_THERMAL_LOAD_BOOST_TEMP_C,
+                self._config_entry.data.get(CONF_THERMAL_LOAD_BOOST_TEMP_C, DEFAULT_THERMAL_LOAD_BOOST_TEMP_C),
+            )
+        )
+        thermal_load_power_w_default = int(
+            self._config_entry.options.get(
+                CONF_THERMAL_LOAD_POWER_W,
+                self._config_entry.data.get(CONF_THERMAL_LOAD_POWER_W, DEFAULT_THERMAL_LOAD_POWER_W),
+            )
+        )
+        thermal_load_volume_l_default = int(
+            self._config_entry.options.get(
+                CONF_THERMAL_LOAD_VOLUME_L,
+                self._config_entry.data.get(CONF_THERMAL_LOAD_VOLUME_L, DEFAULT_THERMAL_LOAD_VOLUME_L),
+            )
+        )
+        thermal_load_rate_limit_s_default = int(
+            self._config_entry.options.get(
+                CONF_THERMAL_LOAD_RATE_LIMIT_S,
+                self._config_entry.data.get(CONF_THERMAL_LOAD_RATE_LIMIT_S, DEFAULT_THERMAL_LOAD_RATE_LIMIT_S),
+            )
+        )
+
         schema = _build_schema(
             simulation_default=bool(simulation_default),
             profile_default=str(profile_default),
             solar_entity_default=solar_entity_default,
             load_entity_default=load_entity_default,
+            battery_power_entity_default=battery_power_entity_default,
+            battery_soc_entity_default=battery_soc_entity_default,
+            battery_soc_target_pct_default=battery_soc_target_pct_default,
             import_threshold_w_default=import_threshold_w_default,
             export_threshold_w_default=export_threshold_w_default,
             duration_threshold_min_default=duration_threshold_min_default,
@@ -318,6 +652,40 @@ class EnergyControlProOptionsFlowHandler(config_entries.OptionsFlow):
             load_3_min_on_time_min_default=load_3_min_on_time_min_default,
             load_3_cooldown_min_default=load_3_cooldown_min_default,
             load_3_priority_default=load_3_priority_default,
+            continuous_load_entity_default=continuous_load_entity_default,
+            continuous_load_min_power_w_default=continuous_load_min_power_w_default,
+            continuous_load_max_power_w_default=continuous_load_max_power_w_default,
+            continuous_load_step_w_default=continuous_load_step_w_default,
+            continuous_load_deadband_w_default=continuous_load_deadband_w_default,
+            continuous_load_rate_limit_s_default=continuous_load_rate_limit_s_default,
+            continuous_load_w_per_unit_default=continuous_load_w_per_unit_default,
+            import_limit_w_default=import_limit_w_default,
+            safety_min_on_s_default=safety_min_on_s_default,
+            export_limit_enabled_default=export_limit_enabled_default,
+            export_limit_w_default=export_limit_w_default,
+            curtailment_entity_default=curtailment_entity_default,
+            solar_forecast_entity_default=solar_forecast_entity_default,
+            forecast_horizon_min_default=forecast_horizon_min_default,
+            load_1_required_runtime_min_default=load_1_required_runtime_min_default,
+            load_1_deadline_default=load_1_deadline_default,
+            load_2_required_runtime_min_default=load_2_required_runtime_min_default,
+            load_2_deadline_default=load_2_deadline_default,
+            load_3_required_runtime_min_default=load_3_required_runtime_min_default,
+            load_3_deadline_default=load_3_deadline_default,
+            import_price_entity_default=import_price_entity_default,
+            export_price_entity_default=export_price_entity_default,
+            price_lookahead_h_default=price_lookahead_h_default,
+            shadow_mode_default=shadow_mode_default,
+            load_1_power_entity_default=load_1_power_entity_default,
+            load_2_power_entity_default=load_2_power_entity_default,
+            load_3_power_entity_default=load_3_power_entity_default,
+            constraint_groups_default=constraint_groups_default,
+            thermal_load_entity_default=thermal_load_entity_default,
+            thermal_load_normal_temp_c_default=thermal_load_normal_temp_c_default,
+            thermal_load_boost_temp_c_default=thermal_load_boost_temp_c_default,
+            thermal_load_power_w_default=thermal_load_power_w_default,
+            thermal_load_volume_l_default=thermal_load_volume_l_default,
+            thermal_load_rate_limit_s_default=thermal_load_rate_limit_s_default,
         )
         return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
 
@@ -351,6 +719,38 @@ def _validate_real_mode_entities(hass: HomeAssistant, user_input: dict[str, Any]
         if unit and unit not in (UnitOfPower.WATT, UnitOfPower.KILO_WATT):
             return "real_entity_unit_not_w"
 
+    for key in (CONF_BATTERY_POWER_ENTITY, CONF_BATTERY_SOC_ENTITY):
+        entity_id = str(user_input.get(key, "") or "")
+        if not entity_id:
+            continue
+        state = hass.states.get(entity_id)
+        if state is None:
+            return "real_entity_not_found"
+        try:
+            float(state.state)
+        except (TypeError, ValueError):
+            return "battery_entity_not_numeric"
+
+    return None
+
+
+def _validate_constraint_groups(user_input: dict[str, Any]) -> str | None:
+    """Validate the circuit constraint lines."""
+    try:
+        parse_constraint_groups(str(user_input.get(CONF_CONSTRAINT_GROUPS, "") or ""))
+    except ValueError:
+        return "invalid_constraints"
+    return None
+
+
+def _validate_thermal_load(user_input: dict[str, Any]) -> str | None:
+    """Require the boost temperature to be above the normal one."""
+    if not user_input.get(CONF_THERMAL_LOAD_ENTITY):
+        return None
+    normal_c = int(user_input.get(CONF_THERMAL_LOAD_NORMAL_TEMP_C, DEFAULT_THERMAL_LOAD_NORMAL_TEMP_C))
+    boost_c = int(user_input.get(CONF_THERMAL_LOAD_BOOST_TEMP_C, DEFAULT_THERMAL_LOAD_BOOST_TEMP_C))
+    if boost_c <= normal_c:
+        return "invalid_thermal_temps"
     return None
 
 
@@ -360,6 +760,9 @@ def _build_schema(
     profile_default: str,
     solar_entity_default: str | None,
     load_entity_default: str | None,
+    battery_power_entity_default: str | None,
+    battery_soc_entity_default: str | None,
+    battery_soc_target_pct_default: int,
     import_threshold_w_default: int,
     export_threshold_w_default: int,
     duration_threshold_min_default: int,
@@ -380,6 +783,40 @@ def _build_schema(
     load_3_min_on_time_min_default: int,
     load_3_cooldown_min_default: int,
     load_3_priority_default: int,
+    continuous_load_entity_default: str | None,
+    continuous_load_min_power_w_default: int,
+    continuous_load_max_power_w_default: int,
+    continuous_load_step_w_default: int,
+    continuous_load_deadband_w_default: int,
+    continuous_load_rate_limit_s_default: int,
+    continuous_load_w_per_unit_default: int,
+    import_limit_w_default: int,
+    safety_min_on_s_default: int,
+    export_limit_enabled_default: bool,
+    export_limit_w_default: int,
+    curtailment_entity_default: str | None,
+    solar_forecast_entity_default: str | None,
+    forecast_horizon_min_default: int,
+    load_1_required_runtime_min_default: int,
+    load_1_deadline_default: str,
+    load_2_required_runtime_min_default: int,
+    load_2_deadline_default: str,
+    load_3_required_runtime_min_default: int,
+    load_3_deadline_default: str,
+    import_price_entity_default: str | None,
+    export_price_entity_default: str | None,
+    price_lookahead_h_default: int,
+    shadow_mode_default: bool,
+    load_1_power_entity_default: str | None,
+    load_2_power_entity_default: str | None,
+    load_3_power_entity_default: str | None,
+    constraint_groups_default: str,
+    thermal_load_entity_default: str | None,
+    thermal_load_normal_temp_c_default: int,
+    thermal_load_boost_temp_c_default: int,
+    thermal_load_power_w_default: int,
+    thermal_load_volume_l_default: int,
+    thermal_load_rate_limit_s_default: int,
 ) -> vol.Schema:
     """Build shared schema for config and options forms."""
     schema: dict[Any, Any] = {
@@ -446,6 +883,28 @@ def _build_schema(
         )
     )
 
+    battery_power_key = (
+        vol.Optional(CONF_BATTERY_POWER_ENTITY)
+        if battery_power_entity_default is None
+        else vol.Optional(CONF_BATTERY_POWER_ENTITY, default=battery_power_entity_default)
+    )
+    battery_soc_key = (
+        vol.Optional(CONF_BATTERY_SOC_ENTITY)
+        if battery_soc_entity_default is None
+        else vol.Optional(CONF_BATTERY_SOC_ENTITY, default=battery_soc_entity_default)
+    )
+    schema[battery_power_key] = selector.EntitySelector(
+        selector.EntitySelectorConfig(domain=["sensor"], multiple=False)
+    )
+    schema[battery_soc_key] = selector.EntitySelector(
+        selector.EntitySelectorConfig(domain=["sensor"], multiple=False)
+    )
+    schema[vol.Required(CONF_BATTERY_SOC_TARGET_PCT, default=battery_soc_target_pct_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=0, max=100, step=1, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+
     load_1_key = (
         vol.Optional(CONF_LOAD_1_ENTITY)
         if load_1_entity_default is None
@@ -525,4 +984,189 @@ def _build_schema(
         selector.NumberSelectorConfig(min=1, max=3, step=1, mode=selector.NumberSelectorMode.BOX)
     )
 
+    continuous_load_key = (
+        vol.Optional(CONF_CONTINUOUS_LOAD_ENTITY)
+        if continuous_load_entity_default is None
+        else vol.Optional(CONF_CONTINUOUS_LOAD_ENTITY, default=continuous_load_entity_default)
+    )
+    schema[continuous_load_key] = selector.EntitySelector(
+        selector.EntitySelectorConfig(domain=["number", "input_number"], multiple=False)
+    )
+    schema[vol.Required(CONF_CONTINUOUS_LOAD_MIN_POWER_W, default=continuous_load_min_power_w_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=0, max=22000, step=100, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+    schema[vol.Required(CONF_CONTINUOUS_LOAD_MAX_POWER_W, default=continuous_load_max_power_w_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=0, max=22000, step=100, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+    schema[vol.Required(CONF_CONTINUOUS_LOAD_STEP_W, default=continuous_load_step_w_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=1, max=5000, step=1, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+    schema[vol.Required(CONF_CONTINUOUS_LOAD_DEADBAND_W, default=continuous_load_deadband_w_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=0, max=5000, step=10, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+    schema[vol.Required(CONF_CONTINUOUS_LOAD_RATE_LIMIT_S, default=continuous_load_rate_limit_s_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=0, max=3600, step=1, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+    schema[vol.Required(CONF_CONTINUOUS_LOAD_W_PER_UNIT, default=continuous_load_w_per_unit_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=1, max=1000, step=1, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+
+    schema[vol.Required(CONF_IMPORT_LIMIT_W, default=import_limit_w_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=0, max=50000, step=100, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+    schema[vol.Required(CONF_SAFETY_MIN_ON_S, default=safety_min_on_s_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=0, max=1800, step=10, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+
+    schema[vol.Required(CONF_EXPORT_LIMIT_ENABLED, default=export_limit_enabled_default)] = bool
+    schema[vol.Required(CONF_EXPORT_LIMIT_W, default=export_limit_w_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=0, max=50000, step=100, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+    curtailment_entity_key = (
+        vol.Optional(CONF_CURTAILMENT_ENTITY)
+        if curtailment_entity_default is None
+        else vol.Optional(CONF_CURTAILMENT_ENTITY, default=curtailment_entity_default)
+    )
+    schema[curtailment_entity_key] = selector.EntitySelector(
+        selector.EntitySelectorConfig(domain=["switch", "input_boolean"], multiple=False)
+    )
+
+    solar_forecast_entity_key = (
+        vol.Optional(CONF_SOLAR_FORECAST_ENTITY)
+        if solar_forecast_entity_default is None
+        else vol.Optional(CONF_SOLAR_FORECAST_ENTITY, default=solar_forecast_entity_default)
+    )
+    schema[solar_forecast_entity_key] = selector.EntitySelector(
+        selector.EntitySelectorConfig(domain=["sensor"], multiple=False)
+    )
+    schema[vol.Required(CONF_FORECAST_HORIZON_MIN, default=forecast_horizon_min_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=5, max=720, step=5, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+
+    schema[vol.Required(CONF_LOAD_1_REQUIRED_RUNTIME_MIN, default=load_1_required_runtime_min_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=0, max=1440, step=5, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+    schema[vol.Required(CONF_LOAD_1_DEADLINE, default=load_1_deadline_default)] = selector.TimeSelector()
+    schema[vol.Required(CONF_LOAD_2_REQUIRED_RUNTIME_MIN, default=load_2_required_runtime_min_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=0, max=1440, step=5, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+    schema[vol.Required(CONF_LOAD_2_DEADLINE, default=load_2_deadline_default)] = selector.TimeSelector()
+    schema[vol.Required(CONF_LOAD_3_REQUIRED_RUNTIME_MIN, default=load_3_required_runtime_min_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=0, max=1440, step=5, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+    schema[vol.Required(CONF_LOAD_3_DEADLINE, default=load_3_deadline_default)] = selector.TimeSelector()
+
+    import_price_entity_key = (
+        vol.Optional(CONF_IMPORT_PRICE_ENTITY)
+        if import_price_entity_default is None
+        else vol.Optional(CONF_IMPORT_PRICE_ENTITY, default=import_price_entity_default)
+    )
+    schema[import_price_entity_key] = selector.EntitySelector(
+        selector.EntitySelectorConfig(domain=["sensor", "input_number"], multiple=False)
+    )
+    export_price_entity_key = (
+        vol.Optional(CONF_EXPORT_PRICE_ENTITY)
+        if export_price_entity_default is None
+        else vol.Optional(CONF_EXPORT_PRICE_ENTITY, default=export_price_entity_default)
+    )
+    schema[export_price_entity_key] = selector.EntitySelector(
+        selector.EntitySelectorConfig(domain=["sensor", "input_number"], multiple=False)
+    )
+    schema[vol.Required(CONF_PRICE_LOOKAHEAD_H, default=price_lookahead_h_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=1, max=48, step=1, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+
+    schema[vol.Required(CONF_SHADOW_MODE, default=shadow_mode_default)] = bool
+
+    load_1_power_entity_key = (
+        vol.Optional(CONF_LOAD_1_POWER_ENTITY)
+        if load_1_power_entity_default is None
+        else vol.Optional(CONF_LOAD_1_POWER_ENTITY, default=load_1_power_entity_default)
+    )
+    schema[load_1_power_entity_key] = selector.EntitySelector(
+        selector.EntitySelectorConfig(domain=["sensor"], multiple=False)
+    )
+    load_2_power_entity_key = (
+        vol.Optional(CONF_LOAD_2_POWER_ENTITY)
+        if load_2_power_entity_default is None
+        else vol.Optional(CONF_LOAD_2_POWER_ENTITY, default=load_2_power_entity_default)
+    )
+    schema[load_2_power_entity_key] = selector.EntitySelector(
+        selector.EntitySelectorConfig(domain=["sensor"], multiple=False)
+    )
+    load_3_power_entity_key = (
+        vol.Optional(CONF_LOAD_3_POWER_ENTITY)
+        if load_3_power_entity_default is None
+        else vol.Optional(CONF_LOAD_3_POWER_ENTITY, default=load_3_power_entity_default)
+    )
+    schema[load_3_power_entity_key] = selector.EntitySelector(
+        selector.EntitySelectorConfig(domain=["sensor"], multiple=False)
+    )
+
+    schema[vol.Optional(CONF_CONSTRAINT_GROUPS, default=constraint_groups_default)] = selector.TextSelector(
+        selector.TextSelectorConfig(multiline=True)
+    )
+
+    thermal_load_entity_key = (
+        vol.Optional(CONF_THERMAL_LOAD_ENTITY)
+        if thermal_load_entity_default is None
+        else vol.Optional(CONF_THERMAL_LOAD_ENTITY, default=thermal_load_entity_default)
+    )
+    schema[thermal_load_entity_key] = selector.EntitySelector(
+        selector.EntitySelectorConfig(domain=["climate", "water_heater"], multiple=False)
+    )
+    schema[vol.Required(CONF_THERMAL_LOAD_NORMAL_TEMP_C, default=thermal_load_normal_temp_c_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=5, max=90, step=1, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+    schema[vol.Required(CONF_THERMAL_LOAD_BOOST_TEMP_C, default=thermal_load_boost_temp_c_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=5, max=90, step=1, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+    schema[vol.Required(CONF_THERMAL_LOAD_POWER_W, default=thermal_load_power_w_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=100, max=20000, step=50, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+    schema[vol.Required(CONF_THERMAL_LOAD_VOLUME_L, default=thermal_load_volume_l_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=0, max=5000, step=10, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+    schema[vol.Required(CONF_THERMAL_LOAD_RATE_LIMIT_S, default=thermal_load_rate_limit_s_default)] = (
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(min=60, max=7200, step=30, mode=selector.NumberSelectorMode.BOX)
+        )
+    )
+
     return vol.Schema(schema)
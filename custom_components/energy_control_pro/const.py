@@ -3,11 +3,19 @@
 from __future__ import annotations
 
 DOMAIN = "energy_control_pro"
+STORAGE_VERSION = 1
+DATA_HUB = f"{DOMAIN}_hub"
+UPDATE_INTERVAL_S = 10
+# Sub-ticks per update interval; entries are spread evenly across them.
+HUB_SLICES = 5
 
 CONF_SIMULATION = "simulation"
 CONF_PROFILE = "profile"
 CONF_SOLAR_POWER_ENTITY = "solar_power_entity"
 CONF_LOAD_POWER_ENTITY = "load_power_entity"
+CONF_BATTERY_POWER_ENTITY = "battery_power_entity"
+CONF_BATTERY_SOC_ENTITY = "battery_soc_entity"
+CONF_BATTERY_SOC_TARGET_PCT = "battery_soc_target_pct"
 CONF_IMPORT_THRESHOLD_W = "import_threshold_w"
 CONF_EXPORT_THRESHOLD_W = "export_threshold_w"
 CONF_DURATION_THRESHOLD_MIN = "duration_threshold_min"
@@ -18,16 +26,50 @@ CONF_LOAD_1_MIN_SURPLUS_W = "load_1_min_surplus_w"
 CONF_LOAD_1_MIN_ON_TIME_MIN = "load_1_min_on_time_min"
 CONF_LOAD_1_COOLDOWN_MIN = "load_1_cooldown_min"
 CONF_LOAD_1_PRIORITY = "load_1_priority"
+CONF_LOAD_1_REQUIRED_RUNTIME_MIN = "load_1_required_runtime_min"
+CONF_LOAD_1_DEADLINE = "load_1_deadline"
+CONF_LOAD_1_POWER_ENTITY = "load_1_power_entity"
 CONF_LOAD_2_ENTITY = "load_2_entity"
 CONF_LOAD_2_MIN_SURPLUS_W = "load_2_min_surplus_w"
 CONF_LOAD_2_MIN_ON_TIME_MIN = "load_2_min_on_time_min"
 CONF_LOAD_2_COOLDOWN_MIN = "load_2_cooldown_min"
 CONF_LOAD_2_PRIORITY = "load_2_priority"
+CONF_LOAD_2_REQUIRED_RUNTIME_MIN = "load_2_required_runtime_min"
+CONF_LOAD_2_DEADLINE = "load_2_deadline"
+CONF_LOAD_2_POWER_ENTITY = "load_2_power_entity"
 CONF_LOAD_3_ENTITY = "load_3_entity"
 CONF_LOAD_3_MIN_SURPLUS_W = "load_3_min_surplus_w"
 CONF_LOAD_3_MIN_ON_TIME_MIN = "load_3_min_on_time_min"
 CONF_LOAD_3_COOLDOWN_MIN = "load_3_cooldown_min"
 CONF_LOAD_3_PRIORITY = "load_3_priority"
+CONF_LOAD_3_REQUIRED_RUNTIME_MIN = "load_3_required_runtime_min"
+CONF_LOAD_3_DEADLINE = "load_3_deadline"
+CONF_LOAD_3_POWER_ENTITY = "load_3_power_entity"
+CONF_CONTINUOUS_LOAD_ENTITY = "continuous_load_entity"
+CONF_CONTINUOUS_LOAD_MIN_POWER_W = "continuous_load_min_power_w"
+CONF_CONTINUOUS_LOAD_MAX_POWER_W = "continuous_load_max_power_w"
+CONF_CONTINUOUS_LOAD_STEP_W = "continuous_load_step_w"
+CONF_CONTINUOUS_LOAD_DEADBAND_W = "continuous_load_deadband_w"
+CONF_CONTINUOUS_LOAD_RATE_LIMIT_S = "continuous_load_rate_limit_s"
+CONF_CONTINUOUS_LOAD_W_PER_UNIT = "continuous_load_w_per_unit"
+CONF_THERMAL_LOAD_ENTITY = "thermal_load_entity"
+CONF_THERMAL_LOAD_NORMAL_TEMP_C = "thermal_load_normal_temp_c"
+CONF_THERMAL_LOAD_BOOST_TEMP_C = "thermal_load_boost_temp_c"
+CONF_THERMAL_LOAD_POWER_W = "thermal_load_power_w"
+CONF_THERMAL_LOAD_VOLUME_L = "thermal_load_volume_l"
+CONF_THERMAL_LOAD_RATE_LIMIT_S = "thermal_load_rate_limit_s"
+CONF_IMPORT_LIMIT_W = "import_limit_w"
+CONF_SAFETY_MIN_ON_S = "safety_min_on_s"
+CONF_EXPORT_LIMIT_ENABLED = "export_limit_enabled"
+CONF_EXPORT_LIMIT_W = "export_limit_w"
+CONF_CURTAILMENT_ENTITY = "curtailment_entity"
+CONF_SOLAR_FORECAST_ENTITY = "solar_forecast_entity"
+CONF_FORECAST_HORIZON_MIN = "forecast_horizon_min"
+CONF_IMPORT_PRICE_ENTITY = "import_price_entity"
+CONF_EXPORT_PRICE_ENTITY = "export_price_entity"
+CONF_PRICE_LOOKAHEAD_H = "price_lookahead_h"
+CONF_SHADOW_MODE = "shadow_mode"
+CONF_CONSTRAINT_GROUPS = "constraint_groups"
 
 DEFAULT_IMPORT_THRESHOLD_W = 800
 DEFAULT_EXPORT_THRESHOLD_W = 800
@@ -35,18 +77,60 @@ DEFAULT_DURATION_THRESHOLD_MIN = 10
 DEFAULT_STATE_THRESHOLD_W = 100
 DEFAULT_OPTIMIZATION_ENABLED = False
 DEFAULT_STRATEGY = "maximize_self_consumption"
+DEFAULT_BATTERY_SOC_TARGET_PCT = 90
+DEFAULT_IMPORT_LIMIT_W = 0
+DEFAULT_SAFETY_MIN_ON_S = 60
+DEFAULT_EXPORT_LIMIT_ENABLED = False
+DEFAULT_EXPORT_LIMIT_W = 0
+DEFAULT_EXPORT_LIMIT_HYSTERESIS_W = 200
+DEFAULT_FORECAST_HORIZON_MIN = 30
+DEFAULT_PRICE_LOOKAHEAD_H = 12
+DEFAULT_SHADOW_MODE = False
+DEFAULT_PENDING_ACTION_TIMEOUT_S = 30
+DEFAULT_PUBLISH_DEADBAND_W = 25
+# Optimization evaluations kept for diagnostics (one hour at the 10 s interval).
+DEFAULT_TRACE_SIZE = 360
+DEFAULT_FLAP_SWITCHES = 6
+DEFAULT_FLAP_WINDOW_MIN = 60
+DEFAULT_FLAP_DECAY_MIN = 60
+DEFAULT_FLAP_MAX_LEVEL = 3
+DEFAULT_BALANCED_IMPORT_WEIGHT = 1.0
+DEFAULT_BALANCED_EXPORT_WEIGHT = 0.6
+DEFAULT_BALANCED_SWITCH_PENALTY_W = 150
 
 DEFAULT_LOAD_MIN_SURPLUS_W = 1200
 DEFAULT_LOAD_MIN_ON_TIME_MIN = 10
 DEFAULT_LOAD_COOLDOWN_MIN = 10
+DEFAULT_LOAD_REQUIRED_RUNTIME_MIN = 0
+DEFAULT_LOAD_DEADLINE = "21:00:00"
+DEFAULT_DEFERRABLE_MARGIN_MIN = 15
+DEFAULT_PLANNING_TIME_BUDGET_S = 0.5
+# Longest a cycle waits for the executor, including time queued behind other jobs.
+DEFAULT_PLANNING_DEADLINE_S = 1.0
+DEFAULT_LEARNING_SAVE_DELAY_S = 60
+
+DEFAULT_CONTINUOUS_LOAD_MIN_POWER_W = 1400
+DEFAULT_CONTINUOUS_LOAD_MAX_POWER_W = 7400
+DEFAULT_CONTINUOUS_LOAD_STEP_W = 230
+DEFAULT_CONTINUOUS_LOAD_DEADBAND_W = 300
+DEFAULT_CONTINUOUS_LOAD_RATE_LIMIT_S = 60
+DEFAULT_CONTINUOUS_LOAD_W_PER_UNIT = 1
+
+DEFAULT_THERMAL_LOAD_NORMAL_TEMP_C = 50
+DEFAULT_THERMAL_LOAD_BOOST_TEMP_C = 60
+DEFAULT_THERMAL_LOAD_POWER_W = 2000
+DEFAULT_THERMAL_LOAD_VOLUME_L = 200
+DEFAULT_THERMAL_LOAD_RATE_LIMIT_S = 900
 
 STRATEGY_MAXIMIZE_SELF_CONSUMPTION = "maximize_self_consumption"
 STRATEGY_AVOID_GRID_IMPORT = "avoid_grid_import"
 STRATEGY_BALANCED = "balanced"
+STRATEGY_MINIMIZE_COST = "minimize_cost"
 STRATEGIES: tuple[str, ...] = (
     STRATEGY_MAXIMIZE_SELF_CONSUMPTION,
     STRATEGY_AVOID_GRID_IMPORT,
     STRATEGY_BALANCED,
+    STRATEGY_MINIMIZE_COST,
 )
 
 LOAD_SLOTS: tuple[dict[str, str], ...] = (
@@ -56,6 +140,9 @@ LOAD_SLOTS: tuple[dict[str, str], ...] = (
         "min_on_time_min": CONF_LOAD_1_MIN_ON_TIME_MIN,
         "cooldown_min": CONF_LOAD_1_COOLDOWN_MIN,
         "priority": CONF_LOAD_1_PRIORITY,
+        "required_runtime_min": CONF_LOAD_1_REQUIRED_RUNTIME_MIN,
+        "deadline": CONF_LOAD_1_DEADLINE,
+        "power_entity": CONF_LOAD_1_POWER_ENTITY,
     },
     {
         "entity": CONF_LOAD_2_ENTITY,
@@ -63,6 +150,9 @@ LOAD_SLOTS: tuple[dict[str, str], ...] = (
         "min_on_time_min": CONF_LOAD_2_MIN_ON_TIME_MIN,
         "cooldown_min": CONF_LOAD_2_COOLDOWN_MIN,
         "priority": CONF_LOAD_2_PRIORITY,
+        "required_runtime_min": CONF_LOAD_2_REQUIRED_RUNTIME_MIN,
+        "deadline": CONF_LOAD_2_DEADLINE,
+        "power_entity": CONF_LOAD_2_POWER_ENTITY,
     },
     {
         "entity": CONF_LOAD_3_ENTITY,
@@ -70,6 +160,9 @@ LOAD_SLOTS: tuple[dict[str, str], ...] = (
         "min_on_time_min": CONF_LOAD_3_MIN_ON_TIME_MIN,
         "cooldown_min": CONF_LOAD_3_COOLDOWN_MIN,
         "priority": CONF_LOAD_3_PRIORITY,
+        "required_runtime_min": CONF_LOAD_3_REQUIRED_RUNTIME_MIN,
+        "deadline": CONF_LOAD_3_DEADLINE,
+        "power_entity": CONF_LOAD_3_POWER_ENTITY,
     },
 )
 
@@ -81,4 +174,4 @@ PROFILES: tuple[str, ...] = (
     PROFILE_SUNNY_DAY,
     PROFILE_CLOUDY_DAY,
     PROFILE_WINTER_DAY,
-)
+)
@@ -2,50 +2,105 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from collections.abc import Callable, Mapping
+from dataclasses import replace
+from datetime import datetime
+from functools import partial
 import logging
+import math
+from time import monotonic
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT, STATE_UNAVAILABLE, STATE_UNKNOWN, UnitOfPower
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import (
+    CONF_BATTERY_POWER_ENTITY,
+    CONF_BATTERY_SOC_ENTITY,
+    CONF_BATTERY_SOC_TARGET_PCT,
+    CONF_CONSTRAINT_GROUPS,
+    CONF_CONTINUOUS_LOAD_DEADBAND_W,
+    CONF_CONTINUOUS_LOAD_ENTITY,
+    CONF_CONTINUOUS_LOAD_MAX_POWER_W,
+    CONF_CONTINUOUS_LOAD_MIN_POWER_W,
+    CONF_CONTINUOUS_LOAD_RATE_LIMIT_S,
+    CONF_CONTINUOUS_LOAD_STEP_W,
+    CONF_CONTINUOUS_LOAD_W_PER_UNIT,
+    CONF_CURTAILMENT_ENTITY,
     CONF_DURATION_THRESHOLD_MIN,
+    CONF_EXPORT_LIMIT_ENABLED,
+    CONF_EXPORT_LIMIT_W,
+    CONF_EXPORT_PRICE_ENTITY,
     CONF_EXPORT_THRESHOLD_W,
-    CONF_LOAD_1_COOLDOWN_MIN,
-    CONF_LOAD_1_ENTITY,
-    CONF_LOAD_1_MIN_ON_TIME_MIN,
-    CONF_LOAD_1_MIN_SURPLUS_W,
-    CONF_LOAD_1_PRIORITY,
-    CONF_LOAD_2_COOLDOWN_MIN,
-    CONF_LOAD_2_ENTITY,
-    CONF_LOAD_2_MIN_ON_TIME_MIN,
-    CONF_LOAD_2_MIN_SURPLUS_W,
-    CONF_LOAD_2_PRIORITY,
-    CONF_LOAD_3_COOLDOWN_MIN,
-    CONF_LOAD_3_ENTITY,
-    CONF_LOAD_3_MIN_ON_TIME_MIN,
-    CONF_LOAD_3_MIN_SURPLUS_W,
-    CONF_LOAD_3_PRIORITY,
+    CONF_FORECAST_HORIZON_MIN,
     CONF_OPTIMIZATION_ENABLED,
     CONF_PROFILE,
+    CONF_IMPORT_LIMIT_W,
+    CONF_IMPORT_PRICE_ENTITY,
     CONF_IMPORT_THRESHOLD_W,
     CONF_LOAD_POWER_ENTITY,
+    CONF_PRICE_LOOKAHEAD_H,
+    CONF_SAFETY_MIN_ON_S,
+    CONF_SHADOW_MODE,
     CONF_SIMULATION,
+    CONF_SOLAR_FORECAST_ENTITY,
     CONF_SOLAR_POWER_ENTITY,
     CONF_STRATEGY,
+    CONF_THERMAL_LOAD_BOOST_TEMP_C,
+    CONF_THERMAL_LOAD_ENTITY,
+    CONF_THERMAL_LOAD_NORMAL_TEMP_C,
+    CONF_THERMAL_LOAD_POWER_W,
+    CONF_THERMAL_LOAD_RATE_LIMIT_S,
+    CONF_THERMAL_LOAD_VOLUME_L,
+    DEFAULT_BATTERY_SOC_TARGET_PCT,
+    DEFAULT_CONTINUOUS_LOAD_DEADBAND_W,
+    DEFAULT_CONTINUOUS_LOAD_MAX_POWER_W,
+    DEFAULT_CONTINUOUS_LOAD_MIN_POWER_W,
+    DEFAULT_CONTINUOUS_LOAD_RATE_LIMIT_S,
+    DEFAULT_CONTINUOUS_LOAD_STEP_W,
+    DEFAULT_CONTINUOUS_LOAD_W_PER_UNIT,
+    DEFAULT_DEFERRABLE_MARGIN_MIN,
     DEFAULT_DURATION_THRESHOLD_MIN,
+    DEFAULT_EXPORT_LIMIT_ENABLED,
+    DEFAULT_EXPORT_LIMIT_HYSTERESIS_W,
+    DEFAULT_EXPORT_LIMIT_W,
     DEFAULT_EXPORT_THRESHOLD_W,
+    DEFAULT_FLAP_DECAY_MIN,
+    DEFAULT_FLAP_MAX_LEVEL,
+    DEFAULT_FLAP_SWITCHES,
+    DEFAULT_FLAP_WINDOW_MIN,
+    DEFAULT_FORECAST_HORIZON_MIN,
     DEFAULT_LOAD_COOLDOWN_MIN,
     DEFAULT_LOAD_MIN_ON_TIME_MIN,
     DEFAULT_LOAD_MIN_SURPLUS_W,
+    DEFAULT_LEARNING_SAVE_DELAY_S,
+    DEFAULT_LOAD_REQUIRED_RUNTIME_MIN,
+    DEFAULT_IMPORT_LIMIT_W,
     DEFAULT_IMPORT_THRESHOLD_W,
     DEFAULT_OPTIMIZATION_ENABLED,
+    DEFAULT_PENDING_ACTION_TIMEOUT_S,
+    DEFAULT_PUBLISH_DEADBAND_W,
+    DEFAULT_PLANNING_DEADLINE_S,
+    DEFAULT_PLANNING_TIME_BUDGET_S,
+    DEFAULT_PRICE_LOOKAHEAD_H,
+    DEFAULT_SAFETY_MIN_ON_S,
+    DEFAULT_SHADOW_MODE,
     DEFAULT_STATE_THRESHOLD_W,
     DEFAULT_STRATEGY,
-    STRATEGY_AVOID_GRID_IMPORT,
+    DEFAULT_THERMAL_LOAD_BOOST_TEMP_C,
+    DEFAULT_THERMAL_LOAD_NORMAL_TEMP_C,
+    DEFAULT_THERMAL_LOAD_POWER_W,
+    DEFAULT_THERMAL_LOAD_RATE_LIMIT_S,
+    DEFAULT_THERMAL_LOAD_VOLUME_L,
+    DEFAULT_TRACE_SIZE,
+    DOMAIN,
+    LOAD_SLOTS,
     PROFILE_SUNNY_DAY,
+    STORAGE_VERSION,
 )
 from .logic import (
     ENERGY_STATE_EXPORTING,
@@ -57,12 +112,77 @@ from .logic import (
     simulate,
     update_state_durations,
 )
-from .optimization.engine import LoadConfig, LoadRuntime, decide_turn_off, decide_turn_on
+from .snapshot import SNAPSHOT_FIELDS, CycleSnapshot, diff_snapshots
+from .optimization.arbiter import LoadArbiter
+from .optimization.constraints import ConstraintIndex, parse_constraint_groups
+from .optimization.deadline import DeadlineRunner
+from .optimization.engine import (
+    ContinuousLoadConfig,
+    ContinuousLoadRuntime,
+    EngineAction,
+    LoadConfig,
+    LoadRuntime,
+    PendingAction,
+    ThermalLoadConfig,
+    ThermalLoadRuntime,
+    battery_adjusted_power,
+    decide_continuous_setpoint,
+    decide_export_limit,
+    decide_peak_shaving,
+    decide_thermal_setpoint,
+    pending_power_w,
+    resolve_pending,
+    thermal_stored_kwh,
+    timer_expires_at,
+)
+from .optimization.eligibility import EligibilityQueue
+from .optimization.load_profile import LoadProfile, slot_index
+from .optimization.memo import DecisionMemo
+from .optimization.oscillation import FlapTracker, adapt_load
+from .optimization.power_learning import LoadPowerLearner
+from .optimization.strategies import STRATEGY_REGISTRY, StrategyContext, get_strategy
+from .optimization.trace import DecisionTrace
+from .optimization.scheduler import (
+    SLOT_MINUTES,
+    DeferrablePlan,
+    decide_deferrable,
+    next_deadline,
+    parse_deadline,
+    plan_deferrable_loads,
+    slot_start,
+)
+
+if TYPE_CHECKING:
+    # Optional features are imported on first use so a plain setup does not load them.
+    from .optimization.forecast import SolarForecast
+    from .optimization.shadow import ShadowEvaluator
+    from .optimization.tariff import PriceTimeline
 
 _LOGGER = logging.getLogger(__name__)
 
+_INPUT_ENTITY_OPTIONS = (
+    CONF_SOLAR_POWER_ENTITY,
+    CONF_LOAD_POWER_ENTITY,
+    CONF_BATTERY_POWER_ENTITY,
+    CONF_BATTERY_SOC_ENTITY,
+    CONF_CONTINUOUS_LOAD_ENTITY,
+    CONF_THERMAL_LOAD_ENTITY,
+    CONF_CURTAILMENT_ENTITY,
+    CONF_SOLAR_FORECAST_ENTITY,
+    CONF_IMPORT_PRICE_ENTITY,
+    CONF_EXPORT_PRICE_ENTITY,
+    *(slot[key] for slot in LOAD_SLOTS for key in ("entity", "power_entity")),
+)
+
+
+def _attribute_number(attributes: Mapping[str, Any], key: str) -> float | None:
+    try:
+        return float(attributes[key])
+    except (KeyError, TypeError, ValueError):
+        return None
 
-class EnergyControlProCoordinator(DataUpdateCoordinator[dict[str, int | str]]):
+
+class EnergyControlProCoordinator(DataUpdateCoordinator[CycleSnapshot]):
     """Coordinate Energy Control Pro sensor updates."""
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
@@ -70,10 +190,64 @@ class EnergyControlProCoordinator(DataUpdateCoordinator[dict[str, int | str]]):
         self._entry = entry
         self._import_start: datetime | None = None
         self._export_start: datetime | None = None
+        self._engine_import_start: datetime | None = None
+        self._engine_export_start: datetime | None = None
         self._import_alert_sent = False
         self._export_alert_sent = False
         self._load_last_on: dict[str, datetime] = {}
         self._load_last_off: dict[str, datetime] = {}
+        self._pending_actions: dict[str, PendingAction] = {}
+        self._flap_trackers: dict[str, FlapTracker] = {}
+        self._eligibility = EligibilityQueue()
+        # Inputs each load's heap entry was computed from (state, switch times, timing).
+        self._timer_inputs: dict[str, tuple[bool, datetime | None, datetime | None, int, int]] = {}
+        self._eligibility_wakeup: tuple[datetime, CALLBACK_TYPE] | None = None
+        # A fast limit check is running / power changed again while it ran.
+        self._fast_check_running = False
+        self._fast_check_again = False
+        self._constraints: tuple[str, ConstraintIndex | None] | None = None
+        self._continuous_setpoint_w = 0
+        self._continuous_last_change: datetime | None = None
+        self._thermal_last_change: datetime | None = None
+        self._thermal_last_sent_c: float | None = None
+        self._forecast: SolarForecast | None = None
+        self._forecast_updated: datetime | None = None
+        self._load_profile = LoadProfile()
+        self._load_profile_slot: int | None = None
+        self._profile_store: Store[dict] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.load_profile"
+        )
+        self._power_learner = LoadPowerLearner()
+        self._power_store: Store[dict] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.load_power"
+        )
+        self._learning_states: dict[str, bool] = {}
+        self._learning_load_w: int | None = None
+        # Optional battery entities currently unreadable (logged once each).
+        self._unreadable_battery: set[str] = set()
+        self._price_timelines: dict[str, tuple[datetime, PriceTimeline | None]] = {}
+        self._shadow: ShadowEvaluator | None = None
+        self._decision_memo = DecisionMemo()
+        # States read once by the hub for the running update's read phase
+        # (see async_refresh_with_states and _async_update_data).
+        self._tick_states: Mapping[str, State | None] | None = None
+        self._arbiter: LoadArbiter | None = None
+        self.changed_keys: frozenset[str] = frozenset()
+        self._created = monotonic()
+        # Set once async_start has finished; hub ticks before that are skipped.
+        self._started = False
+        # Seconds spent in setup and until the first live data (see async_setup_entry).
+        self.startup_timings: dict[str, float] = {}
+        # [published values that changed, published values]
+        self._publish_stats = [0, 0]
+        self._last_cycle: datetime | None = None
+        self._deferrable_runtime_s: dict[str, float] = {}
+        self._deferrable_period_end: dict[str, datetime] = {}
+        self._deferrable_plans: dict[str, DeferrablePlan] = {}
+        self._deferrable_plan_keys: dict[str, tuple] = {}
+        self._planner = DeadlineRunner()
+        self._planning_failed = False
+        self._trace = DecisionTrace(DEFAULT_TRACE_SIZE)
         self._optimization_enabled = bool(
             self._entry.options.get(
                 CONF_OPTIMIZATION_ENABLED,
@@ -91,10 +265,11 @@ class EnergyControlProCoordinator(DataUpdateCoordinator[dict[str, int | str]]):
             hass,
             logger=_LOGGER,
             name="Energy Control Pro",
-            update_interval=timedelta(seconds=10),
+            # Scheduled by EnergyControlProHub together with the other entries.
+            update_interval=None,
         )
 
-    async def _async_update_data(self) -> dict[str, int | str]:
+    async def _async_update_data(self) -> CycleSnapshot:
         """Fetch or simulate current values."""
         now = datetime.now()
         simulation = self._entry.options.get(
@@ -107,43 +282,482 @@ class EnergyControlProCoordinator(DataUpdateCoordinator[dict[str, int | str]]):
         )
 
         if simulation:
-            data = self._simulate_values(profile, now=now)
+            readings = self._simulate_values(profile, now=now)
         else:
-            data = self._real_values_from_entities()
+            readings = self._real_values_from_entities()
+            self._learn_load_power(int(readings["load_w"]))
+        load_w = int(readings["load_w"])
+        grid_import_w = int(readings["grid_import_w"])
+        grid_export_w = int(readings["grid_export_w"])
 
         energy_state = derive_energy_state(
-            grid_import_w=int(data["grid_import_w"]),
-            grid_export_w=int(data["grid_export_w"]),
+            grid_import_w=grid_import_w,
+            grid_export_w=grid_export_w,
             threshold_w=DEFAULT_STATE_THRESHOLD_W,
         )
         self._import_start, self._export_start, import_duration_min, export_duration_min = (
             update_state_durations(now, energy_state, self._import_start, self._export_start)
         )
-        data["energy_state"] = energy_state
-        data["import_duration_min"] = import_duration_min
-        data["export_duration_min"] = export_duration_min
-        data["optimization_enabled"] = self._optimization_enabled
-        data["strategy"] = self._strategy
+        soc = readings.get("battery_soc_pct")
+        engine_surplus_w, engine_import_w = self._battery_adjusted_power(
+            surplus_w=int(readings["surplus_w"]),
+            grid_import_w=grid_import_w,
+            battery_w=int(readings.get("battery_w", 0)),
+            battery_soc_pct=float(soc) if soc is not None else None,
+        )
+        (
+            self._engine_import_start,
+            self._engine_export_start,
+            engine_import_duration_min,
+            engine_export_duration_min,
+        ) = update_state_durations(
+            now,
+            derive_energy_state(
+                grid_import_w=engine_import_w,
+                grid_export_w=max(0, engine_surplus_w),
+                threshold_w=DEFAULT_STATE_THRESHOLD_W,
+            ),
+            self._engine_import_start,
+            self._engine_export_start,
+        )
+        horizon_min = int(self._get_option(CONF_FORECAST_HORIZON_MIN, DEFAULT_FORECAST_HORIZON_MIN))
+        self._learn_load_profile(now, load_w)
+        load_forecast = self._load_profile.forecast_w(now, horizon_min)
+        load_forecast_w = int(round(load_forecast)) if load_forecast is not None else None
 
-        await self._async_process_alerts(data)
-        await self._async_run_optimization(data, now=now)
-        data["last_action"] = self._last_action
-        return data
+        snapshot = CycleSnapshot(
+            solar_w=int(readings["solar_w"]),
+            load_w=load_w,
+            battery_w=int(readings.get("battery_w", 0)),
+            surplus_w=int(readings["surplus_w"]),
+            grid_import_w=grid_import_w,
+            grid_export_w=grid_export_w,
+            energy_state=energy_state,
+            import_duration_min=import_duration_min,
+            export_duration_min=export_duration_min,
+            optimization_enabled=self._optimization_enabled,
+            strategy=self._strategy,
+            last_action=self._last_action,
+            load_forecast_w=load_forecast_w,
+            battery_soc_pct=float(soc) if soc is not None else None,
+            forecast_surplus_w=self._forecast_surplus_w(
+                load_forecast_w if load_forecast_w is not None else load_w, now=now
+            ),
+            thermal_stored_kwh=self._thermal_stored_kwh(),
+            engine_import_duration_min=engine_import_duration_min,
+            engine_export_duration_min=engine_export_duration_min,
+            **self._price_data(now=now),
+        )
+
+        # The hub's shared read only covers the synchronous read phase above;
+        # after the first await, fast limit checks and wakeups run in between
+        # and must see live state, and so does the rest of this cycle.
+        self._tick_states = None
+        await self._async_process_alerts(snapshot)
+        await self._async_run_optimization(snapshot, now=now)
+        if self._shadow is not None:
+            self._shadow.end_cycle(now)
+        self._schedule_eligibility_wakeup(now)
+        shadow: dict[str, float] = {}
+        if self._shadow is not None and self._get_option(CONF_SHADOW_MODE, DEFAULT_SHADOW_MODE):
+            for name, metrics in self._shadow.metrics().items():
+                shadow[f"shadow_{name}_import_kwh"] = metrics["import_kwh"]
+                shadow[f"shadow_{name}_export_kwh"] = metrics["export_kwh"]
+                shadow[f"shadow_{name}_actions"] = metrics["actions"]
+        return self._publish(replace(snapshot, last_action=self._last_action, shadow=shadow))
+
+    def _publish(self, snapshot: CycleSnapshot) -> CycleSnapshot:
+        """Hold W values within the deadband and record which keys changed."""
+        if self.data is None:
+            self.startup_timings["first_data_s"] = round(monotonic() - self._created, 3)
+        published, self.changed_keys = diff_snapshots(
+            self.data, snapshot, deadband_w=DEFAULT_PUBLISH_DEADBAND_W
+        )
+        self._publish_stats[0] += len(self.changed_keys)
+        self._publish_stats[1] += len(SNAPSHOT_FIELDS) + len(published.shadow)
+        return published
+
+    def _battery_adjusted_power(
+        self, *, surplus_w: int, grid_import_w: int, battery_w: int, battery_soc_pct: float | None
+    ) -> tuple[int, int]:
+        """Return (surplus_w, grid_import_w) as seen by the load rules."""
+        return battery_adjusted_power(
+            surplus_w=surplus_w,
+            grid_import_w=grid_import_w,
+            battery_w=battery_w,
+            battery_soc_pct=battery_soc_pct,
+            soc_target_pct=int(
+                self._get_option(CONF_BATTERY_SOC_TARGET_PCT, DEFAULT_BATTERY_SOC_TARGET_PCT)
+            ),
+        )
+
+    def _thermal_stored_kwh(self) -> float | None:
+        """Estimate the heat stored in the heat-storage load, if one is configured."""
+        thermal_load = self._thermal_load_config()
+        if thermal_load is None:
+            return None
+        runtime = self._build_thermal_runtime(thermal_load)
+        # Without a temperature reading, assume the tank has reached its setpoint.
+        temp_c = runtime.current_temp_c if runtime.current_temp_c is not None else runtime.target_temp_c
+        if temp_c is None:
+            return None
+        return round(
+            thermal_stored_kwh(
+                volume_l=thermal_load.volume_l,
+                current_temp_c=temp_c,
+                normal_temp_c=thermal_load.normal_temp_c,
+            ),
+            2,
+        )
+
+    @callback
+    def data_changed(self, key: str) -> bool:
+        """Return True when ``key`` changed in the last published update."""
+        return key in self.changed_keys
+
+    @property
+    def optimization_enabled(self) -> bool:
+        """Return whether optimization is enabled (available before the first refresh)."""
+        return self._optimization_enabled
+
+    @property
+    def strategy(self) -> str:
+        """Return the active strategy name (available before the first refresh)."""
+        return self._strategy
+
+    async def async_start(self) -> None:
+        """Load learned state and run the first refresh, off the setup path."""
+        try:
+            await self.async_load_learning()
+            await self.async_refresh()
+        finally:
+            self._started = True
+
+    def input_entity_ids(self) -> set[str]:
+        """Return every configured entity one update reads."""
+        return {
+            entity_id
+            for key in _INPUT_ENTITY_OPTIONS
+            if (entity_id := str(self._get_option(key, "") or "").strip())
+        }
+
+    @callback
+    def async_attach_arbiter(self, arbiter: LoadArbiter) -> CALLBACK_TYPE:
+        """Share this entry's controllable entities with the other entries."""
+        owner = self._entry.entry_id
+        controlled = [
+            str(self._get_option(key, "") or "").strip()
+            for key in (
+                *(slot["entity"] for slot in LOAD_SLOTS),
+                CONF_CONTINUOUS_LOAD_ENTITY,
+                CONF_THERMAL_LOAD_ENTITY,
+                CONF_CURTAILMENT_ENTITY,
+            )
+        ]
+        arbiter.register(owner, [entity_id for entity_id in controlled if entity_id])
+        self._arbiter = arbiter
+        return partial(arbiter.unregister, owner)
+
+    def _controls(self, entity_id: str) -> bool:
+        """Return False when another entry controls this shared entity."""
+        return self._arbiter is None or self._arbiter.controls(self._entry.entry_id, entity_id)
+
+    def _reserve_shared_power(
+        self, entity_id: str, loads: list[LoadConfig], *, now: datetime
+    ) -> bool:
+        """Reserve a shared load's power from the pool of the entries listing it.
+
+        The power comes from ``loads``, the configs the cycle decided with.
+        """
+        if self._arbiter is None or not self._arbiter.is_shared(entity_id):
+            return True
+        power_w = next(
+            (max(0, load.min_surplus_w) for load in loads if load.entity_id == entity_id), 0
+        )
+        return self._arbiter.reserve(self._entry.entry_id, entity_id, power_w, now=now)
+
+    async def async_refresh_with_states(self, states: Mapping[str, State | None]) -> None:
+        """Run a scheduled update reading its inputs from the hub's shared ``states``.
+
+        The shared states are only used until the update's read phase ends.
+        Ticks arriving before the first refresh has finished are skipped, so
+        two cycles never run at the same time on startup.
+        """
+        if not self._started:
+            return
+        self._tick_states = states
+        try:
+            await self.async_refresh()
+        finally:
+            self._tick_states = None
+
+    def _state(self, entity_id: str) -> State | None:
+        """Return an entity state, from the hub's read when an update was scheduled by it."""
+        states = self._tick_states
+        if states is not None and entity_id in states:
+            return states[entity_id]
+        return self.hass.states.get(entity_id)
+
+    async def async_load_learning(self) -> None:
+        """Restore learned load power estimates and load profile saved by a previous run."""
+        self._power_learner = LoadPowerLearner.from_dict(await self._power_store.async_load())
+        self._load_profile = LoadProfile.from_dict(await self._profile_store.async_load())
+
+    def _learn_load_profile(self, now: datetime, load_w: int) -> None:
+        """Fold this cycle's load into the profile and save it once per slot."""
+        self._load_profile.update(now, load_w)
+        slot = slot_index(now)
+        if slot != self._load_profile_slot:
+            self._load_profile_slot = slot
+            self._profile_store.async_delay_save(
+                self._load_profile.as_dict, DEFAULT_LEARNING_SAVE_DELAY_S
+            )
+
+    def _learn_load_power(self, load_w: int) -> None:
+        """Update per-load power estimates from this cycle's readings (real mode).
+
+        A load with its own power entity is sampled while ON. Otherwise the
+        house load step is used when exactly one load switched since the
+        previous cycle, so simultaneous transitions are not attributed.
+        """
+        learned = False
+        switched: list[tuple[str, bool]] = []
+        for slot in LOAD_SLOTS:
+            entity_id = str(self._get_option(slot["entity"], "") or "").strip()
+            if not entity_id:
+                continue
+            state = self._state(entity_id)
+            is_on = bool(state and state.state == "on")
+            previous = self._learning_states.get(entity_id)
+            self._learning_states[entity_id] = is_on
+            power_entity_id = str(self._get_option(slot["power_entity"], "") or "").strip()
+            if power_entity_id:
+                if is_on:
+                    try:
+                        learned |= self._power_learner.observe(
+                            entity_id, self._read_power_w(power_entity_id)
+                        )
+                    except UpdateFailed:
+                        pass
+            elif previous is not None and previous != is_on:
+                switched.append((entity_id, is_on))
+
+        if len(switched) == 1 and self._learning_load_w is not None:
+            entity_id, turned_on = switched[0]
+            learned |= self._power_learner.observe_transition(
+                entity_id,
+                turned_on=turned_on,
+                load_before_w=self._learning_load_w,
+                load_after_w=load_w,
+            )
+        self._learning_load_w = load_w
+        if learned:
+            self._power_store.async_delay_save(
+                self._power_learner.as_dict, DEFAULT_LEARNING_SAVE_DELAY_S
+            )
+
+    @callback
+    def _schedule_eligibility_wakeup(self, now: datetime) -> None:
+        """Refresh at the instant the next load timer expires instead of up to 10 s later."""
+        next_at = self._eligibility.next_at() if self._optimization_enabled else None
+        if self._eligibility_wakeup is not None:
+            if self._eligibility_wakeup[0] == next_at:
+                return
+            self._eligibility_wakeup[1]()
+            self._eligibility_wakeup = None
+        if next_at is None:
+            return
+        self._eligibility_wakeup = (
+            next_at,
+            async_call_later(
+                self.hass,
+                max(0.0, (next_at - now).total_seconds()),
+                self._handle_eligibility_wakeup,
+            ),
+        )
+
+    @callback
+    def _handle_eligibility_wakeup(self, _now: datetime) -> None:
+        """Run a cycle now that a load became eligible to switch."""
+        self._eligibility_wakeup = None
+        self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def async_cancel_eligibility_wakeup(self) -> None:
+        """Cancel a pending timer wake-up (on unload)."""
+        if self._eligibility_wakeup is not None:
+            self._eligibility_wakeup[1]()
+            self._eligibility_wakeup = None
+
+    @callback
+    def async_start_fast_path(self) -> CALLBACK_TYPE | None:
+        """Re-check grid limits on every power entity change (real mode only).
+
+        The 10 s poll is too slow to protect a main breaker or an export cap,
+        so when either limit is configured the power entities are watched directly.
+        """
+        if self._get_option(CONF_SIMULATION, True):
+            return None
+        if not self._grid_limits_configured():
+            return None
+        entity_ids = [
+            entity_id
+            for entity_id in (
+                str(self._get_option(CONF_SOLAR_POWER_ENTITY, "") or ""),
+                str(self._get_option(CONF_LOAD_POWER_ENTITY, "") or ""),
+                str(self._get_option(CONF_BATTERY_POWER_ENTITY, "") or ""),
+            )
+            if entity_id
+        ]
+        if not entity_ids:
+            return None
+        return async_track_state_change_event(self.hass, entity_ids, self._handle_power_change)
+
+    @callback
+    def _handle_power_change(self, event: Event) -> None:
+        """Schedule a fast grid-limit check after a power entity update.
+
+        Updates arriving while a check runs are coalesced into one more check
+        on the latest readings, so a noisy meter never stacks up concurrent
+        checks that could send the same command twice.
+        """
+        if not self._optimization_enabled:
+            return
+        if self._fast_check_running:
+            self._fast_check_again = True
+            return
+        self._fast_check_running = True
+        self.hass.async_create_task(self._async_run_fast_checks())
+
+    async def _async_run_fast_checks(self) -> None:
+        """Run fast limit checks until no power update arrived during the last one."""
+        try:
+            while True:
+                self._fast_check_again = False
+                await self._async_fast_limit_check()
+                if not self._fast_check_again:
+                    return
+        finally:
+            self._fast_check_running = False
+
+    async def _async_fast_limit_check(self) -> None:
+        """Act immediately when the latest readings break the import or export cap."""
+        try:
+            data = self._real_values_from_entities()
+        except UpdateFailed:
+            return
+        now = datetime.now()
+        await self._async_enforce_grid_limits(
+            grid_import_w=int(data["grid_import_w"]),
+            grid_export_w=int(data["grid_export_w"]),
+            now=now,
+            loads=self._adapted_load_configs(now),
+            continuous_load=self._continuous_load_config(),
+        )
+
+    def _grid_limits_configured(self) -> bool:
+        """Return True when peak shaving or the export limit is active."""
+        return int(self._get_option(CONF_IMPORT_LIMIT_W, DEFAULT_IMPORT_LIMIT_W)) > 0 or bool(
+            self._get_option(CONF_EXPORT_LIMIT_ENABLED, DEFAULT_EXPORT_LIMIT_ENABLED)
+        )
+
+    async def _async_enforce_grid_limits(
+        self,
+        *,
+        grid_import_w: int,
+        grid_export_w: int,
+        now: datetime,
+        loads: list[LoadConfig],
+        continuous_load: ContinuousLoadConfig | None,
+        snapshot: CycleSnapshot | None = None,
+    ) -> bool:
+        """Run the fast import/export cap rules; return True when they acted."""
+        if not self._grid_limits_configured():
+            return False
+
+        runtimes = self._build_load_runtimes(loads, now=now)
+        loads, continuous_load, running_w = self._apply_constraints(loads, runtimes, continuous_load)
+        continuous = (
+            (continuous_load, self._build_continuous_runtime(continuous_load))
+            if continuous_load is not None
+            else None
+        )
+        import_limit_w = int(self._get_option(CONF_IMPORT_LIMIT_W, DEFAULT_IMPORT_LIMIT_W))
+        actions: list[EngineAction] = []
+        summary = "Peak shaving"
+        if import_limit_w > 0:
+            actions = decide_peak_shaving(
+                now=now,
+                grid_import_w=grid_import_w,
+                import_limit_w=import_limit_w,
+                safety_min_on_s=int(self._get_option(CONF_SAFETY_MIN_ON_S, DEFAULT_SAFETY_MIN_ON_S)),
+                loads=loads,
+                runtimes=runtimes,
+                continuous=continuous,
+                pending_off_w=pending_power_w(
+                    loads=loads, pending=self._pending_actions, target_on=False
+                ),
+            )
+        if not actions and self._get_option(CONF_EXPORT_LIMIT_ENABLED, DEFAULT_EXPORT_LIMIT_ENABLED):
+            curtailment_entity_id = str(self._get_option(CONF_CURTAILMENT_ENTITY, "") or "").strip()
+            if curtailment_entity_id and not self._controls(curtailment_entity_id):
+                curtailment_entity_id = ""
+            curtailment_state = (
+                self._state(curtailment_entity_id) if curtailment_entity_id else None
+            )
+            actions = decide_export_limit(
+                now=now,
+                grid_export_w=grid_export_w,
+                grid_import_w=grid_import_w,
+                export_limit_w=int(self._get_option(CONF_EXPORT_LIMIT_W, DEFAULT_EXPORT_LIMIT_W)),
+                release_hysteresis_w=DEFAULT_EXPORT_LIMIT_HYSTERESIS_W,
+                loads=loads,
+                runtimes=runtimes,
+                continuous=continuous,
+                curtailment_entity_id=curtailment_entity_id or None,
+                curtailed=bool(curtailment_state and curtailment_state.state == "on"),
+                constraints=self._constraint_index(),
+                running_w=running_w,
+                pending_on_w=pending_power_w(
+                    loads=loads, pending=self._pending_actions, target_on=True
+                ),
+            )
+            summary = "Export limit"
+        if not actions:
+            return False
+
+        for action in actions:
+            self._trace.record(now, "grid_limits", action, inputs=snapshot)
+            await self._async_execute_action(action, now=now)
+        self._last_action = (
+            f"{summary}: {', '.join(f'{action.action} {action.entity_id}' for action in actions)} "
+            f"({actions[0].reason})"
+        )
+        _LOGGER.info("Optimization action: %s", self._last_action)
+        return True
 
     async def async_set_optimization_enabled(self, enabled: bool) -> None:
         """Update optimization runtime status."""
         self._optimization_enabled = enabled
         if not enabled:
             self._last_action = "Optimization OFF"
-        self.async_set_updated_data({**(self.data or {}), "optimization_enabled": enabled})
+        self.changed_keys = frozenset({"optimization_enabled"})
+        if self.data is None:
+            self.async_update_listeners()
+            return
+        self.async_set_updated_data(replace(self.data, optimization_enabled=enabled))
 
     async def async_set_strategy(self, strategy: str) -> None:
         """Update optimization strategy runtime value."""
         self._strategy = strategy
-        self.async_set_updated_data({**(self.data or {}), "strategy": strategy})
+        self.changed_keys = frozenset({"strategy"})
+        if self.data is None:
+            self.async_update_listeners()
+            return
+        self.async_set_updated_data(replace(self.data, strategy=strategy))
 
-    def _real_values_from_entities(self) -> dict[str, int]:
-        """Read solar/load from mapped entities and derive all metrics in W."""
+    def _real_values_from_entities(self) -> dict[str, int | float]:
+        """Read solar/load/battery from mapped entities and derive all metrics in W."""
         solar_entity_id = str(self._get_option(CONF_SOLAR_POWER_ENTITY, "") or "")
         load_entity_id = str(self._get_option(CONF_LOAD_POWER_ENTITY, "") or "")
 
@@ -154,11 +768,45 @@ class EnergyControlProCoordinator(DataUpdateCoordinator[dict[str, int | str]]):
 
         solar_w = self._read_power_w(solar_entity_id)
         load_w = self._read_power_w(load_entity_id)
-        return calculate_balance(solar_w, load_w)
 
-    def _read_power_w(self, entity_id: str) -> int:
-        """Read one power entity in W and return a non-negative integer."""
-        state = self.hass.states.get(entity_id)
+        battery_entity_id = str(self._get_option(CONF_BATTERY_POWER_ENTITY, "") or "")
+        battery_w = (
+            self._read_battery_input(battery_entity_id, partial(self._read_power_w, signed=True))
+            if battery_entity_id
+            else None
+        )
+        data: dict[str, int | float] = calculate_balance(solar_w, load_w, int(battery_w or 0))
+
+        soc_entity_id = str(self._get_option(CONF_BATTERY_SOC_ENTITY, "") or "")
+        battery_soc_pct = (
+            self._read_battery_input(soc_entity_id, self._read_percentage) if soc_entity_id else None
+        )
+        if battery_soc_pct is not None:
+            data["battery_soc_pct"] = battery_soc_pct
+        return data
+
+    def _read_battery_input(self, entity_id: str, read: Callable[[str], float]) -> float | None:
+        """Read an optional battery entity, or return None while it is unreadable.
+
+        Solar and load are required, but a flaky battery sensor should not stop
+        the balance and the grid limits: it counts as idle with an unknown SOC.
+        """
+        try:
+            value = read(entity_id)
+        except UpdateFailed as err:
+            if entity_id not in self._unreadable_battery:
+                self._unreadable_battery.add(entity_id)
+                _LOGGER.warning("Ignoring battery input until it is readable again: %s", err)
+            return None
+        self._unreadable_battery.discard(entity_id)
+        return value
+
+    def _read_power_w(self, entity_id: str, *, signed: bool = False) -> int:
+        """Read one power entity in W and return an integer.
+
+        Values are clamped to zero unless ``signed`` is set (battery power).
+        """
+        state = self._state(entity_id)
         if state is None:
             raise UpdateFailed(f"Entity not found: {entity_id}")
 
@@ -177,9 +825,27 @@ class EnergyControlProCoordinator(DataUpdateCoordinator[dict[str, int | str]]):
         if unit == UnitOfPower.KILO_WATT:
             value = value * 1000
 
+        if signed:
+            return int(round(value))
         return max(0, int(round(value)))
 
-    async def _async_process_alerts(self, data: dict[str, int | str]) -> None:
+    def _read_percentage(self, entity_id: str) -> float:
+        """Read one percentage entity (battery SOC) clamped to 0-100."""
+        state = self._state(entity_id)
+        if state is None:
+            raise UpdateFailed(f"Entity not found: {entity_id}")
+
+        if state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            raise UpdateFailed(f"Entity state unavailable: {entity_id}")
+
+        try:
+            value = float(state.state)
+        except (TypeError, ValueError) as err:
+            raise UpdateFailed(f"Entity state is not numeric: {entity_id}") from err
+
+        return min(100.0, max(0.0, value))
+
+    async def _async_process_alerts(self, snapshot: CycleSnapshot) -> None:
         """Trigger persistent notifications when thresholds stay high long enough."""
         import_threshold_w = int(
             self._get_option(CONF_IMPORT_THRESHOLD_W, DEFAULT_IMPORT_THRESHOLD_W)
@@ -191,12 +857,12 @@ class EnergyControlProCoordinator(DataUpdateCoordinator[dict[str, int | str]]):
             self._get_option(CONF_DURATION_THRESHOLD_MIN, DEFAULT_DURATION_THRESHOLD_MIN)
         )
 
-        solar_w = int(data.get("solar_w", 0))
-        import_w = int(data.get("grid_import_w", 0))
-        export_w = int(data.get("grid_export_w", 0))
-        energy_state = str(data.get("energy_state", "balanced"))
-        import_duration_min = int(data.get("import_duration_min", 0))
-        export_duration_min = int(data.get("export_duration_min", 0))
+        solar_w = snapshot.solar_w
+        import_w = snapshot.grid_import_w
+        export_w = snapshot.grid_export_w
+        energy_state = snapshot.energy_state
+        import_duration_min = snapshot.import_duration_min
+        export_duration_min = snapshot.export_duration_min
 
         if should_trigger_export_alert(
             grid_export_w=export_w,
@@ -252,71 +918,216 @@ class EnergyControlProCoordinator(DataUpdateCoordinator[dict[str, int | str]]):
         if not import_condition:
             self._import_alert_sent = False
 
-    async def _async_run_optimization(self, data: dict[str, int | str], *, now: datetime) -> None:
+    async def _async_run_optimization(self, snapshot: CycleSnapshot, *, now: datetime) -> None:
         """Run load optimization cycle and perform one action at most."""
+        if self._arbiter is not None:
+            self._arbiter.offer(self._entry.entry_id, snapshot.surplus_w)
         if not self._optimization_enabled:
             return
 
-        loads = self._load_configs()
-        if not loads:
+        loads = self._adapted_load_configs(now)
+        continuous_load = self._continuous_load_config()
+        if await self._async_enforce_grid_limits(
+            grid_import_w=snapshot.grid_import_w,
+            grid_export_w=snapshot.grid_export_w,
+            now=now,
+            loads=loads,
+            continuous_load=continuous_load,
+            snapshot=snapshot,
+        ):
             return
+        thermal_load = self._thermal_load_config()
+        if thermal_load is not None and not self._controls(thermal_load.entity_id):
+            thermal_load = None
+        if not loads and continuous_load is None and thermal_load is None:
+            return
+        runtimes = self._build_load_runtimes(loads, now=now)
+        loads, continuous_load, _ = self._apply_constraints(loads, runtimes, continuous_load)
 
-        runtimes = self._build_load_runtimes(loads)
         import_threshold_w = int(self._get_option(CONF_IMPORT_THRESHOLD_W, DEFAULT_IMPORT_THRESHOLD_W))
         duration_threshold_min = int(
             self._get_option(CONF_DURATION_THRESHOLD_MIN, DEFAULT_DURATION_THRESHOLD_MIN)
         )
-        surplus_w = int(data.get("surplus_w", 0))
-        grid_import_w = int(data.get("grid_import_w", 0))
-        export_duration_min = int(data.get("export_duration_min", 0))
-        import_duration_min = int(data.get("import_duration_min", 0))
+        surplus_w, grid_import_w = self._battery_adjusted_power(
+            surplus_w=snapshot.surplus_w,
+            grid_import_w=snapshot.grid_import_w,
+            battery_w=snapshot.battery_w,
+            battery_soc_pct=snapshot.battery_soc_pct,
+        )
+        export_duration_min = snapshot.engine_export_duration_min
+        import_duration_min = snapshot.engine_import_duration_min
+        forecast_surplus_w = snapshot.forecast_surplus_w
 
-        if self._strategy == STRATEGY_AVOID_GRID_IMPORT:
-            action = decide_turn_off(
+        action = None
+        context: StrategyContext | None = None
+        source = "strategy"
+        if loads:
+            remaining_min = self._update_deferrable_runtime(loads, runtimes, now=now)
+            if remaining_min:
+                await self._async_replan_deferrable(loads, remaining_min, snapshot.load_w, now=now)
+                import_limit_w = int(self._get_option(CONF_IMPORT_LIMIT_W, DEFAULT_IMPORT_LIMIT_W))
+                action, protected = decide_deferrable(
+                    now=now,
+                    loads=loads,
+                    runtimes=runtimes,
+                    remaining_min=remaining_min,
+                    plans=self._deferrable_plans,
+                    margin_min=DEFAULT_DEFERRABLE_MARGIN_MIN,
+                    headroom_w=(
+                        import_limit_w - snapshot.grid_import_w if import_limit_w > 0 else None
+                    ),
+                )
+                if action is not None:
+                    self._trace.record(now, "deferrable", action, inputs=snapshot)
+                    await self._async_execute_action(
+                        action, now=now, reserve_from=None if action.forced else loads
+                    )
+                    return
+                # Loads running to meet a deadline are not available for shedding.
+                loads = [load for load in loads if load.entity_id not in protected]
+
+        if loads:
+            context = StrategyContext(
                 now=now,
+                surplus_w=surplus_w,
                 grid_import_w=grid_import_w,
+                export_duration_min=export_duration_min,
                 import_duration_min=import_duration_min,
                 import_threshold_w=import_threshold_w,
                 duration_threshold_min=duration_threshold_min,
                 loads=loads,
                 runtimes=runtimes,
-            ) or decide_turn_on(
+                forecast_surplus_w=forecast_surplus_w,
+                import_price=snapshot.import_price,
+                export_price=snapshot.export_price or 0.0,
+                cheapest_import_price=snapshot.cheapest_import_price,
+                mean_import_price=snapshot.mean_import_price,
+            )
+            strategy = get_strategy(self._strategy)
+            if self._get_option(CONF_SHADOW_MODE, DEFAULT_SHADOW_MODE):
+                if self._shadow is None:
+                    from .optimization.shadow import ShadowEvaluator
+
+                    self._shadow = ShadowEvaluator()
+                decisions = self._shadow.evaluate(
+                    context=context,
+                    strategies=STRATEGY_REGISTRY.values(),
+                    active=strategy.name,
+                    grid_import_w=snapshot.grid_import_w,
+                    grid_export_w=snapshot.grid_export_w,
+                )
+                action = decisions[strategy.name]
+            else:
+                action = self._decision_memo.decide(strategy, context)
+
+        # Switching a load shifts the surplus; re-track the setpoint next cycle.
+        if action is None and continuous_load is not None:
+            source = "continuous_load"
+            action = decide_continuous_setpoint(
                 now=now,
                 surplus_w=surplus_w,
-                export_duration_min=export_duration_min,
-                min_surplus_duration_min=duration_threshold_min,
-                loads=loads,
-                runtimes=runtimes,
+                load=continuous_load,
+                runtime=self._build_continuous_runtime(continuous_load),
             )
-        else:
-            action = decide_turn_on(
+        if action is None and thermal_load is not None:
+            source = "thermal_load"
+            action = decide_thermal_setpoint(
                 now=now,
                 surplus_w=surplus_w,
-                export_duration_min=export_duration_min,
-                min_surplus_duration_min=duration_threshold_min,
-                loads=loads,
-                runtimes=runtimes,
-            ) or decide_turn_off(
-                now=now,
-                grid_import_w=grid_import_w,
-                import_duration_min=import_duration_min,
-                import_threshold_w=import_threshold_w,
-                duration_threshold_min=duration_threshold_min,
-                loads=loads,
-                runtimes=runtimes,
+                load=thermal_load,
+                runtime=self._build_thermal_runtime(thermal_load),
             )
 
+        self._trace.record(
+            now,
+            source if action is not None else "strategy",
+            action,
+            inputs=snapshot,
+            strategy=self._strategy if context is not None else None,
+            context=context,
+        )
         if action is None:
             return
 
-        service = "turn_on" if action.action == "turn_on" else "turn_off"
+        await self._async_execute_action(action, now=now, reserve_from=loads)
+
+    async def _async_execute_action(
+        self,
+        action: EngineAction,
+        *,
+        now: datetime,
+        reserve_from: list[LoadConfig] | None = None,
+    ) -> None:
+        """Send the service call for one engine action and record it.
+
+        Starting a shared load first reserves its power, taken from the
+        cycle's ``reserve_from`` configs, from the pooled surplus. Without
+        them nothing is reserved: deadline-forced starts and grid limit
+        actions do not depend on surplus and must not wait for it.
+        """
+        if action.action == "set_power":
+            value_w = int(action.value or 0)
+            w_per_unit = max(
+                1,
+                int(self._get_option(CONF_CONTINUOUS_LOAD_W_PER_UNIT, DEFAULT_CONTINUOUS_LOAD_W_PER_UNIT)),
+            )
+            await self.hass.services.async_call(
+                action.entity_id.split(".", 1)[0],
+                "set_value",
+                {"entity_id": action.entity_id, "value": round(value_w / w_per_unit, 2)},
+                blocking=False,
+            )
+            self._continuous_setpoint_w = value_w
+            self._continuous_last_change = now
+            self._last_action = f"Set {action.entity_id} to {value_w}W ({action.reason})"
+            _LOGGER.info("Optimization action: %s", self._last_action)
+            return
+
+        if action.action == "set_temperature":
+            await self.hass.services.async_call(
+                action.entity_id.split(".", 1)[0],
+                "set_temperature",
+                {"entity_id": action.entity_id, "temperature": action.value},
+                blocking=False,
+            )
+            self._thermal_last_change = now
+            self._thermal_last_sent_c = action.value
+            self._last_action = f"Set {action.entity_id} to {action.value}°C ({action.reason})"
+            _LOGGER.info("Optimization action: %s", self._last_action)
+            return
+
+        if action.action in ("curtail", "release"):
+            await self.hass.services.async_call(
+                "homeassistant",
+                "turn_on" if action.action == "curtail" else "turn_off",
+                {"entity_id": action.entity_id},
+                blocking=False,
+            )
+            self._last_action = f"Curtailment {action.action} {action.entity_id} ({action.reason})"
+            _LOGGER.info("Optimization action: %s", self._last_action)
+            return
+
+        target_on = action.action == "turn_on"
+        pending = self._pending_actions.get(action.entity_id)
+        if pending is not None and pending.target_on == target_on:
+            # The same command is still in flight; do not send it again.
+            return
+        if (
+            target_on
+            and reserve_from is not None
+            and not self._reserve_shared_power(action.entity_id, reserve_from, now=now)
+        ):
+            self._last_action = f"Waiting for shared power budget to turn on {action.entity_id}"
+            return
+        service = "turn_on" if target_on else "turn_off"
         await self.hass.services.async_call(
             "homeassistant",
             service,
             {"entity_id": action.entity_id},
             blocking=False,
         )
-        if action.action == "turn_on":
+        self._pending_actions[action.entity_id] = PendingAction(target_on=target_on, issued_at=now)
+        if target_on:
             self._load_last_on[action.entity_id] = now
         else:
             self._load_last_off[action.entity_id] = now
@@ -324,65 +1135,423 @@ class EnergyControlProCoordinator(DataUpdateCoordinator[dict[str, int | str]]):
         self._last_action = (
             f"Turned {action.action.upper().replace('TURN_', '')} {action.entity_id} ({action.reason})"
         )
+        tracker = self._flap_tracker(action.entity_id)
+        if tracker.record_switch(now):
+            self._last_action = (
+                f"{self._last_action}; flapping detected ({tracker.flaps}x), "
+                f"timing x{tracker.multiplier(now)}"
+            )
         _LOGGER.info("Optimization action: %s", self._last_action)
 
-    def _load_configs(self) -> list[LoadConfig]:
-        """Read configured load slots from options."""
-        slots = (
-            (
-                CONF_LOAD_1_ENTITY,
-                CONF_LOAD_1_MIN_SURPLUS_W,
-                CONF_LOAD_1_MIN_ON_TIME_MIN,
-                CONF_LOAD_1_COOLDOWN_MIN,
-                CONF_LOAD_1_PRIORITY,
-                1,
-            ),
-            (
-                CONF_LOAD_2_ENTITY,
-                CONF_LOAD_2_MIN_SURPLUS_W,
-                CONF_LOAD_2_MIN_ON_TIME_MIN,
-                CONF_LOAD_2_COOLDOWN_MIN,
-                CONF_LOAD_2_PRIORITY,
-                2,
-            ),
-            (
-                CONF_LOAD_3_ENTITY,
-                CONF_LOAD_3_MIN_SURPLUS_W,
-                CONF_LOAD_3_MIN_ON_TIME_MIN,
-                CONF_LOAD_3_COOLDOWN_MIN,
-                CONF_LOAD_3_PRIORITY,
-                3,
-            ),
+    def _constraint_index(self) -> ConstraintIndex | None:
+        """Return the circuit constraint index, rebuilt only when the option changes."""
+        text = str(self._get_option(CONF_CONSTRAINT_GROUPS, "") or "")
+        if self._constraints is None or self._constraints[0] != text:
+            index: ConstraintIndex | None = None
+            if text.strip():
+                try:
+                    index = ConstraintIndex(parse_constraint_groups(text))
+                except ValueError as err:
+                    _LOGGER.warning("Ignoring circuit constraints: %s", err)
+            self._constraints = (text, index)
+        return self._constraints[1]
+
+    def _apply_constraints(
+        self,
+        loads: list[LoadConfig],
+        runtimes: dict[str, LoadRuntime],
+        continuous_load: ContinuousLoadConfig | None,
+    ) -> tuple[list[LoadConfig], ContinuousLoadConfig | None, dict[str, int]]:
+        """Drop loads that may not start and cap the variable load by circuit headroom.
+
+        Also returns the power of the loads now running, per entity.
+        """
+        running_w = {
+            load.entity_id: max(0, load.min_surplus_w)
+            for load in loads
+            if runtimes[load.entity_id].is_on
+        }
+        index = self._constraint_index()
+        if not index:
+            return loads, continuous_load, running_w
+
+        if continuous_load is not None:
+            headroom_w = index.headroom_w(continuous_load.entity_id, index.usage(running_w))
+            if headroom_w is not None and headroom_w < continuous_load.max_power_w:
+                continuous_load = replace(continuous_load, max_power_w=headroom_w)
+            if self._continuous_setpoint_w > 0:
+                running_w[continuous_load.entity_id] = self._continuous_setpoint_w
+        blocked = index.blocked(
+            running_w,
+            {
+                load.entity_id: max(0, load.min_surplus_w)
+                for load in loads
+                if not runtimes[load.entity_id].is_on
+            },
         )
+        return [load for load in loads if load.entity_id not in blocked], continuous_load, running_w
+
+    def _flap_tracker(self, entity_id: str) -> FlapTracker:
+        """Return the switch history of one load, creating it on first use."""
+        tracker = self._flap_trackers.get(entity_id)
+        if tracker is None:
+            tracker = self._flap_trackers[entity_id] = FlapTracker(
+                max_switches=DEFAULT_FLAP_SWITCHES,
+                window_s=DEFAULT_FLAP_WINDOW_MIN * 60,
+                decay_s=DEFAULT_FLAP_DECAY_MIN * 60,
+                max_level=DEFAULT_FLAP_MAX_LEVEL,
+            )
+        return tracker
+
+    def _load_configs(self) -> list[LoadConfig]:
+        """Read configured load slots from options.
+
+        A learned power draw replaces the configured ``min_surplus_w``.
+        """
         loads: list[LoadConfig] = []
-        for entity_key, surplus_key, min_on_key, cooldown_key, priority_key, default_priority in slots:
-            entity_id = str(self._get_option(entity_key, "") or "").strip()
-            if not entity_id:
+        for default_priority, slot in enumerate(LOAD_SLOTS, start=1):
+            entity_id = str(self._get_option(slot["entity"], "") or "").strip()
+            if not entity_id or not self._controls(entity_id):
                 continue
+            learned_w = self._power_learner.estimate_w(entity_id)
             loads.append(
                 LoadConfig(
                     entity_id=entity_id,
-                    min_surplus_w=int(self._get_option(surplus_key, DEFAULT_LOAD_MIN_SURPLUS_W)),
-                    min_on_time_min=int(self._get_option(min_on_key, DEFAULT_LOAD_MIN_ON_TIME_MIN)),
-                    cooldown_min=int(self._get_option(cooldown_key, DEFAULT_LOAD_COOLDOWN_MIN)),
-                    priority=int(self._get_option(priority_key, default_priority)),
+                    min_surplus_w=(
+                        learned_w
+                        if learned_w is not None
+                        else int(self._get_option(slot["min_surplus_w"], DEFAULT_LOAD_MIN_SURPLUS_W))
+                    ),
+                    min_on_time_min=int(
+                        self._get_option(slot["min_on_time_min"], DEFAULT_LOAD_MIN_ON_TIME_MIN)
+                    ),
+                    cooldown_min=int(self._get_option(slot["cooldown_min"], DEFAULT_LOAD_COOLDOWN_MIN)),
+                    priority=int(self._get_option(slot["priority"], default_priority)),
+                    required_runtime_min=int(
+                        self._get_option(slot["required_runtime_min"], DEFAULT_LOAD_REQUIRED_RUNTIME_MIN)
+                    ),
+                    deadline=parse_deadline(self._get_option(slot["deadline"], "")),
                 )
             )
         return loads
 
-    def _build_load_runtimes(self, loads: list[LoadConfig]) -> dict[str, LoadRuntime]:
-        """Build runtime map for configured loads from HA states and timers."""
+    def _adapted_load_configs(self, now: datetime) -> list[LoadConfig]:
+        """Return the controlled loads with cooldown and min-on time stretched while flapping."""
+        return [
+            adapt_load(load, self._flap_tracker(load.entity_id).multiplier(now))
+            for load in self._load_configs()
+        ]
+
+    def _build_load_runtimes(self, loads: list[LoadConfig], *, now: datetime) -> dict[str, LoadRuntime]:
+        """Build runtime map for configured loads from HA states and timers.
+
+        Loads with a command still in flight are reported in their target state.
+        ``loads`` must already carry their flap-adapted timing, so the fast path
+        and the regular cycle keep the same timer for a load.
+        """
         runtimes: dict[str, LoadRuntime] = {}
+        self._eligibility.expire(now)
         for load in loads:
-            state = self.hass.states.get(load.entity_id)
-            is_on = bool(state and state.state == "on")
-            runtimes[load.entity_id] = LoadRuntime(
+            state = self._state(load.entity_id)
+            state_on = bool(state and state.state == "on")
+            pending = self._pending_actions.get(load.entity_id)
+            is_on, keep_pending = resolve_pending(
+                now=now,
+                is_on=state_on,
+                pending=pending,
+                timeout_s=DEFAULT_PENDING_ACTION_TIMEOUT_S,
+            )
+            if pending is not None and not keep_pending:
+                del self._pending_actions[load.entity_id]
+                if state_on != pending.target_on:
+                    _LOGGER.warning(
+                        "%s did not confirm %s within %s s; it may be retried",
+                        load.entity_id,
+                        "ON" if pending.target_on else "OFF",
+                        DEFAULT_PENDING_ACTION_TIMEOUT_S,
+                    )
+            runtime = LoadRuntime(
                 is_on=is_on,
                 last_on=self._load_last_on.get(load.entity_id),
                 last_off=self._load_last_off.get(load.entity_id),
             )
+            timer_inputs = (
+                is_on, runtime.last_on, runtime.last_off, load.min_on_time_min, load.cooldown_min
+            )
+            if self._timer_inputs.get(load.entity_id) != timer_inputs:
+                # Switched, or its timing changed (options, flap adaptation).
+                self._timer_inputs[load.entity_id] = timer_inputs
+                self._eligibility.schedule(load.entity_id, timer_expires_at(load, runtime), now=now)
+            runtimes[load.entity_id] = replace(
+                runtime, timer_expired=self._eligibility.is_eligible(load.entity_id)
+            )
         return runtimes
 
+    def _update_deferrable_runtime(
+        self,
+        loads: list[LoadConfig],
+        runtimes: dict[str, LoadRuntime],
+        *,
+        now: datetime,
+    ) -> dict[str, float]:
+        """Accumulate ON time per deferrable load and return minutes still required.
+
+        Each load's window runs from one deadline to the next; the counter resets
+        when the deadline passes.
+        """
+        elapsed_s = 0.0
+        if self._last_cycle is not None:
+            # Cap gaps (restarts, stalls) so they are not counted as runtime.
+            elapsed_s = min(60.0, max(0.0, (now - self._last_cycle).total_seconds()))
+        self._last_cycle = now
+
+        remaining_min: dict[str, float] = {}
+        for load in loads:
+            if load.required_runtime_min <= 0 or load.deadline is None:
+                continue
+            period_end = self._deferrable_period_end.get(load.entity_id)
+            if period_end is None or now >= period_end:
+                self._deferrable_period_end[load.entity_id] = next_deadline(now, load.deadline)
+                self._deferrable_runtime_s[load.entity_id] = 0.0
+            elif runtimes[load.entity_id].is_on:
+                self._deferrable_runtime_s[load.entity_id] += elapsed_s
+            remaining_min[load.entity_id] = max(
+                0.0, load.required_runtime_min - self._deferrable_runtime_s[load.entity_id] / 60
+            )
+        return remaining_min
+
+    async def _async_replan_deferrable(
+        self,
+        loads: list[LoadConfig],
+        remaining_min: dict[str, float],
+        load_w: int,
+        *,
+        now: datetime,
+    ) -> None:
+        """Replan deferrable loads whose inputs changed, in the executor.
+
+        A load is replanned when the forecast updates, its deadline window rolls
+        over, its remaining slot count changes or its plan no longer covers the
+        remaining runtime. Without a solar forecast only the deadline guarantee
+        applies.
+
+        The cycle waits at most ``DEFAULT_PLANNING_DEADLINE_S`` for the plan. On
+        a miss the previous plans are kept, loads without a plan fall back to
+        the deadline guarantee and the strategy rules, and the late plan is
+        adopted by the next cycle before anything is replanned. A planning error
+        is logged and handled like a miss.
+        """
+        forecast = self._forecast
+        if forecast is None:
+            self._deferrable_plans = {}
+            self._deferrable_plan_keys = {}
+            return
+
+        current_slot = slot_start(now)
+        dirty: set[str] = set()
+        keys: dict[str, tuple] = {}
+        for entity_id, remaining in remaining_min.items():
+            needed = math.ceil(remaining / SLOT_MINUTES)
+            key = (self._forecast_updated, self._deferrable_period_end.get(entity_id), needed)
+            plan = self._deferrable_plans.get(entity_id)
+            covered = (
+                sum(1 for start in plan.slot_starts if start >= current_slot) if plan is not None else 0
+            )
+            if self._deferrable_plan_keys.get(entity_id) != key or covered < needed:
+                dirty.add(entity_id)
+                keys[entity_id] = key
+        late = self._planner.busy
+        if not dirty and not late:
+            return
+
+        # The loop keeps learning while the executor plans, so plan on a snapshot.
+        profile = self._load_profile.copy()
+
+        def _slot_surplus_w(start: datetime) -> float:
+            expected_load_w = profile.forecast_w(start, SLOT_MINUTES)
+            return forecast.average_w(start.timestamp(), SLOT_MINUTES) - (
+                expected_load_w if expected_load_w is not None else load_w
+            )
+
+        try:
+            ready, plans = await self._planner.run(
+                partial(
+                    self.hass.async_add_executor_job,
+                    partial(
+                        plan_deferrable_loads,
+                        now=now,
+                        loads=loads,
+                        remaining_min=remaining_min,
+                        slot_surplus_w=_slot_surplus_w,
+                        existing=dict(self._deferrable_plans),
+                        dirty=dirty,
+                        time_budget_s=DEFAULT_PLANNING_TIME_BUDGET_S,
+                    ),
+                ),
+                deadline_s=DEFAULT_PLANNING_DEADLINE_S,
+            )
+        except Exception:  # noqa: BLE001 - a planning error must not fail the refresh
+            # Counted as a miss by the planner; logged once until planning recovers.
+            if not self._planning_failed:
+                _LOGGER.exception("Deferrable planning failed; keeping the previous plans")
+            self._planning_failed = True
+            return
+        self._planning_failed = False
+        if not late:
+            # Only inputs that were actually submitted count as planned.
+            self._deferrable_plan_keys.update(keys)
+        if not ready:
+            _LOGGER.debug("Deferrable planning missed its %.1f s deadline", DEFAULT_PLANNING_DEADLINE_S)
+            return
+        self._deferrable_plans = plans
+
+    def _forecast_surplus_w(self, load_w: int, *, now: datetime) -> int | None:
+        """Return expected surplus over the forecast horizon, or None without a forecast.
+
+        The forecast attributes are parsed only when the entity state changes;
+        each cycle is then a binary-search lookup.
+        """
+        entity_id = str(self._get_option(CONF_SOLAR_FORECAST_ENTITY, "") or "").strip()
+        if not entity_id:
+            return None
+        state = self._state(entity_id)
+        if state is None:
+            self._forecast = None
+            self._forecast_updated = None
+            return None
+        if state.last_updated != self._forecast_updated:
+            from .optimization.forecast import parse_forecast_attributes
+
+            self._forecast = parse_forecast_attributes(state.attributes)
+            self._forecast_updated = state.last_updated
+        if self._forecast is None:
+            return None
+
+        horizon_min = int(self._get_option(CONF_FORECAST_HORIZON_MIN, DEFAULT_FORECAST_HORIZON_MIN))
+        solar_w = self._forecast.average_w(now.timestamp(), horizon_min)
+        return int(round(solar_w)) - load_w
+
+    def _price_timeline(self, entity_id: str) -> tuple[float | None, PriceTimeline | None]:
+        """Return (current state price, schedule timeline) for a price entity.
+
+        The schedule attributes are parsed only when the entity state changes.
+        """
+        state = self._state(entity_id)
+        if state is None:
+            self._price_timelines.pop(entity_id, None)
+            return None, None
+        cached = self._price_timelines.get(entity_id)
+        if cached is None or cached[0] != state.last_updated:
+            from .optimization.tariff import parse_price_attributes
+
+            lookahead_h = int(self._get_option(CONF_PRICE_LOOKAHEAD_H, DEFAULT_PRICE_LOOKAHEAD_H))
+            cached = (state.last_updated, parse_price_attributes(state.attributes, lookahead_h * 4))
+            self._price_timelines[entity_id] = cached
+        try:
+            current = float(state.state)
+        except (TypeError, ValueError):
+            current = None
+        return current, cached[1]
+
+    def _price_data(self, *, now: datetime) -> dict[str, float]:
+        """Return current and lookahead import/export prices, empty without price data."""
+        import_entity_id = str(self._get_option(CONF_IMPORT_PRICE_ENTITY, "") or "").strip()
+        if not import_entity_id:
+            return {}
+        ts = now.timestamp()
+        current, timeline = self._price_timeline(import_entity_id)
+        import_price = timeline.price_at(ts) if timeline is not None else None
+        if import_price is None:
+            if current is None:
+                return {}
+            import_price = cheapest = mean = current
+        else:
+            cheapest = timeline.cheapest_ahead(ts)
+            mean = timeline.mean_ahead(ts)
+        prices = {
+            "import_price": import_price,
+            "cheapest_import_price": cheapest,
+            "mean_import_price": mean,
+        }
+
+        export_entity_id = str(self._get_option(CONF_EXPORT_PRICE_ENTITY, "") or "").strip()
+        if export_entity_id:
+            current, timeline = self._price_timeline(export_entity_id)
+            export_price = timeline.price_at(ts) if timeline is not None else None
+            if export_price is None:
+                export_price = current
+            if export_price is not None:
+                prices["export_price"] = export_price
+        return prices
+
+    def _continuous_load_config(self) -> ContinuousLoadConfig | None:
+        """Read the optional setpoint-driven load from options."""
+        entity_id = str(self._get_option(CONF_CONTINUOUS_LOAD_ENTITY, "") or "").strip()
+        if not entity_id or not self._controls(entity_id):
+            return None
+        return ContinuousLoadConfig(
+            entity_id=entity_id,
+            min_power_w=int(
+                self._get_option(CONF_CONTINUOUS_LOAD_MIN_POWER_W, DEFAULT_CONTINUOUS_LOAD_MIN_POWER_W)
+            ),
+            max_power_w=int(
+                self._get_option(CONF_CONTINUOUS_LOAD_MAX_POWER_W, DEFAULT_CONTINUOUS_LOAD_MAX_POWER_W)
+            ),
+            step_w=int(self._get_option(CONF_CONTINUOUS_LOAD_STEP_W, DEFAULT_CONTINUOUS_LOAD_STEP_W)),
+            deadband_w=int(
+                self._get_option(CONF_CONTINUOUS_LOAD_DEADBAND_W, DEFAULT_CONTINUOUS_LOAD_DEADBAND_W)
+            ),
+            rate_limit_s=int(
+                self._get_option(CONF_CONTINUOUS_LOAD_RATE_LIMIT_S, DEFAULT_CONTINUOUS_LOAD_RATE_LIMIT_S)
+            ),
+        )
+
+    def _build_continuous_runtime(self, load: ContinuousLoadConfig) -> ContinuousLoadRuntime:
+        """Build setpoint runtime from the entity value, falling back to the last sent one."""
+        setpoint_w = self._continuous_setpoint_w
+        state = self._state(load.entity_id)
+        if state is not None:
+            try:
+                w_per_unit = max(
+                    1,
+                    int(self._get_option(CONF_CONTINUOUS_LOAD_W_PER_UNIT, DEFAULT_CONTINUOUS_LOAD_W_PER_UNIT)),
+                )
+                setpoint_w = int(round(float(state.state) * w_per_unit))
+            except (TypeError, ValueError):
+                pass
+        return ContinuousLoadRuntime(setpoint_w=setpoint_w, last_change=self._continuous_last_change)
+
+    def _thermal_load_config(self) -> ThermalLoadConfig | None:
+        """Read the optional heat-storage load from options."""
+        entity_id = str(self._get_option(CONF_THERMAL_LOAD_ENTITY, "") or "").strip()
+        if not entity_id:
+            return None
+        return ThermalLoadConfig(
+            entity_id=entity_id,
+            normal_temp_c=int(
+                self._get_option(CONF_THERMAL_LOAD_NORMAL_TEMP_C, DEFAULT_THERMAL_LOAD_NORMAL_TEMP_C)
+            ),
+            boost_temp_c=int(
+                self._get_option(CONF_THERMAL_LOAD_BOOST_TEMP_C, DEFAULT_THERMAL_LOAD_BOOST_TEMP_C)
+            ),
+            power_w=int(self._get_option(CONF_THERMAL_LOAD_POWER_W, DEFAULT_THERMAL_LOAD_POWER_W)),
+            volume_l=int(self._get_option(CONF_THERMAL_LOAD_VOLUME_L, DEFAULT_THERMAL_LOAD_VOLUME_L)),
+            rate_limit_s=int(
+                self._get_option(CONF_THERMAL_LOAD_RATE_LIMIT_S, DEFAULT_THERMAL_LOAD_RATE_LIMIT_S)
+            ),
+        )
+
+    def _build_thermal_runtime(self, load: ThermalLoadConfig) -> ThermalLoadRuntime:
+        """Build heat-storage runtime from the climate/water_heater attributes."""
+        state = self._state(load.entity_id)
+        attributes = state.attributes if state is not None else {}
+        return ThermalLoadRuntime(
+            target_temp_c=_attribute_number(attributes, "temperature"),
+            current_temp_c=_attribute_number(attributes, "current_temperature"),
+            last_change=self._thermal_last_change,
+            last_sent_c=self._thermal_last_sent_c,
+        )
+
     def _get_option(self, key: str, default: int | bool | str) -> int | bool | str:
         """Return current option value, falling back to entry data/default."""
         return self._entry.options.get(key, self._entry.data.get(key, default))
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from datetime import datetime
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
@@ -27,10 +29,38 @@ async def async_get_config_entry_diagnostics(
                 k: v.isoformat() for k, v in getattr(coordinator, "_load_last_off", {}).items()
             },
         }
+        now = datetime.now()
+        runtime["flapping"] = {
+            entity_id: {"flaps": tracker.flaps, "timing_multiplier": tracker.multiplier(now)}
+            for entity_id, tracker in getattr(coordinator, "_flap_trackers", {}).items()
+        }
+        power_learner = getattr(coordinator, "_power_learner", None)
+        if power_learner is not None:
+            runtime["load_power"] = power_learner.as_dict()
+        changed, published = getattr(coordinator, "_publish_stats", (0, 0))
+        runtime["published_values"] = {"changed": changed, "unchanged": published - changed}
+        decision_memo = getattr(coordinator, "_decision_memo", None)
+        if decision_memo is not None:
+            runtime["decision_memo"] = decision_memo.stats()
+        runtime["startup"] = dict(getattr(coordinator, "startup_timings", {}))
+        trace = getattr(coordinator, "_trace", None)
+        if trace is not None:
+            runtime["decision_trace"] = trace.as_list()
+        planner = getattr(coordinator, "_planner", None)
+        if planner is not None:
+            runtime["planning"] = planner.stats()
+        arbiter = getattr(coordinator, "_arbiter", None)
+        if arbiter is not None:
+            runtime["shared_loads"] = arbiter.as_dict()
+        shadow = getattr(coordinator, "_shadow", None)
+        if shadow is not None:
+            runtime["shadow"] = shadow.metrics()
 
     return {
         "entry_data": entry.data,
         "entry_options": entry.options,
         "runtime": runtime,
-        "coordinator_data": coordinator.data if coordinator is not None else None,
+        "coordinator_data": (
+            coordinator.data.as_dict() if coordinator is not None and coordinator.data else None
+        ),
     }
@@ -0,0 +1,24 @@
+"""Base entity for Energy Control Pro."""
+
+from __future__ import annotations
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import EnergyControlProCoordinator
+
+
+class EnergyControlProEntity(CoordinatorEntity[EnergyControlProCoordinator]):
+    """Entity backed by one coordinator data key, written only when it changes."""
+
+    _data_key: str
+    _written_available: bool | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this entity's value or availability changed."""
+        available = self.available
+        if available == self._written_available and not self.coordinator.data_changed(self._data_key):
+            return
+        self._written_available = available
+        self.async_write_ha_state()
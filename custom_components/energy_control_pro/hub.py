@@ -0,0 +1,84 @@
+"""Shared scheduler for all Energy Control Pro config entries."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DEFAULT_PENDING_ACTION_TIMEOUT_S, HUB_SLICES, UPDATE_INTERVAL_S
+from .optimization.arbiter import LoadArbiter
+
+if TYPE_CHECKING:
+    from .coordinator import EnergyControlProCoordinator
+
+
+class EnergyControlProHub:
+    """Tick every entry's coordinator from one timer.
+
+    The update interval is split into ``slices`` sub-ticks and each member is
+    assigned to the least busy slice, so many entries refresh in small even
+    batches instead of bursts of independently drifting timers. Each sub-tick
+    reads the union of its members' input entities once and hands the same
+    states to all of them.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        interval: timedelta = timedelta(seconds=UPDATE_INTERVAL_S),
+        slices: int = HUB_SLICES,
+    ) -> None:
+        """Create an idle hub; the timer starts with the first member."""
+        self._hass = hass
+        self._interval = interval
+        self._slices: list[list[EnergyControlProCoordinator]] = [[] for _ in range(max(1, slices))]
+        self._next_slice = 0
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        # Shared loads between entries, see LoadArbiter.
+        self.arbiter = LoadArbiter(settle_s=DEFAULT_PENDING_ACTION_TIMEOUT_S)
+        # [sub-ticks run, member refreshes, distinct state reads]
+        self.stats = [0, 0, 0]
+
+    def __len__(self) -> int:
+        return sum(len(members) for members in self._slices)
+
+    @callback
+    def async_register(self, member: EnergyControlProCoordinator) -> CALLBACK_TYPE:
+        """Add ``member`` to the least busy slice; return a callback removing it."""
+        members = min(self._slices, key=len)
+        members.append(member)
+        if self._unsub_timer is None:
+            self._unsub_timer = async_track_time_interval(
+                self._hass,
+                self._async_tick,
+                self._interval / len(self._slices),
+                name="Energy Control Pro hub",
+                cancel_on_shutdown=True,
+            )
+
+        @callback
+        def _unregister() -> None:
+            members.remove(member)
+            if not len(self) and self._unsub_timer is not None:
+                self._unsub_timer()
+                self._unsub_timer = None
+
+        return _unregister
+
+    async def _async_tick(self, _now: datetime | None = None) -> None:
+        """Refresh the members of the next slice from one read of their inputs."""
+        members = self._slices[self._next_slice]
+        self._next_slice = (self._next_slice + 1) % len(self._slices)
+        if not members:
+            return
+        entity_ids = {entity_id for member in members for entity_id in member.input_entity_ids()}
+        states = {entity_id: self._hass.states.get(entity_id) for entity_id in entity_ids}
+        self.stats[0] += 1
+        self.stats[1] += len(members)
+        self.stats[2] += len(states)
+        await asyncio.gather(*(member.async_refresh_with_states(states) for member in tuple(members)))
@@ -92,15 +92,20 @@ def simulate(
     return solar_w, load_w
 
 
-def calculate_balance(solar_w: int, load_w: int) -> dict[str, int]:
-    """Calculate surplus/import/export values from solar and load power."""
-    surplus_w = solar_w - load_w
+def calculate_balance(solar_w: int, load_w: int, battery_w: int = 0) -> dict[str, int]:
+    """Calculate surplus/import/export values from solar, load and battery power.
+
+    ``battery_w`` is positive while the battery charges and negative while it
+    discharges, so ``surplus_w`` is the net power flowing to the grid.
+    """
+    surplus_w = solar_w - load_w - battery_w
     grid_import_w = max(0, -surplus_w)
     grid_export_w = max(0, surplus_w)
 
     return {
         "solar_w": solar_w,
         "load_w": load_w,
+        "battery_w": battery_w,
         "surplus_w": surplus_w,
         "grid_import_w": grid_import_w,
         "grid_export_w": grid_export_w,
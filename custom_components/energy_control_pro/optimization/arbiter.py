@@ -0,0 +1,94 @@
+"""Arbitration of loads shared between config entries."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+
+class LoadArbiter:
+    """Single controller per entity and a shared power pool across entries.
+
+    An entity listed by several entries is controlled by the entry that
+    registered it first; the others leave it alone until that entry is
+    unloaded, so two entries never drive the same switch in opposite
+    directions. Entries offer their surplus every cycle, and starting a shared
+    load reserves its power from the offers of the entries sharing it until
+    ``settle_s`` has passed and their readings include the new load.
+
+    Every call is a few dict operations on the event loop; nothing waits or
+    locks, and entities listed by a single entry skip the pool entirely.
+    """
+
+    __slots__ = ("_owners", "_offers", "_reservations", "_settle")
+
+    def __init__(self, *, settle_s: float) -> None:
+        """Create an arbiter without registered entries."""
+        self._owners: dict[str, list[str]] = {}
+        self._offers: dict[str, int] = {}
+        # entity id -> (owners sharing it, reserved W, expires at)
+        self._reservations: dict[str, tuple[tuple[str, ...], int, datetime]] = {}
+        self._settle = timedelta(seconds=settle_s)
+
+    def register(self, owner: str, entity_ids: Iterable[str]) -> None:
+        """Record the entities ``owner`` wants to control."""
+        for entity_id in entity_ids:
+            owners = self._owners.setdefault(entity_id, [])
+            if owner not in owners:
+                owners.append(owner)
+
+    def unregister(self, owner: str) -> None:
+        """Release everything held by ``owner``; the next entry takes over."""
+        for entity_id in [entity_id for entity_id, owners in self._owners.items() if owner in owners]:
+            owners = self._owners[entity_id]
+            owners.remove(owner)
+            if not owners:
+                del self._owners[entity_id]
+        self._offers.pop(owner, None)
+        for entity_id in [
+            entity_id for entity_id, item in self._reservations.items() if item[0][0] == owner
+        ]:
+            del self._reservations[entity_id]
+
+    def controls(self, owner: str, entity_id: str) -> bool:
+        """Return True when ``owner`` may act on ``entity_id``."""
+        owners = self._owners.get(entity_id)
+        return not owners or owners[0] == owner
+
+    def is_shared(self, entity_id: str) -> bool:
+        """Return True when more than one entry lists ``entity_id``."""
+        return len(self._owners.get(entity_id, ())) > 1
+
+    def offer(self, owner: str, surplus_w: int) -> None:
+        """Publish the surplus ``owner`` measured this cycle (negative while importing)."""
+        self._offers[owner] = surplus_w
+
+    def available_w(self, entity_id: str, *, now: datetime) -> int:
+        """Return the pooled surplus left for ``entity_id`` after unsettled reservations."""
+        owners = self._owners.get(entity_id, ())
+        pooled_w = sum(self._offers.get(owner, 0) for owner in owners)
+        for reserved_id, (sharing, power_w, expires_at) in list(self._reservations.items()):
+            if expires_at <= now:
+                del self._reservations[reserved_id]
+            elif any(owner in sharing for owner in owners):
+                pooled_w -= power_w
+        return pooled_w
+
+    def reserve(self, owner: str, entity_id: str, power_w: int, *, now: datetime) -> bool:
+        """Reserve ``power_w`` from the pool to start ``entity_id``; False when it does not fit."""
+        if not self.controls(owner, entity_id):
+            return False
+        if not self.is_shared(entity_id):
+            return True
+        if power_w > self.available_w(entity_id, now=now):
+            return False
+        self._reservations[entity_id] = (tuple(self._owners[entity_id]), power_w, now + self._settle)
+        return True
+
+    def as_dict(self) -> dict[str, dict[str, object]]:
+        """Return the shared entities with their controller, for diagnostics."""
+        return {
+            entity_id: {"controller": owners[0], "entries": len(owners)}
+            for entity_id, owners in self._owners.items()
+            if len(owners) > 1
+        }
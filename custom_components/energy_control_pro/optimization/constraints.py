@@ -0,0 +1,115 @@
+"""Shared-circuit and mutual-exclusion constraints between loads."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+
+EXCLUSIVE = "exclusive"
+
+
+@dataclass(frozen=True)
+class ConstraintGroup:
+    """Loads that share a limit: combined power and/or how many may run."""
+
+    entity_ids: tuple[str, ...]
+    max_power_w: int | None = None
+    max_running: int | None = None
+
+
+def parse_constraint_groups(text: str) -> list[ConstraintGroup]:
+    """Parse one group per line: ``<max W>: a, b`` or ``exclusive: a, b``.
+
+    Blank lines and lines starting with ``#`` are ignored. Raises ValueError
+    for malformed lines.
+    """
+    groups: list[ConstraintGroup] = []
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith("#"):
+            continue
+        limit, separator, members = line.partition(":")
+        entity_ids = tuple(dict.fromkeys(item.strip() for item in members.split(",") if item.strip()))
+        if not separator or len(entity_ids) < 2 or any("." not in item for item in entity_ids):
+            raise ValueError(f"Invalid constraint line: {line}")
+        limit = limit.strip().lower()
+        if limit == EXCLUSIVE:
+            groups.append(ConstraintGroup(entity_ids, max_running=1))
+            continue
+        try:
+            max_power_w = int(limit.removesuffix("w").strip())
+        except ValueError as err:
+            raise ValueError(f"Invalid constraint limit: {line}") from err
+        if max_power_w <= 0:
+            raise ValueError(f"Invalid constraint limit: {line}")
+        groups.append(ConstraintGroup(entity_ids, max_power_w=max_power_w))
+    return groups
+
+
+class ConstraintIndex:
+    """Groups indexed by member load, built once per configuration.
+
+    Checking a candidate only visits the groups it belongs to, and the
+    per-group usage is computed once per cycle, so the cost does not grow
+    with the number of unrelated loads or groups.
+    """
+
+    __slots__ = ("_groups", "_by_entity")
+
+    def __init__(self, groups: Iterable[ConstraintGroup]) -> None:
+        """Index the groups by entity id."""
+        self._groups = tuple(groups)
+        by_entity: dict[str, list[int]] = {}
+        for index, group in enumerate(self._groups):
+            for entity_id in group.entity_ids:
+                by_entity.setdefault(entity_id, []).append(index)
+        self._by_entity = {entity_id: tuple(indices) for entity_id, indices in by_entity.items()}
+
+    def __bool__(self) -> bool:
+        return bool(self._groups)
+
+    def usage(self, running_w: Mapping[str, int]) -> list[list[int]]:
+        """Return [power W, running count] per group for the loads now ON."""
+        usage = [[0, 0] for _ in self._groups]
+        for entity_id, power_w in running_w.items():
+            for index in self._by_entity.get(entity_id, ()):
+                usage[index][0] += power_w
+                usage[index][1] += 1
+        return usage
+
+    def fits(self, entity_id: str, power_w: int, usage: list[list[int]]) -> bool:
+        """Return True when starting ``entity_id`` keeps all its groups within limits."""
+        for index in self._by_entity.get(entity_id, ()):
+            group = self._groups[index]
+            if group.max_power_w is not None and usage[index][0] + power_w > group.max_power_w:
+                return False
+            if group.max_running is not None and usage[index][1] + 1 > group.max_running:
+                return False
+        return True
+
+    def add(self, entity_id: str, power_w: int, usage: list[list[int]]) -> None:
+        """Account for ``entity_id`` starting within this cycle."""
+        for index in self._by_entity.get(entity_id, ()):
+            usage[index][0] += power_w
+            usage[index][1] += 1
+
+    def headroom_w(self, entity_id: str, usage: list[list[int]]) -> int | None:
+        """Return the power ``entity_id`` may add, None when it is unconstrained."""
+        headroom: int | None = None
+        for index in self._by_entity.get(entity_id, ()):
+            group = self._groups[index]
+            if group.max_running is not None and usage[index][1] >= group.max_running:
+                return 0
+            if group.max_power_w is not None:
+                left_w = max(0, group.max_power_w - usage[index][0])
+                headroom = left_w if headroom is None else min(headroom, left_w)
+        return headroom
+
+    def blocked(self, running_w: Mapping[str, int], candidates_w: Mapping[str, int]) -> set[str]:
+        """Return the OFF candidates that may not start with the current loads ON."""
+        usage = self.usage(running_w)
+        return {
+            entity_id
+            for entity_id, power_w in candidates_w.items()
+            if not self.fits(entity_id, power_w, usage)
+        }
@@ -0,0 +1,60 @@
+"""Run expensive optimization steps off the event loop under a per-cycle deadline."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class DeadlineRunner:
+    """Wait at most ``deadline_s`` for one background job at a time.
+
+    A job that misses the deadline is not cancelled: the caller keeps its
+    best-so-far answer for this cycle, no new job is started while it runs,
+    and a later call returns its result once it has finished. A slow step
+    therefore never stalls a cycle and never piles up work in the executor.
+    """
+
+    __slots__ = ("_job", "runs", "misses", "late")
+
+    def __init__(self) -> None:
+        """Create a runner without a job."""
+        self._job: asyncio.Future[Any] | None = None
+        self.runs = 0
+        self.misses = 0
+        # Results delivered by a call after the one that started the job.
+        self.late = 0
+
+    @property
+    def busy(self) -> bool:
+        """Return True while a job that missed its deadline is still pending."""
+        return self._job is not None
+
+    async def run(self, start: Callable[[], Awaitable[Any]], *, deadline_s: float) -> tuple[bool, Any]:
+        """Return (True, result), or (False, None) when the job is not ready in time.
+
+        ``start`` is only called when no earlier job is pending, so its result
+        may belong to a previous call's inputs when ``busy`` was True. An
+        exception raised by the job is counted as a miss and re-raised once.
+        """
+        late = self._job is not None
+        if self._job is None:
+            self._job = asyncio.ensure_future(start())
+            self.runs += 1
+        job = self._job
+        if not job.done():
+            await asyncio.wait((job,), timeout=deadline_s)
+            if not job.done():
+                self.misses += 1
+                return False, None
+        self._job = None
+        self.late += late
+        if job.exception() is not None:
+            # A failed job leaves the cycle without a result, like a miss.
+            self.misses += 1
+        return True, job.result()
+
+    def stats(self) -> dict[str, int]:
+        """Return job and deadline-miss counts for diagnostics."""
+        return {"runs": self.runs, "deadline_misses": self.misses, "late_results": self.late}
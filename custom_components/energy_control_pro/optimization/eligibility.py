@@ -0,0 +1,63 @@
+"""Next-eligibility instants of controlled loads."""
+
+from __future__ import annotations
+
+from datetime import datetime
+import heapq
+
+
+class EligibilityQueue:
+    """Min-heap of the instants at which loads' switch timers expire.
+
+    A load's instant only changes when it switches or its timing changes, so
+    each cycle touches the heap only for those loads and for the timers that
+    expired. Replaced instants stay in the heap and are skipped when they
+    surface (lazy deletion); the heap is compacted if they pile up.
+    """
+
+    __slots__ = ("_heap", "_eligible_at", "_waiting")
+
+    def __init__(self) -> None:
+        """Create an empty queue."""
+        self._heap: list[tuple[datetime, str]] = []
+        self._eligible_at: dict[str, datetime | None] = {}
+        self._waiting: set[str] = set()
+
+    def schedule(self, entity_id: str, eligible_at: datetime | None, *, now: datetime) -> None:
+        """Set when ``entity_id`` may next switch; None means it has no running timer."""
+        if entity_id in self._eligible_at and self._eligible_at[entity_id] == eligible_at:
+            return
+        self._eligible_at[entity_id] = eligible_at
+        if eligible_at is None or eligible_at <= now:
+            self._waiting.discard(entity_id)
+            return
+        self._waiting.add(entity_id)
+        heapq.heappush(self._heap, (eligible_at, entity_id))
+        if len(self._heap) > 4 * len(self._waiting) + 8:
+            self._heap = [(at, item) for at, item in self._heap if not self._stale(at, item)]
+            heapq.heapify(self._heap)
+
+    def expire(self, now: datetime) -> list[str]:
+        """Mark every timer due at ``now`` as expired and return those loads."""
+        expired: list[str] = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            eligible_at, entity_id = heapq.heappop(heap)
+            if not self._stale(eligible_at, entity_id):
+                self._waiting.discard(entity_id)
+                expired.append(entity_id)
+        return expired
+
+    def is_eligible(self, entity_id: str) -> bool:
+        """Return True when the load's timer has expired (as of the last ``expire``)."""
+        return entity_id not in self._waiting
+
+    def next_at(self) -> datetime | None:
+        """Return the earliest pending instant, None when no timer is running."""
+        heap = self._heap
+        while heap and self._stale(*heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def _stale(self, eligible_at: datetime, entity_id: str) -> bool:
+        return entity_id not in self._waiting or self._eligible_at.get(entity_id) != eligible_at
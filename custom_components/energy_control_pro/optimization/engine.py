@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, time, timedelta
+
+from .constraints import ConstraintIndex
 
 
 @dataclass(frozen=True)
@@ -15,6 +18,8 @@ class LoadConfig:
     min_on_time_min: int
     cooldown_min: int
     priority: int
+    required_runtime_min: int = 0
+    deadline: time | None = None
 
 
 @dataclass(frozen=True)
@@ -24,6 +29,60 @@ class LoadRuntime:
     is_on: bool
     last_on: datetime | None
     last_off: datetime | None
+    # Whether the timer of the current state (cooldown when OFF, min-on time
+    # when ON) has expired, if the caller tracks it; None compares timestamps.
+    timer_expired: bool | None = None
+
+
+@dataclass(frozen=True)
+class PendingAction:
+    """A switch command sent to a load but not yet reflected in its state."""
+
+    target_on: bool
+    issued_at: datetime
+
+
+@dataclass(frozen=True)
+class ContinuousLoadConfig:
+    """Static config for one load driven by a power setpoint (EV charger, heater)."""
+
+    entity_id: str
+    min_power_w: int
+    max_power_w: int
+    step_w: int
+    deadband_w: int
+    rate_limit_s: int
+
+
+@dataclass(frozen=True)
+class ContinuousLoadRuntime:
+    """Runtime state for one setpoint-driven load."""
+
+    setpoint_w: int
+    last_change: datetime | None
+
+
+@dataclass(frozen=True)
+class ThermalLoadConfig:
+    """Static config for a water heater or heat pump used as heat storage."""
+
+    entity_id: str
+    normal_temp_c: int
+    boost_temp_c: int
+    power_w: int
+    volume_l: int
+    rate_limit_s: int
+
+
+@dataclass(frozen=True)
+class ThermalLoadRuntime:
+    """Runtime state for one heat-storage load."""
+
+    target_temp_c: float | None
+    current_temp_c: float | None
+    last_change: datetime | None
+    # Setpoint last sent, used when the entity does not report its target.
+    last_sent_c: float | None = None
 
 
 @dataclass(frozen=True)
@@ -33,15 +92,93 @@ class EngineAction:
     action: str
     entity_id: str
     reason: str
+    value: int | None = None
+    # Required regardless of surplus (a deadline would be missed otherwise).
+    forced: bool = False
+
+
+def battery_adjusted_power(
+    *,
+    surplus_w: int,
+    grid_import_w: int,
+    battery_w: int,
+    battery_soc_pct: float | None,
+    soc_target_pct: int,
+) -> tuple[int, int]:
+    """Return (surplus_w, grid_import_w) as seen by the load rules.
+
+    Below the SOC target the battery keeps its charge power and any discharge
+    counts as import. At or above the target, charge power is offered to loads
+    and the battery may cover short import dips.
+    """
+    if battery_w == 0 or battery_soc_pct is None:
+        return surplus_w, grid_import_w
+    if battery_soc_pct >= soc_target_pct:
+        return surplus_w + max(0, battery_w), grid_import_w
+    return surplus_w, grid_import_w + max(0, -battery_w)
 
 
-def _cooldown_passed(now: datetime, runtime: LoadRuntime, cooldown_min: int) -> bool:
+def resolve_pending(
+    *,
+    now: datetime,
+    is_on: bool,
+    pending: PendingAction | None,
+    timeout_s: int,
+) -> tuple[bool, bool]:
+    """Return (is_on as the engine should see it, keep the pending entry).
+
+    A load whose command is still in flight is treated as already in the
+    target state until the state confirms it or ``timeout_s`` passes; after
+    a timeout the real state is used again so the engine may retry.
+    """
+    if pending is None:
+        return is_on, False
+    if is_on == pending.target_on:
+        return is_on, False
+    if (now - pending.issued_at).total_seconds() >= max(0, timeout_s):
+        return is_on, False
+    return pending.target_on, True
+
+
+def pending_power_w(
+    *, loads: list[LoadConfig], pending: Mapping[str, PendingAction], target_on: bool
+) -> int:
+    """Return the nominal power of loads with an unconfirmed command to ``target_on``.
+
+    Meters lag switch commands, so this power is still in (OFF commands) or
+    not yet in (ON commands) the grid reading the engine is acting on.
+    """
+    return sum(
+        max(0, load.min_surplus_w)
+        for load in loads
+        if (action := pending.get(load.entity_id)) is not None and action.target_on == target_on
+    )
+
+
+def timer_expires_at(load: LoadConfig, runtime: LoadRuntime) -> datetime | None:
+    """Return when the load may next switch: end of its cooldown or min-on time."""
+    if runtime.is_on:
+        if runtime.last_on is None:
+            return None
+        return runtime.last_on + timedelta(minutes=max(0, load.min_on_time_min))
+    if runtime.last_off is None:
+        return None
+    return runtime.last_off + timedelta(minutes=max(0, load.cooldown_min))
+
+
+def cooldown_passed(now: datetime, runtime: LoadRuntime, cooldown_min: int) -> bool:
+    """Return True when an OFF load may be turned on again after its cooldown."""
+    if runtime.timer_expired is not None and not runtime.is_on:
+        return runtime.timer_expired
     if runtime.last_off is None:
         return True
     return (now - runtime.last_off).total_seconds() >= max(0, cooldown_min) * 60
 
 
-def _min_on_time_passed(now: datetime, runtime: LoadRuntime, min_on_time_min: int) -> bool:
+def min_on_time_passed(now: datetime, runtime: LoadRuntime, min_on_time_min: int) -> bool:
+    """Return True when an ON load has run long enough to be turned off."""
+    if runtime.timer_expired is not None and runtime.is_on:
+        return runtime.timer_expired
     if runtime.last_on is None:
         return True
     return (now - runtime.last_on).total_seconds() >= max(0, min_on_time_min) * 60
@@ -55,9 +192,16 @@ def decide_turn_on(
     min_surplus_duration_min: int,
     loads: list[LoadConfig],
     runtimes: dict[str, LoadRuntime],
+    forecast_surplus_w: int | None = None,
 ) -> EngineAction | None:
-    """Pick highest-priority OFF load eligible to turn on."""
-    if export_duration_min < max(1, min_surplus_duration_min):
+    """Pick highest-priority OFF load eligible to turn on.
+
+    With a forecast, a load whose surplus is expected to hold over the forecast
+    horizon may start before the export duration threshold, and a load whose
+    surplus is expected to vanish is not started at all.
+    """
+    duration_reached = export_duration_min >= max(1, min_surplus_duration_min)
+    if not duration_reached and forecast_surplus_w is None:
         return None
 
     candidates = sorted(loads, key=lambda item: item.priority)
@@ -67,12 +211,17 @@ def decide_turn_on(
             continue
         if surplus_w < max(0, load.min_surplus_w):
             continue
-        if not _cooldown_passed(now, runtime, load.cooldown_min):
+        if forecast_surplus_w is not None and forecast_surplus_w < max(0, load.min_surplus_w):
+            continue
+        if not cooldown_passed(now, runtime, load.cooldown_min):
             continue
+        reason = f"surplus {surplus_w}W for {export_duration_min} min"
+        if not duration_reached:
+            reason = f"{reason}, forecast {forecast_surplus_w}W"
         return EngineAction(
             action="turn_on",
             entity_id=load.entity_id,
-            reason=f"surplus {surplus_w}W for {export_duration_min} min",
+            reason=reason,
         )
     return None
 
@@ -86,11 +235,19 @@ def decide_turn_off(
     duration_threshold_min: int,
     loads: list[LoadConfig],
     runtimes: dict[str, LoadRuntime],
+    forecast_surplus_w: int | None = None,
 ) -> EngineAction | None:
-    """Pick lowest-priority ON load eligible to turn off."""
+    """Pick lowest-priority ON load eligible to turn off.
+
+    With a forecast that expects import above the threshold to persist, the
+    import duration threshold is not waited for.
+    """
     if grid_import_w < max(0, import_threshold_w):
         return None
-    if import_duration_min < max(1, duration_threshold_min):
+    duration_reached = import_duration_min >= max(1, duration_threshold_min)
+    if not duration_reached and (
+        forecast_surplus_w is None or forecast_surplus_w > -max(0, import_threshold_w)
+    ):
         return None
 
     candidates = sorted(loads, key=lambda item: item.priority, reverse=True)
@@ -98,11 +255,375 @@ def decide_turn_off(
         runtime = runtimes[load.entity_id]
         if not runtime.is_on:
             continue
-        if not _min_on_time_passed(now, runtime, load.min_on_time_min):
+        if not min_on_time_passed(now, runtime, load.min_on_time_min):
             continue
+        reason = f"import {grid_import_w}W for {import_duration_min} min"
+        if not duration_reached:
+            reason = f"{reason}, forecast {forecast_surplus_w}W"
         return EngineAction(
             action="turn_off",
             entity_id=load.entity_id,
-            reason=f"import {grid_import_w}W for {import_duration_min} min",
+            reason=reason,
         )
     return None
+
+
+def decide_cost(
+    *,
+    now: datetime,
+    surplus_w: int,
+    grid_import_w: int,
+    export_duration_min: int,
+    import_duration_min: int,
+    import_threshold_w: int,
+    duration_threshold_min: int,
+    import_price: float,
+    export_price: float,
+    cheapest_import_price: float,
+    mean_import_price: float,
+    loads: list[LoadConfig],
+    runtimes: dict[str, LoadRuntime],
+) -> EngineAction | None:
+    """Switch loads to minimize energy cost on a time-of-use or dynamic tariff.
+
+    An OFF load starts when the current slot is the cheapest import price in
+    the lookahead window (and prices vary), or when surplus covers it and the
+    feed-in price is no better than the cheapest import price ahead. An ON load
+    is shed when it imports during an above-average price; without a price
+    spread (flat tariff or no schedule) the ``decide_turn_off`` rules apply.
+    """
+    cheap_slot = import_price <= cheapest_import_price < mean_import_price
+    duration_reached = export_duration_min >= max(1, duration_threshold_min)
+    for load in sorted(loads, key=lambda item: item.priority):
+        runtime = runtimes[load.entity_id]
+        if runtime.is_on or not cooldown_passed(now, runtime, load.cooldown_min):
+            continue
+        covered = (
+            duration_reached
+            and surplus_w >= max(0, load.min_surplus_w)
+            and export_price <= cheapest_import_price
+        )
+        if cheap_slot:
+            reason = f"cheapest import price {import_price:g} in window"
+        elif covered:
+            reason = f"surplus {surplus_w}W, feed-in {export_price:g} <= import {cheapest_import_price:g}"
+        else:
+            continue
+        return EngineAction(action="turn_on", entity_id=load.entity_id, reason=reason)
+
+    if cheapest_import_price >= mean_import_price:
+        return decide_turn_off(
+            now=now,
+            grid_import_w=grid_import_w,
+            import_duration_min=import_duration_min,
+            import_threshold_w=import_threshold_w,
+            duration_threshold_min=duration_threshold_min,
+            loads=loads,
+            runtimes=runtimes,
+        )
+    if (
+        import_price <= mean_import_price
+        or grid_import_w < max(0, import_threshold_w)
+        or import_duration_min < max(1, duration_threshold_min)
+    ):
+        return None
+    for load in sorted(loads, key=lambda item: item.priority, reverse=True):
+        runtime = runtimes[load.entity_id]
+        if not runtime.is_on or not min_on_time_passed(now, runtime, load.min_on_time_min):
+            continue
+        return EngineAction(
+            action="turn_off",
+            entity_id=load.entity_id,
+            reason=f"import {grid_import_w}W at price {import_price:g} > mean {mean_import_price:g}",
+        )
+    return None
+
+
+def decide_balanced(
+    *,
+    now: datetime,
+    surplus_w: int,
+    grid_import_w: int,
+    export_duration_min: int,
+    import_duration_min: int,
+    import_threshold_w: int,
+    duration_threshold_min: int,
+    loads: list[LoadConfig],
+    runtimes: dict[str, LoadRuntime],
+    import_weight: float,
+    export_weight: float,
+    switch_penalty_w: float,
+    forecast_surplus_w: int | None = None,
+) -> EngineAction | None:
+    """Score every eligible switch in one pass and return the best one.
+
+    Each candidate is scored with ``min_surplus_w`` as its power: weighted
+    import avoided plus export absorbed, minus the import or export it causes
+    and a fixed switch wear penalty. Only candidates with a positive score act;
+    ties keep priority order.
+    """
+    export_w = max(0, surplus_w)
+    duration = max(1, duration_threshold_min)
+    on_allowed = export_duration_min >= duration or (
+        forecast_surplus_w is not None and forecast_surplus_w > 0
+    )
+    off_allowed = grid_import_w >= max(0, import_threshold_w) and import_duration_min >= duration
+
+    best: EngineAction | None = None
+    best_score = 0.0
+    for load in sorted(loads, key=lambda item: item.priority):
+        runtime = runtimes[load.entity_id]
+        power_w = max(0, load.min_surplus_w)
+        if not runtime.is_on:
+            if not on_allowed or not cooldown_passed(now, runtime, load.cooldown_min):
+                continue
+            absorbed_w = min(power_w, export_w)
+            score = export_weight * absorbed_w - import_weight * (power_w - absorbed_w)
+            action = "turn_on"
+        else:
+            if not off_allowed or not min_on_time_passed(now, runtime, load.min_on_time_min):
+                continue
+            avoided_w = min(power_w, grid_import_w)
+            score = import_weight * avoided_w - export_weight * (power_w - avoided_w)
+            action = "turn_off"
+        score -= switch_penalty_w
+        if score > best_score:
+            best_score = score
+            best = EngineAction(
+                action=action,
+                entity_id=load.entity_id,
+                reason=f"balanced score {score:.0f} (surplus {surplus_w}W)",
+            )
+    return best
+
+
+def decide_continuous_setpoint(
+    *,
+    now: datetime,
+    surplus_w: int,
+    load: ContinuousLoadConfig,
+    runtime: ContinuousLoadRuntime,
+) -> EngineAction | None:
+    """Track available surplus with a stepped, rate-limited power setpoint.
+
+    ``surplus_w`` is measured with the load running at its current setpoint, so
+    the power available to it is the sum of both. Targets below ``min_power_w``
+    stop the load (setpoint 0).
+    """
+    if runtime.last_change is not None and (
+        (now - runtime.last_change).total_seconds() < max(0, load.rate_limit_s)
+    ):
+        return None
+
+    available_w = runtime.setpoint_w + surplus_w
+    step_w = max(1, load.step_w)
+    target_w = min(load.max_power_w, (available_w // step_w) * step_w)
+    if target_w < load.min_power_w:
+        target_w = 0
+
+    if target_w == runtime.setpoint_w:
+        return None
+    # Starting and stopping always go through; the deadband only damps tracking.
+    if target_w and runtime.setpoint_w and abs(target_w - runtime.setpoint_w) < load.deadband_w:
+        return None
+
+    return EngineAction(
+        action="set_power",
+        entity_id=load.entity_id,
+        reason=f"surplus {surplus_w}W at {runtime.setpoint_w}W setpoint",
+        value=target_w,
+    )
+
+
+def thermal_stored_kwh(*, volume_l: int, current_temp_c: float, normal_temp_c: int) -> float:
+    """Estimate heat stored above the normal setpoint (water, 1.163 Wh per litre and K)."""
+    return max(0.0, current_temp_c - normal_temp_c) * max(0, volume_l) * 1.163 / 1000
+
+
+def decide_thermal_setpoint(
+    *,
+    now: datetime,
+    surplus_w: int,
+    load: ThermalLoadConfig,
+    runtime: ThermalLoadRuntime,
+) -> EngineAction | None:
+    """Raise the target temperature on surplus and lower it again on import.
+
+    Only two setpoints are used, so each surplus period costs at most two
+    service calls, and changes are at least ``rate_limit_s`` apart. While
+    boosting, ``surplus_w`` already includes the heater's draw, so the boost
+    is kept as long as there is no import. An entity that does not report its
+    target is compared against the setpoint last sent instead.
+    """
+    if runtime.last_change is not None and (
+        (now - runtime.last_change).total_seconds() < max(0, load.rate_limit_s)
+    ):
+        return None
+
+    current_target_c = runtime.target_temp_c if runtime.target_temp_c is not None else runtime.last_sent_c
+    boosting = current_target_c is not None and current_target_c >= load.boost_temp_c
+    if boosting:
+        target_c = load.boost_temp_c if surplus_w >= 0 else load.normal_temp_c
+    else:
+        target_c = load.boost_temp_c if surplus_w >= max(0, load.power_w) else load.normal_temp_c
+    if current_target_c is not None and round(current_target_c) == target_c:
+        return None
+
+    return EngineAction(
+        action="set_temperature",
+        entity_id=load.entity_id,
+        reason=f"surplus {surplus_w}W",
+        value=target_c,
+    )
+
+
+def decide_peak_shaving(
+    *,
+    now: datetime,
+    grid_import_w: int,
+    import_limit_w: int,
+    safety_min_on_s: int,
+    loads: list[LoadConfig],
+    runtimes: dict[str, LoadRuntime],
+    continuous: tuple[ContinuousLoadConfig, ContinuousLoadRuntime] | None = None,
+    pending_off_w: int = 0,
+) -> list[EngineAction]:
+    """Shed as many loads as needed to bring import back under a hard cap.
+
+    Unlike ``decide_turn_off`` this ignores duration thresholds and the regular
+    min-on time; only ``safety_min_on_s`` protects loads that just started.
+    The setpoint-driven load is reduced first, then ON loads are shed in
+    lowest-priority order using ``min_surplus_w`` as their nominal power.
+    ``pending_off_w`` is the power of loads already commanded OFF that the
+    meter still includes; it counts as shed so they are not shed twice.
+    """
+    excess_w = grid_import_w - max(0, pending_off_w) - import_limit_w
+    if import_limit_w <= 0 or excess_w <= 0:
+        return []
+
+    reason = f"import {grid_import_w}W above cap {import_limit_w}W"
+    actions: list[EngineAction] = []
+
+    if continuous is not None:
+        continuous_load, continuous_runtime = continuous
+        if continuous_runtime.setpoint_w > 0:
+            step_w = max(1, continuous_load.step_w)
+            target_w = max(0, ((continuous_runtime.setpoint_w - excess_w) // step_w) * step_w)
+            if target_w < continuous_load.min_power_w:
+                target_w = 0
+            actions.append(
+                EngineAction(
+                    action="set_power",
+                    entity_id=continuous_load.entity_id,
+                    reason=reason,
+                    value=target_w,
+                )
+            )
+            excess_w -= continuous_runtime.setpoint_w - target_w
+
+    candidates = sorted(loads, key=lambda item: item.priority, reverse=True)
+    for load in candidates:
+        if excess_w <= 0:
+            break
+        runtime = runtimes[load.entity_id]
+        if not runtime.is_on:
+            continue
+        if runtime.last_on is not None and (
+            (now - runtime.last_on).total_seconds() < max(0, safety_min_on_s)
+        ):
+            continue
+        actions.append(EngineAction(action="turn_off", entity_id=load.entity_id, reason=reason))
+        excess_w -= max(0, load.min_surplus_w)
+    return actions
+
+
+def decide_export_limit(
+    *,
+    now: datetime,
+    grid_export_w: int,
+    export_limit_w: int,
+    release_hysteresis_w: int,
+    grid_import_w: int = 0,
+    loads: list[LoadConfig],
+    runtimes: dict[str, LoadRuntime],
+    continuous: tuple[ContinuousLoadConfig, ContinuousLoadRuntime] | None = None,
+    curtailment_entity_id: str | None = None,
+    curtailed: bool = False,
+    constraints: ConstraintIndex | None = None,
+    running_w: Mapping[str, int] | None = None,
+    pending_on_w: int = 0,
+) -> list[EngineAction]:
+    """Absorb export above a grid-connection cap within the current cycle.
+
+    Ignores duration thresholds: the setpoint-driven load is raised first, then
+    OFF loads past their cooldown are turned on in priority order, as far as
+    ``constraints`` allow next to the loads in ``running_w``. If export is
+    still above the cap, inverter curtailment is requested; it is released once
+    the net grid flow (export minus ``grid_import_w``) falls
+    ``release_hysteresis_w`` below the cap, so with a zero or small cap a
+    curtailed inverter is released once the site imports. ``pending_on_w`` is
+    the power of loads already commanded ON that the meter does not show yet;
+    it counts as absorbed so no further load or curtailment is added for it.
+    """
+    export_limit_w = max(0, export_limit_w)
+    if grid_export_w - max(0, pending_on_w) <= export_limit_w:
+        if curtailed and curtailment_entity_id and (
+            grid_export_w - max(0, grid_import_w) < export_limit_w - max(0, release_hysteresis_w)
+        ):
+            return [
+                EngineAction(
+                    action="release",
+                    entity_id=curtailment_entity_id,
+                    reason=(
+                        f"import {grid_import_w}W with cap {export_limit_w}W"
+                        if grid_import_w > 0
+                        else f"export {grid_export_w}W below cap {export_limit_w}W"
+                    ),
+                )
+            ]
+        return []
+
+    excess_w = grid_export_w - max(0, pending_on_w) - export_limit_w
+    reason = f"export {grid_export_w}W above cap {export_limit_w}W"
+    actions: list[EngineAction] = []
+
+    if continuous is not None:
+        continuous_load, continuous_runtime = continuous
+        step_w = max(1, continuous_load.step_w)
+        # Round up so the load absorbs at least the excess.
+        target_w = min(
+            continuous_load.max_power_w,
+            -((-(continuous_runtime.setpoint_w + excess_w)) // step_w) * step_w,
+        )
+        target_w = max(target_w, continuous_load.min_power_w)
+        if target_w > continuous_runtime.setpoint_w:
+            actions.append(
+                EngineAction(
+                    action="set_power",
+                    entity_id=continuous_load.entity_id,
+                    reason=reason,
+                    value=target_w,
+                )
+            )
+            excess_w -= target_w - continuous_runtime.setpoint_w
+
+    usage = constraints.usage(running_w or {}) if constraints else None
+    candidates = sorted(loads, key=lambda item: item.priority)
+    for load in candidates:
+        if excess_w <= 0:
+            break
+        runtime = runtimes[load.entity_id]
+        if runtime.is_on:
+            continue
+        if not cooldown_passed(now, runtime, load.cooldown_min):
+            continue
+        if constraints and usage is not None:
+            if not constraints.fits(load.entity_id, max(0, load.min_surplus_w), usage):
+                continue
+            constraints.add(load.entity_id, max(0, load.min_surplus_w), usage)
+        actions.append(EngineAction(action="turn_on", entity_id=load.entity_id, reason=reason))
+        excess_w -= max(0, load.min_surplus_w)
+
+    if excess_w > 0 and curtailment_entity_id and not curtailed:
+        actions.append(EngineAction(action="curtail", entity_id=curtailment_entity_id, reason=reason))
+    return actions
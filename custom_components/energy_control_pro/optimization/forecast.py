@@ -0,0 +1,129 @@
+"""Solar forecast parsing and time-indexed lookups."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from typing import Any
+
+# Attribute names used by common forecast integrations, checked in order.
+FORECAST_ATTRIBUTES: tuple[str, ...] = ("detailedForecast", "forecast", "watts")
+_TIME_KEYS: tuple[str, ...] = ("period_start", "datetime", "time", "start")
+# (key, factor to W)
+_POWER_KEYS: tuple[tuple[str, float], ...] = (
+    ("pv_estimate", 1000.0),
+    ("power_w", 1.0),
+    ("watts", 1.0),
+    ("power", 1.0),
+)
+
+
+class SolarForecast:
+    """Compact forecast of solar power with O(log n) interpolated queries.
+
+    Points are stored as parallel arrays of epoch seconds and W, plus the
+    cumulative energy (W*s) at each point so window averages need two lookups.
+    """
+
+    __slots__ = ("_times", "_power", "_energy")
+
+    def __init__(self, points: Iterable[tuple[float, float]]) -> None:
+        """Build the index from (epoch seconds, W) pairs in any order."""
+        ordered = sorted(dict(points).items())
+        self._times = array("d", (ts for ts, _ in ordered))
+        self._power = array("d", (max(0.0, power) for _, power in ordered))
+        self._energy = array("d", [0.0] * len(ordered))
+        for index in range(1, len(ordered)):
+            span = self._times[index] - self._times[index - 1]
+            self._energy[index] = self._energy[index - 1] + span * (
+                self._power[index] + self._power[index - 1]
+            ) / 2
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    def power_at(self, ts: float) -> float:
+        """Return the interpolated forecast power in W, clamped at both ends."""
+        times = self._times
+        if not times:
+            return 0.0
+        if ts <= times[0]:
+            return self._power[0]
+        if ts >= times[-1]:
+            return self._power[-1]
+        index = bisect_right(times, ts) - 1
+        ratio = (ts - times[index]) / (times[index + 1] - times[index])
+        return self._power[index] + ratio * (self._power[index + 1] - self._power[index])
+
+    def average_w(self, start_ts: float, minutes: int) -> float:
+        """Return the mean forecast power in W over ``minutes`` from ``start_ts``."""
+        if not self._times:
+            return 0.0
+        if minutes <= 0:
+            return self.power_at(start_ts)
+        end_ts = start_ts + minutes * 60
+        return (self._energy_at(end_ts) - self._energy_at(start_ts)) / (end_ts - start_ts)
+
+    def _energy_at(self, ts: float) -> float:
+        """Cumulative energy in W*s from the first point, extrapolating flat."""
+        times = self._times
+        if ts <= times[0]:
+            return (ts - times[0]) * self._power[0]
+        if ts >= times[-1]:
+            return self._energy[-1] + (ts - times[-1]) * self._power[-1]
+        index = bisect_right(times, ts) - 1
+        power_ts = self.power_at(ts)
+        return self._energy[index] + (ts - times[index]) * (self._power[index] + power_ts) / 2
+
+
+def _to_timestamp(value: Any) -> float | None:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _point_from_item(item: Mapping[str, Any]) -> tuple[float, float] | None:
+    ts = next((_to_timestamp(item[key]) for key in _TIME_KEYS if key in item), None)
+    if ts is None:
+        return None
+    for key, factor in _POWER_KEYS:
+        if key in item:
+            try:
+                return ts, float(item[key]) * factor
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def parse_forecast_attributes(attributes: Mapping[str, Any]) -> SolarForecast | None:
+    """Parse a forecast entity's attributes into a ``SolarForecast``.
+
+    Supports a list of dicts (Solcast ``detailedForecast`` with ``pv_estimate``
+    in kW, or ``power_w``/``watts`` in W) and a ``{timestamp: W}`` mapping.
+    """
+    for name in FORECAST_ATTRIBUTES:
+        raw = attributes.get(name)
+        points: list[tuple[float, float]] = []
+        if isinstance(raw, Mapping):
+            for key, value in raw.items():
+                ts = _to_timestamp(key)
+                try:
+                    power = float(value)
+                except (TypeError, ValueError):
+                    continue
+                if ts is not None:
+                    points.append((ts, power))
+        elif isinstance(raw, list):
+            for item in raw:
+                if isinstance(item, Mapping) and (point := _point_from_item(item)) is not None:
+                    points.append(point)
+        if points:
+            return SolarForecast(points)
+    return None
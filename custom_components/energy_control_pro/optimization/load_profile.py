@@ -0,0 +1,106 @@
+"""Incrementally learned household load profile."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import Any
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+SLOTS_PER_WEEK = 7 * SLOTS_PER_DAY
+# Samples after which older data decays exponentially (~4 weeks of 10 s samples per slot).
+DEFAULT_WINDOW_SAMPLES = 360
+
+
+def slot_index(moment: datetime) -> int:
+    """Return the weekday/time-of-day slot for a moment."""
+    return moment.weekday() * SLOTS_PER_DAY + (moment.hour * 60 + moment.minute) // SLOT_MINUTES
+
+
+class LoadProfile:
+    """Per-weekday, per-15-minute mean load learned one sample at a time.
+
+    Memory is fixed (two arrays of ``SLOTS_PER_WEEK``) and each update is O(1):
+    a running mean that turns into an exponential moving average once a slot
+    has seen ``window_samples`` samples.
+    """
+
+    __slots__ = ("_mean", "_count", "_window")
+
+    def __init__(self, window_samples: int = DEFAULT_WINDOW_SAMPLES) -> None:
+        """Create an empty profile."""
+        self._mean = array("d", [0.0] * SLOTS_PER_WEEK)
+        self._count = array("L", [0] * SLOTS_PER_WEEK)
+        self._window = max(1, window_samples)
+
+    def update(self, moment: datetime, load_w: float) -> None:
+        """Fold one load sample into its slot."""
+        index = slot_index(moment)
+        count = self._count[index]
+        if count < self._window:
+            count += 1
+            self._count[index] = count
+        self._mean[index] += (load_w - self._mean[index]) / count
+
+    def slot_mean(self, moment: datetime) -> float | None:
+        """Return the learned mean for the slot containing ``moment``."""
+        index = slot_index(moment)
+        return self._mean[index] if self._count[index] else None
+
+    def forecast_w(self, start: datetime, minutes: int) -> float | None:
+        """Return the expected mean load over ``minutes`` from ``start``.
+
+        Slots without samples are skipped; None when none of them has data.
+        """
+        end = start + timedelta(minutes=max(0, minutes))
+        if end <= start:
+            return self.slot_mean(start)
+
+        weighted_w = 0.0
+        covered_s = 0.0
+        cursor = start
+        while cursor < end:
+            slot_start = cursor.replace(
+                minute=cursor.minute - cursor.minute % SLOT_MINUTES, second=0, microsecond=0
+            )
+            slot_end = min(end, slot_start + timedelta(minutes=SLOT_MINUTES))
+            index = slot_index(cursor)
+            if self._count[index]:
+                span_s = (slot_end - cursor).total_seconds()
+                weighted_w += self._mean[index] * span_s
+                covered_s += span_s
+            cursor = slot_end
+        if not covered_s:
+            return None
+        return weighted_w / covered_s
+
+    def copy(self) -> LoadProfile:
+        """Return an independent snapshot, e.g. for a planner running in the executor."""
+        profile = LoadProfile(self._window)
+        profile._mean = array("d", self._mean)
+        profile._count = array("L", self._count)
+        return profile
+
+    def as_dict(self) -> dict[str, list[float] | list[int]]:
+        """Return the learned slots in a JSON-serializable form for storage."""
+        return {"mean": [round(value, 1) for value in self._mean], "count": list(self._count)}
+
+    @classmethod
+    def from_dict(
+        cls, stored: Mapping[str, Any] | None, window_samples: int = DEFAULT_WINDOW_SAMPLES
+    ) -> LoadProfile:
+        """Restore a profile saved with ``as_dict``; invalid data gives an empty profile."""
+        profile = cls(window_samples)
+        if not stored:
+            return profile
+        try:
+            mean = array("d", (float(value) for value in stored["mean"]))
+            count = array("L", (min(int(value), profile._window) for value in stored["count"]))
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return profile
+        if len(mean) == len(count) == SLOTS_PER_WEEK:
+            profile._mean = mean
+            profile._count = count
+        return profile
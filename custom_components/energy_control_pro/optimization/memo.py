@@ -0,0 +1,104 @@
+"""Reuse of strategy decisions while their inputs are unchanged."""
+
+from __future__ import annotations
+
+from collections.abc import Hashable
+from typing import Any
+
+from .engine import EngineAction
+from .strategies import Strategy, StrategyContext
+
+
+def decision_fingerprint(
+    context: StrategyContext, *, strategy: str, exact_power: bool = False
+) -> tuple[Hashable, ...]:
+    """Return a key of everything a strategy decision depends on.
+
+    Building it takes one pass over the loads without sorting, timer
+    arithmetic or reason formatting, so it is cheaper than the decision.
+
+    Threshold strategies only compare power with thresholds, so the key holds
+    which side of each comparison the engine makes (load power, import
+    threshold, forecast signs, durations) rather than the readings; with
+    ``exact_power`` (scoring strategies) the readings themselves are keyed.
+    Switch timers come from the runtimes' precomputed ``timer_expired`` flag;
+    runtimes without it key on ``now``, so their decision is never reused.
+    Other load settings are fixed for the lifetime of a config entry.
+    Reasons of a reused action keep the values of the cycle that made it.
+    """
+    now = context.now
+    surplus_w = context.surplus_w
+    grid_import_w = context.grid_import_w
+    forecast_w = context.forecast_surplus_w
+    # Clamped like the engine clamps them; inline rather than max() on this path.
+    import_threshold_w = context.import_threshold_w if context.import_threshold_w > 0 else 0
+    duration_min = context.duration_threshold_min if context.duration_threshold_min > 1 else 1
+    runtimes = context.runtimes
+    if forecast_w is None:
+        forecast_key: Hashable = None
+        forecast_w = -1 << 62
+    else:
+        forecast_key = (forecast_w > 0, forecast_w > -import_threshold_w)
+    loads: list[tuple[Hashable, ...]] = []
+    for load in context.loads:
+        runtime = runtimes[load.entity_id]
+        power_w = load.min_surplus_w if load.min_surplus_w > 0 else 0
+        expired = runtime.timer_expired
+        loads.append(
+            (
+                load.entity_id,
+                power_w,
+                runtime.is_on,
+                now if expired is None else expired,
+                surplus_w >= power_w,
+                forecast_w >= power_w,
+            )
+        )
+    return (
+        strategy,
+        (surplus_w, grid_import_w, forecast_w) if exact_power else None,
+        grid_import_w >= import_threshold_w,
+        context.export_duration_min >= duration_min,
+        context.import_duration_min >= duration_min,
+        forecast_key,
+        context.import_price,
+        context.export_price,
+        context.cheapest_import_price,
+        context.mean_import_price,
+        loads,
+    )
+
+
+class DecisionMemo:
+    """Remember the last strategy decision and reuse it for the same fingerprint."""
+
+    __slots__ = ("_fingerprint", "_action", "hits", "misses")
+
+    def __init__(self) -> None:
+        """Create an empty memo."""
+        self._fingerprint: tuple[Hashable, ...] | None = None
+        self._action: EngineAction | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def decide(self, strategy: Strategy, context: StrategyContext) -> EngineAction | None:
+        """Return the strategy decision, evaluating it only when the inputs changed."""
+        fingerprint = decision_fingerprint(
+            context, strategy=strategy.name, exact_power=strategy.exact_power
+        )
+        if fingerprint == self._fingerprint:
+            self.hits += 1
+            return self._action
+        self.misses += 1
+        self._action = strategy.decide(context)
+        self._fingerprint = fingerprint
+        return self._action
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters for diagnostics."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+        }
@@ -0,0 +1,78 @@
+"""Flapping detection and adaptive switch timing."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+from .engine import LoadConfig
+
+
+class FlapTracker:
+    """Detect a load switching too often and back off its timing.
+
+    Only the last ``max_switches`` switch times are kept, so a detection is a
+    single comparison: the buffer is full and spans less than ``window_s``.
+    Each detection doubles the backoff (up to ``2 ** max_level``); every
+    ``decay_s`` without a new detection halves it again.
+    """
+
+    __slots__ = (
+        "_switches",
+        "_max_switches",
+        "_window_s",
+        "_decay_s",
+        "_max_level",
+        "_level",
+        "_level_since",
+        "flaps",
+    )
+
+    def __init__(self, *, max_switches: int, window_s: int, decay_s: int, max_level: int) -> None:
+        """Create a tracker without history."""
+        self._max_switches = max(2, max_switches)
+        self._switches: deque[datetime] = deque(maxlen=self._max_switches)
+        self._window_s = window_s
+        self._decay_s = max(1, decay_s)
+        self._max_level = max_level
+        self._level = 0
+        self._level_since: datetime | None = None
+        self.flaps = 0
+
+    def record_switch(self, now: datetime) -> bool:
+        """Record one switch; return True when it completes a flapping pattern."""
+        switches = self._switches
+        switches.append(now)
+        if len(switches) < self._max_switches or (now - switches[0]).total_seconds() > self._window_s:
+            return False
+        switches.clear()
+        self._level = min(self._max_level, self.level(now) + 1)
+        self._level_since = now
+        self.flaps += 1
+        return True
+
+    def level(self, now: datetime) -> int:
+        """Return the current backoff level after decay."""
+        if not self._level or self._level_since is None:
+            return 0
+        steps = int((now - self._level_since).total_seconds() // self._decay_s)
+        if steps:
+            self._level = max(0, self._level - steps)
+            self._level_since += timedelta(seconds=steps * self._decay_s)
+        return self._level
+
+    def multiplier(self, now: datetime) -> int:
+        """Return the factor applied to cooldown and min-on time."""
+        return 2 ** self.level(now)
+
+
+def adapt_load(load: LoadConfig, multiplier: int) -> LoadConfig:
+    """Return ``load`` with cooldown and min-on time stretched by ``multiplier``."""
+    if multiplier <= 1:
+        return load
+    return replace(
+        load,
+        cooldown_min=load.cooldown_min * multiplier,
+        min_on_time_min=load.min_on_time_min * multiplier,
+    )
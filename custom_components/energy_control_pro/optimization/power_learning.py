@@ -0,0 +1,100 @@
+"""Learned power draw of controlled loads."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+# Deltas smaller than this are noise, not a load switching.
+MIN_SAMPLE_W = 50
+# Estimates are only used once this many samples agree.
+MIN_SAMPLES = 2
+# Smallest weight of a new sample once the estimate has settled.
+MIN_ALPHA = 0.2
+
+
+class PowerEstimate:
+    """Robust running estimate of one load's draw in W.
+
+    Starts as a running mean and settles into an exponential moving average.
+    Each sample's deviation is clipped to three times the running absolute
+    deviation, so a kettle switching on during a heater transition moves the
+    estimate only a little.
+    """
+
+    __slots__ = ("estimate_w", "deviation_w", "samples")
+
+    def __init__(self, estimate_w: float = 0.0, deviation_w: float = 0.0, samples: int = 0) -> None:
+        """Create an estimate, optionally restored from storage."""
+        self.estimate_w = estimate_w
+        self.deviation_w = deviation_w
+        self.samples = samples
+
+    def update(self, sample_w: float) -> None:
+        """Fold one measured draw into the estimate."""
+        if self.samples == 0:
+            self.estimate_w = sample_w
+            self.deviation_w = sample_w / 4
+            self.samples = 1
+            return
+        self.samples += 1
+        alpha = max(MIN_ALPHA, 1 / self.samples)
+        limit_w = max(3 * self.deviation_w, MIN_SAMPLE_W)
+        error_w = sample_w - self.estimate_w
+        self.estimate_w += alpha * max(-limit_w, min(limit_w, error_w))
+        self.deviation_w += alpha * (min(abs(error_w), limit_w) - self.deviation_w)
+
+
+class LoadPowerLearner:
+    """Per-load power estimates from transitions or dedicated power entities."""
+
+    __slots__ = ("_estimates",)
+
+    def __init__(self) -> None:
+        """Create a learner without history."""
+        self._estimates: dict[str, PowerEstimate] = {}
+
+    def observe(self, entity_id: str, sample_w: float) -> bool:
+        """Record a measured draw; return True when the sample was used."""
+        if sample_w < MIN_SAMPLE_W:
+            return False
+        self._estimates.setdefault(entity_id, PowerEstimate()).update(sample_w)
+        return True
+
+    def observe_transition(
+        self, entity_id: str, *, turned_on: bool, load_before_w: int, load_after_w: int
+    ) -> bool:
+        """Record the house load step around one switch transition."""
+        delta_w = load_after_w - load_before_w
+        return self.observe(entity_id, delta_w if turned_on else -delta_w)
+
+    def estimate_w(self, entity_id: str) -> int | None:
+        """Return the learned draw, or None until enough samples agree."""
+        estimate = self._estimates.get(entity_id)
+        if estimate is None or estimate.samples < MIN_SAMPLES:
+            return None
+        return int(round(estimate.estimate_w))
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        """Return the estimates in a JSON-serializable form for storage."""
+        return {
+            entity_id: {
+                "estimate_w": estimate.estimate_w,
+                "deviation_w": estimate.deviation_w,
+                "samples": estimate.samples,
+            }
+            for entity_id, estimate in self._estimates.items()
+        }
+
+    @classmethod
+    def from_dict(cls, stored: Mapping[str, Any] | None) -> LoadPowerLearner:
+        """Restore estimates saved with ``as_dict``; invalid entries are skipped."""
+        learner = cls()
+        for entity_id, item in (stored or {}).items():
+            try:
+                learner._estimates[entity_id] = PowerEstimate(
+                    float(item["estimate_w"]), float(item["deviation_w"]), int(item["samples"])
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+        return learner
@@ -0,0 +1,197 @@
+"""Day-ahead planning for deferrable loads with runtime deadlines."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+import math
+from time import monotonic
+from typing import Any
+
+from .engine import EngineAction, LoadConfig, LoadRuntime, cooldown_passed
+
+SLOT_MINUTES = 15
+
+
+@dataclass(frozen=True)
+class DeferrablePlan:
+    """Planned run slots for one deferrable load until its deadline."""
+
+    entity_id: str
+    deadline_at: datetime
+    slot_starts: tuple[datetime, ...]
+    complete: bool
+
+    def is_active(self, now: datetime) -> bool:
+        """Return True when ``now`` falls inside one of the planned slots."""
+        return any(
+            start <= now < start + timedelta(minutes=SLOT_MINUTES) for start in self.slot_starts
+        )
+
+
+def parse_deadline(value: Any) -> time | None:
+    """Parse a deadline option (``HH:MM`` or ``HH:MM:SS``)."""
+    if isinstance(value, time):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return None
+    try:
+        return time.fromisoformat(value.strip())
+    except ValueError:
+        return None
+
+
+def next_deadline(now: datetime, deadline: time) -> datetime:
+    """Return the next occurrence of ``deadline`` strictly after ``now``."""
+    candidate = datetime.combine(now.date(), deadline)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def slot_start(moment: datetime) -> datetime:
+    """Return the start of the planning slot containing ``moment``."""
+    return moment.replace(
+        minute=moment.minute - moment.minute % SLOT_MINUTES, second=0, microsecond=0
+    )
+
+
+def must_run(
+    *,
+    now: datetime,
+    deadline_at: datetime,
+    remaining_min: float,
+    margin_min: int,
+) -> bool:
+    """Return True when the load has to run now to finish before its deadline."""
+    if remaining_min <= 0:
+        return False
+    return (deadline_at - now).total_seconds() / 60 <= remaining_min + max(0, margin_min)
+
+
+def plan_deferrable_loads(
+    *,
+    now: datetime,
+    loads: list[LoadConfig],
+    remaining_min: dict[str, float],
+    slot_surplus_w: Callable[[datetime], float],
+    existing: dict[str, DeferrablePlan],
+    dirty: set[str],
+    time_budget_s: float,
+) -> dict[str, DeferrablePlan]:
+    """Place each load's remaining runtime in the slots with most expected surplus.
+
+    Loads are planned earliest-deadline first, and each allocation reduces the
+    surplus left for the next load. Only ``dirty`` loads are replanned; the other
+    plans are kept (minus past slots) and their power is reserved first. When
+    ``time_budget_s`` runs out, remaining loads are left unplanned and fall back
+    to the ``must_run`` deadline guarantee.
+
+    Runs in an executor thread: it must not touch Home Assistant state.
+    """
+    started = monotonic()
+    current_slot = slot_start(now)
+    deferrable = sorted(
+        (load for load in loads if load.required_runtime_min > 0 and load.deadline is not None),
+        key=lambda item: (next_deadline(now, item.deadline), item.priority),  # type: ignore[arg-type]
+    )
+    if not deferrable:
+        return {}
+
+    last_deadline = max(next_deadline(now, load.deadline) for load in deferrable)  # type: ignore[arg-type]
+    surplus: dict[datetime, float] = {}
+    cursor = current_slot
+    while cursor < last_deadline:
+        surplus[cursor] = slot_surplus_w(cursor)
+        cursor += timedelta(minutes=SLOT_MINUTES)
+
+    plans: dict[str, DeferrablePlan] = {}
+    for load in deferrable:
+        previous = existing.get(load.entity_id)
+        if load.entity_id in dirty or previous is None:
+            continue
+        kept = tuple(start for start in previous.slot_starts if start >= current_slot)
+        plans[load.entity_id] = DeferrablePlan(
+            entity_id=load.entity_id,
+            deadline_at=previous.deadline_at,
+            slot_starts=kept,
+            complete=previous.complete,
+        )
+        for start in kept:
+            if start in surplus:
+                surplus[start] -= max(0, load.min_surplus_w)
+
+    for load in deferrable:
+        if load.entity_id in plans:
+            continue
+        deadline_at = next_deadline(now, load.deadline)  # type: ignore[arg-type]
+        if monotonic() - started > time_budget_s:
+            plans[load.entity_id] = DeferrablePlan(load.entity_id, deadline_at, (), False)
+            continue
+        needed = math.ceil(max(0.0, remaining_min.get(load.entity_id, 0.0)) / SLOT_MINUTES)
+        candidates = [start for start in surplus if start < deadline_at]
+        chosen = sorted(
+            sorted(candidates, key=lambda start: surplus[start], reverse=True)[:needed]
+        )
+        for start in chosen:
+            surplus[start] -= max(0, load.min_surplus_w)
+        plans[load.entity_id] = DeferrablePlan(
+            entity_id=load.entity_id,
+            deadline_at=deadline_at,
+            slot_starts=tuple(chosen),
+            complete=len(chosen) >= needed,
+        )
+    return plans
+
+
+def decide_deferrable(
+    *,
+    now: datetime,
+    loads: list[LoadConfig],
+    runtimes: dict[str, LoadRuntime],
+    remaining_min: dict[str, float],
+    plans: dict[str, DeferrablePlan],
+    margin_min: int,
+    headroom_w: int | None = None,
+) -> tuple[EngineAction | None, set[str]]:
+    """Return a start action for a deferrable load and the loads to keep running.
+
+    A load is forced on when its deadline would otherwise be missed (ignoring
+    cooldown), or started in a planned slot once its cooldown has passed. Loads
+    that are running for either reason are returned so the self-consumption
+    rules do not turn them off. ``headroom_w`` (import cap margin) prevents
+    forcing a start that would immediately trip peak shaving.
+    """
+    action: EngineAction | None = None
+    protected: set[str] = set()
+    for load in sorted(loads, key=lambda item: item.priority):
+        if load.required_runtime_min <= 0 or load.deadline is None:
+            continue
+        remaining = remaining_min.get(load.entity_id, float(load.required_runtime_min))
+        if remaining <= 0:
+            continue
+        runtime = runtimes[load.entity_id]
+        plan = plans.get(load.entity_id)
+        deadline_at = plan.deadline_at if plan is not None else next_deadline(now, load.deadline)
+        forced = must_run(
+            now=now, deadline_at=deadline_at, remaining_min=remaining, margin_min=margin_min
+        )
+        planned = plan is not None and plan.is_active(now)
+        if not forced and not planned:
+            continue
+        protected.add(load.entity_id)
+        if runtime.is_on or action is not None:
+            continue
+        if forced:
+            if headroom_w is not None and max(0, load.min_surplus_w) > headroom_w:
+                continue
+            reason = f"deadline {deadline_at:%H:%M}, {remaining:.0f} min left"
+        else:
+            if not cooldown_passed(now, runtime, load.cooldown_min):
+                continue
+            reason = f"planned slot, {remaining:.0f} min left before {deadline_at:%H:%M}"
+        action = EngineAction(
+            action="turn_on", entity_id=load.entity_id, reason=reason, forced=forced
+        )
+    return action, protected
@@ -0,0 +1,134 @@
+"""Counterfactual evaluation of inactive strategies (shadow mode)."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import replace
+from datetime import datetime
+from typing import Any
+
+from .engine import EngineAction, LoadRuntime
+from .strategies import Strategy, StrategyContext
+
+
+class ShadowRecord:
+    """Virtual load states and accumulated metrics for one strategy."""
+
+    __slots__ = ("runtimes", "actions", "import_wh", "export_wh", "last_action")
+
+    def __init__(self) -> None:
+        """Start with no divergence from the real load states."""
+        self.runtimes: dict[str, LoadRuntime] = {}
+        self.actions = 0
+        self.import_wh = 0.0
+        self.export_wh = 0.0
+        self.last_action: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics in a diagnostics-friendly form."""
+        return {
+            "actions": self.actions,
+            "import_kwh": round(self.import_wh / 1000, 3),
+            "export_kwh": round(self.export_wh / 1000, 3),
+            "last_action": self.last_action,
+            "diverged_loads": sorted(self.runtimes),
+        }
+
+
+class ShadowEvaluator:
+    """Run every strategy on the same cycle inputs; only the active one acts.
+
+    Inactive strategies keep virtual load states where their decisions differ
+    from reality. Their surplus and the measured grid flow are corrected by
+    the nominal power (``min_surplus_w``) of those loads, which gives a cheap
+    estimate of the grid import/export each strategy would have caused.
+    Duration timers are shared with the real site.
+    """
+
+    __slots__ = ("_records", "_last_now")
+
+    def __init__(self) -> None:
+        """Create an evaluator without history."""
+        self._records: dict[str, ShadowRecord] = {}
+        self._last_now: datetime | None = None
+
+    def evaluate(
+        self,
+        *,
+        context: StrategyContext,
+        strategies: Iterable[Strategy],
+        active: str,
+        grid_import_w: int,
+        grid_export_w: int,
+    ) -> dict[str, EngineAction | None]:
+        """Decide one cycle for every strategy and accumulate their metrics.
+
+        ``context.surplus_w`` may be battery-adjusted, so the counterfactual
+        energy is integrated from the measured ``grid_import_w`` and
+        ``grid_export_w`` instead.
+        """
+        elapsed_s = (
+            max(0.0, (context.now - self._last_now).total_seconds())
+            if self._last_now is not None
+            else 0.0
+        )
+        self._last_now = context.now
+        power_w = {load.entity_id: max(0, load.min_surplus_w) for load in context.loads}
+
+        decisions: dict[str, EngineAction | None] = {}
+        for strategy in strategies:
+            record = self._records.setdefault(strategy.name, ShadowRecord())
+            if strategy.name == active:
+                # Reality follows the active strategy.
+                record.runtimes.clear()
+            # Drop divergences that reality has caught up with, or loads that are gone.
+            for entity_id in list(record.runtimes):
+                real = context.runtimes.get(entity_id)
+                if real is None or real.is_on == record.runtimes[entity_id].is_on:
+                    del record.runtimes[entity_id]
+
+            shift_w = sum(
+                power_w.get(entity_id, 0) * (1 if runtime.is_on else -1)
+                for entity_id, runtime in record.runtimes.items()
+            )
+            surplus_w = context.surplus_w - shift_w
+            grid_w = grid_export_w - grid_import_w - shift_w
+            record.import_wh += max(0, -grid_w) * elapsed_s / 3600
+            record.export_wh += max(0, grid_w) * elapsed_s / 3600
+
+            shadow_context = context
+            if record.runtimes:
+                shadow_context = replace(
+                    context,
+                    surplus_w=surplus_w,
+                    grid_import_w=max(0, -surplus_w),
+                    runtimes={**context.runtimes, **record.runtimes},
+                )
+            action = strategy.decide(shadow_context)
+            decisions[strategy.name] = action
+            if action is None:
+                continue
+
+            record.actions += 1
+            record.last_action = f"{action.action} {action.entity_id}"
+            if strategy.name != active and action.action in ("turn_on", "turn_off"):
+                current = shadow_context.runtimes[action.entity_id]
+                record.runtimes[action.entity_id] = (
+                    LoadRuntime(is_on=True, last_on=context.now, last_off=current.last_off)
+                    if action.action == "turn_on"
+                    else LoadRuntime(is_on=False, last_on=current.last_on, last_off=context.now)
+                )
+        return decisions
+
+    def end_cycle(self, now: datetime) -> None:
+        """Start the next interval at ``now``, also after a cycle that was not evaluated.
+
+        Time spent in cycles that never reached ``evaluate`` (grid limits,
+        deferrable starts, optimization off) is dropped instead of being
+        attributed to the next evaluated cycle in one chunk.
+        """
+        self._last_now = now
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        """Return accumulated metrics per strategy."""
+        return {name: record.as_dict() for name, record in self._records.items()}
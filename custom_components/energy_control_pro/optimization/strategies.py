@@ -0,0 +1,154 @@
+"""Pluggable optimization strategies keyed by name."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from ..const import (
+    DEFAULT_BALANCED_EXPORT_WEIGHT,
+    DEFAULT_BALANCED_IMPORT_WEIGHT,
+    DEFAULT_BALANCED_SWITCH_PENALTY_W,
+    STRATEGY_AVOID_GRID_IMPORT,
+    STRATEGY_BALANCED,
+    STRATEGY_MAXIMIZE_SELF_CONSUMPTION,
+    STRATEGY_MINIMIZE_COST,
+)
+from .engine import (
+    EngineAction,
+    LoadConfig,
+    LoadRuntime,
+    decide_balanced,
+    decide_cost,
+    decide_turn_off,
+    decide_turn_on,
+)
+
+
+@dataclass(frozen=True)
+class StrategyContext:
+    """Inputs of one optimization cycle, as seen by a strategy."""
+
+    now: datetime
+    surplus_w: int
+    grid_import_w: int
+    export_duration_min: int
+    import_duration_min: int
+    import_threshold_w: int
+    duration_threshold_min: int
+    loads: list[LoadConfig]
+    runtimes: dict[str, LoadRuntime]
+    forecast_surplus_w: int | None = None
+    import_price: float | None = None
+    export_price: float = 0.0
+    cheapest_import_price: float | None = None
+    mean_import_price: float | None = None
+
+
+@dataclass(frozen=True)
+class Strategy:
+    """A named policy that picks at most one load switch per cycle."""
+
+    name: str
+    decide: Callable[[StrategyContext], EngineAction | None]
+    # Decisions depend on power magnitudes, not only on threshold crossings.
+    exact_power: bool = False
+
+
+def _turn_on(context: StrategyContext) -> EngineAction | None:
+    return decide_turn_on(
+        now=context.now,
+        surplus_w=context.surplus_w,
+        export_duration_min=context.export_duration_min,
+        min_surplus_duration_min=context.duration_threshold_min,
+        loads=context.loads,
+        runtimes=context.runtimes,
+        forecast_surplus_w=context.forecast_surplus_w,
+    )
+
+
+def _turn_off(context: StrategyContext) -> EngineAction | None:
+    return decide_turn_off(
+        now=context.now,
+        grid_import_w=context.grid_import_w,
+        import_duration_min=context.import_duration_min,
+        import_threshold_w=context.import_threshold_w,
+        duration_threshold_min=context.duration_threshold_min,
+        loads=context.loads,
+        runtimes=context.runtimes,
+        forecast_surplus_w=context.forecast_surplus_w,
+    )
+
+
+def _maximize_self_consumption(context: StrategyContext) -> EngineAction | None:
+    return _turn_on(context) or _turn_off(context)
+
+
+def _avoid_grid_import(context: StrategyContext) -> EngineAction | None:
+    return _turn_off(context) or _turn_on(context)
+
+
+def _balanced(context: StrategyContext) -> EngineAction | None:
+    return decide_balanced(
+        now=context.now,
+        surplus_w=context.surplus_w,
+        grid_import_w=context.grid_import_w,
+        export_duration_min=context.export_duration_min,
+        import_duration_min=context.import_duration_min,
+        import_threshold_w=context.import_threshold_w,
+        duration_threshold_min=context.duration_threshold_min,
+        loads=context.loads,
+        runtimes=context.runtimes,
+        import_weight=DEFAULT_BALANCED_IMPORT_WEIGHT,
+        export_weight=DEFAULT_BALANCED_EXPORT_WEIGHT,
+        switch_penalty_w=DEFAULT_BALANCED_SWITCH_PENALTY_W,
+        forecast_surplus_w=context.forecast_surplus_w,
+    )
+
+
+def _minimize_cost(context: StrategyContext) -> EngineAction | None:
+    if (
+        context.import_price is None
+        or context.cheapest_import_price is None
+        or context.mean_import_price is None
+    ):
+        # Without price data the cost strategy falls back to self-consumption.
+        return _maximize_self_consumption(context)
+    return decide_cost(
+        now=context.now,
+        surplus_w=context.surplus_w,
+        grid_import_w=context.grid_import_w,
+        export_duration_min=context.export_duration_min,
+        import_duration_min=context.import_duration_min,
+        import_threshold_w=context.import_threshold_w,
+        duration_threshold_min=context.duration_threshold_min,
+        import_price=context.import_price,
+        export_price=context.export_price,
+        cheapest_import_price=context.cheapest_import_price,
+        mean_import_price=context.mean_import_price,
+        loads=context.loads,
+        runtimes=context.runtimes,
+    )
+
+
+STRATEGY_REGISTRY: dict[str, Strategy] = {}
+
+
+def register_strategy(strategy: Strategy) -> None:
+    """Add or replace a strategy in the registry."""
+    STRATEGY_REGISTRY[strategy.name] = strategy
+
+
+def get_strategy(name: str) -> Strategy:
+    """Return the strategy for ``name``, defaulting to self-consumption."""
+    return STRATEGY_REGISTRY.get(name, STRATEGY_REGISTRY[STRATEGY_MAXIMIZE_SELF_CONSUMPTION])
+
+
+for _strategy in (
+    Strategy(STRATEGY_MAXIMIZE_SELF_CONSUMPTION, _maximize_self_consumption),
+    Strategy(STRATEGY_AVOID_GRID_IMPORT, _avoid_grid_import),
+    Strategy(STRATEGY_BALANCED, _balanced, exact_power=True),
+    Strategy(STRATEGY_MINIMIZE_COST, _minimize_cost),
+):
+    register_strategy(_strategy)
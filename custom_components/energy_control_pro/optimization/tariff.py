@@ -0,0 +1,153 @@
+"""Electricity price timelines for time-of-use and dynamic tariffs."""
+
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+import math
+from typing import Any
+
+SLOT_SECONDS = 15 * 60
+# Price schedule attributes used by common tariff integrations; all found are merged.
+PRICE_ATTRIBUTES: tuple[str, ...] = ("prices", "raw_today", "raw_tomorrow", "forecast")
+_START_KEYS: tuple[str, ...] = ("start", "startsAt", "start_time", "from", "datetime", "hour")
+_END_KEYS: tuple[str, ...] = ("end", "endsAt", "end_time", "till", "to")
+_PRICE_KEYS: tuple[str, ...] = ("price", "value", "total", "price_per_kwh")
+
+
+class PriceTimeline:
+    """Prices resampled to fixed 15-minute slots for O(1) lookups.
+
+    Besides the price per slot, the cheapest and mean price over the next
+    ``lookahead_slots`` are precomputed once per schedule change, so the
+    per-cycle queries are plain index arithmetic.
+    """
+
+    __slots__ = ("_start", "_prices", "_min_ahead", "_mean_ahead")
+
+    def __init__(self, start_ts: float, prices: Iterable[float], lookahead_slots: int) -> None:
+        """Build the timeline from consecutive slot prices starting at ``start_ts``."""
+        self._start = start_ts
+        self._prices = array("d", prices)
+        count = len(self._prices)
+        window = max(1, lookahead_slots)
+
+        prefix = array("d", [0.0] * (count + 1))
+        for index, price in enumerate(self._prices):
+            prefix[index + 1] = prefix[index] + price
+        self._mean_ahead = array("d", [0.0] * count)
+        for index in range(count):
+            end = min(count, index + window)
+            self._mean_ahead[index] = (prefix[end] - prefix[index]) / (end - index)
+
+        # Sliding-window minimum, scanned backwards with a monotonic deque.
+        self._min_ahead = array("d", [0.0] * count)
+        candidates: deque[int] = deque()
+        for index in range(count - 1, -1, -1):
+            while candidates and self._prices[candidates[-1]] >= self._prices[index]:
+                candidates.pop()
+            candidates.append(index)
+            while candidates[0] >= index + window:
+                candidates.popleft()
+            self._min_ahead[index] = self._prices[candidates[0]]
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def _index(self, ts: float) -> int | None:
+        index = math.floor((ts - self._start) / SLOT_SECONDS)
+        if 0 <= index < len(self._prices):
+            return index
+        return None
+
+    def price_at(self, ts: float) -> float | None:
+        """Return the price of the slot containing ``ts``, None outside the timeline."""
+        index = self._index(ts)
+        return self._prices[index] if index is not None else None
+
+    def cheapest_ahead(self, ts: float) -> float | None:
+        """Return the lowest price from ``ts`` over the lookahead window."""
+        index = self._index(ts)
+        return self._min_ahead[index] if index is not None else None
+
+    def mean_ahead(self, ts: float) -> float | None:
+        """Return the mean price from ``ts`` over the lookahead window."""
+        index = self._index(ts)
+        return self._mean_ahead[index] if index is not None else None
+
+
+def _to_timestamp(value: Any) -> float | None:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _interval_from_item(item: Mapping[str, Any]) -> tuple[float, float | None, float] | None:
+    start = next((_to_timestamp(item[key]) for key in _START_KEYS if key in item), None)
+    if start is None:
+        return None
+    end = next((_to_timestamp(item[key]) for key in _END_KEYS if key in item), None)
+    for key in _PRICE_KEYS:
+        if key in item:
+            try:
+                return start, end, float(item[key])
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def build_price_timeline(
+    intervals: Iterable[tuple[float, float | None, float]],
+    lookahead_slots: int,
+) -> PriceTimeline | None:
+    """Resample (start, end or None, price) intervals into a ``PriceTimeline``.
+
+    An interval without an end lasts until the next one starts; the last one
+    defaults to one hour. Gaps repeat the previous price.
+    """
+    ordered = sorted(intervals, key=lambda item: item[0])
+    if not ordered:
+        return None
+
+    first_ts = ordered[0][0]
+    start_ts = first_ts - first_ts % SLOT_SECONDS
+    last = ordered[-1]
+    end_ts = last[1] if last[1] is not None else last[0] + 3600
+    prices: list[float] = []
+    position = 0
+    price = ordered[0][2]
+    cursor = start_ts
+    while cursor < end_ts:
+        while position < len(ordered) and ordered[position][0] <= cursor:
+            price = ordered[position][2]
+            position += 1
+        prices.append(price)
+        cursor += SLOT_SECONDS
+    return PriceTimeline(start_ts, prices, lookahead_slots)
+
+
+def parse_price_attributes(
+    attributes: Mapping[str, Any], lookahead_slots: int
+) -> PriceTimeline | None:
+    """Parse a price entity's schedule attributes into a ``PriceTimeline``.
+
+    Lists of dicts with a start time and a price are merged across all known
+    attributes (Nord Pool ``raw_today``/``raw_tomorrow`` with ``start``/``end``/
+    ``value``, Tibber-style ``prices`` with ``startsAt``/``total``).
+    """
+    intervals: list[tuple[float, float | None, float]] = []
+    for name in PRICE_ATTRIBUTES:
+        raw = attributes.get(name)
+        if not isinstance(raw, list):
+            continue
+        for item in raw:
+            if isinstance(item, Mapping) and (interval := _interval_from_item(item)) is not None:
+                intervals.append(interval)
+    return build_price_timeline(intervals, lookahead_slots)
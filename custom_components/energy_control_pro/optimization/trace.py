@@ -0,0 +1,125 @@
+"""Bounded trace of optimization decisions for diagnostics."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from .engine import EngineAction, LoadConfig, LoadRuntime, cooldown_passed, min_on_time_passed
+from .strategies import StrategyContext
+
+# Slot layout: when, what decided, strategy name, cycle inputs, strategy inputs, action.
+_AT, _SOURCE, _STRATEGY, _INPUTS, _CONTEXT, _ACTION = range(6)
+_INPUT_FIELDS = (
+    "surplus_w",
+    "grid_import_w",
+    "battery_soc_pct",
+    "export_duration_min",
+    "import_duration_min",
+    "engine_export_duration_min",
+    "engine_import_duration_min",
+    "forecast_surplus_w",
+    "import_price",
+)
+
+
+def explain_candidates(
+    *, now: datetime, surplus_w: int, loads: list[LoadConfig], runtimes: dict[str, LoadRuntime]
+) -> dict[str, str]:
+    """Return why each load could or could not switch in one evaluation.
+
+    OFF loads report ``surplus`` (below their power), ``cooldown`` or
+    ``can_turn_on``; ON loads report ``min_on_time`` or ``can_turn_off``,
+    using the same public gate checks the engine applies.
+    Duration and import thresholds are shared by all loads and are part of
+    the recorded inputs instead.
+    """
+    result: dict[str, str] = {}
+    for load in loads:
+        runtime = runtimes.get(load.entity_id)
+        if runtime is None:
+            continue
+        if runtime.is_on:
+            result[load.entity_id] = (
+                "can_turn_off"
+                if min_on_time_passed(now, runtime, load.min_on_time_min)
+                else "min_on_time"
+            )
+        elif surplus_w < max(0, load.min_surplus_w):
+            result[load.entity_id] = "surplus"
+        elif not cooldown_passed(now, runtime, load.cooldown_min):
+            result[load.entity_id] = "cooldown"
+        else:
+            result[load.entity_id] = "can_turn_on"
+    return result
+
+
+class DecisionTrace:
+    """Ring buffer of the last ``size`` optimization evaluations.
+
+    Slots are preallocated and overwritten in place with references to the
+    cycle's immutable inputs and decision, so recording allocates nothing
+    and formats nothing; ``as_list`` builds the readable form (including the
+    per-load candidate evaluation) only when diagnostics are requested.
+    """
+
+    __slots__ = ("_slots", "_next", "_count")
+
+    def __init__(self, size: int) -> None:
+        """Preallocate ``size`` empty slots."""
+        self._slots: list[list[Any]] = [[None] * 6 for _ in range(max(1, size))]
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def record(
+        self,
+        now: datetime,
+        source: str,
+        action: EngineAction | None,
+        *,
+        inputs: Any = None,
+        strategy: str | None = None,
+        context: StrategyContext | None = None,
+    ) -> None:
+        """Store one evaluation; ``inputs`` is any object with the cycle's power fields."""
+        slot = self._slots[self._next]
+        slot[_AT] = now
+        slot[_SOURCE] = source
+        slot[_STRATEGY] = strategy
+        slot[_INPUTS] = inputs
+        slot[_CONTEXT] = context
+        slot[_ACTION] = action
+        self._next = (self._next + 1) % len(self._slots)
+        self._count = min(self._count + 1, len(self._slots))
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return the recorded evaluations, oldest first."""
+        size = len(self._slots)
+        start = (self._next - self._count) % size
+        entries: list[dict[str, Any]] = []
+        for offset in range(self._count):
+            at, source, strategy, inputs, context, action = self._slots[(start + offset) % size]
+            entry: dict[str, Any] = {"at": at.isoformat(), "source": source}
+            if strategy is not None:
+                entry["strategy"] = strategy
+            if inputs is not None:
+                entry["inputs"] = {name: getattr(inputs, name, None) for name in _INPUT_FIELDS}
+            if context is not None:
+                entry["candidates"] = explain_candidates(
+                    now=context.now,
+                    surplus_w=context.surplus_w,
+                    loads=context.loads,
+                    runtimes=context.runtimes,
+                )
+            entry["action"] = (
+                None
+                if action is None
+                else {"action": action.action, "entity_id": action.entity_id, "reason": action.reason}
+            )
+            if action is not None and action.value is not None:
+                entry["action"]["value"] = action.value
+            entries.append(entry)
+        return entries
@@ -6,10 +6,10 @@ from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, STRATEGIES
 from .coordinator import EnergyControlProCoordinator
+from .entity import EnergyControlProEntity
 
 
 async def async_setup_entry(
@@ -22,16 +22,14 @@ async def async_setup_entry(
     async_add_entities([EnergyControlProStrategySelect(coordinator, entry)])
 
 
-class EnergyControlProStrategySelect(
-    CoordinatorEntity[EnergyControlProCoordinator],
-    SelectEntity,
-):
+class EnergyControlProStrategySelect(EnergyControlProEntity, SelectEntity):
     """Runtime strategy selector."""
 
     _attr_has_entity_name = True
     _attr_name = "Energy Control Pro Strategy"
     _attr_options = list(STRATEGIES)
     _attr_icon = "mdi:sitemap-outline"
+    _data_key = "strategy"
 
     def __init__(self, coordinator: EnergyControlProCoordinator, entry: ConfigEntry) -> None:
         super().__init__(coordinator)
@@ -39,7 +37,7 @@ class EnergyControlProStrategySelect(
 
     @property
     def current_option(self) -> str | None:
-        return str(self.coordinator.data.get("strategy", STRATEGIES[0]))
+        return self.coordinator.strategy
 
     async def async_select_option(self, option: str) -> None:
         await self.coordinator.async_set_strategy(option)
@@ -2,28 +2,39 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass
+from typing import Any
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
-    SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfPower, UnitOfTime
+from homeassistant.const import UnitOfEnergy, UnitOfPower, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .coordinator import EnergyControlProCoordinator
-from .const import DOMAIN
+from .const import (
+    CONF_SHADOW_MODE,
+    CONF_THERMAL_LOAD_ENTITY,
+    DEFAULT_SHADOW_MODE,
+    DOMAIN,
+    STRATEGIES,
+)
+from .entity import EnergyControlProEntity
+from .snapshot import CycleSnapshot
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, kw_only=True)
 class EnergyControlProSensorDescription(SensorEntityDescription):
     """Describes Energy Control Pro sensor entity."""
 
+    value_fn: Callable[[CycleSnapshot], int | float | str | None]
+
 
 SENSOR_DESCRIPTIONS: tuple[EnergyControlProSensorDescription, ...] = (
     EnergyControlProSensorDescription(
@@ -32,6 +43,7 @@ SENSOR_DESCRIPTIONS: tuple[EnergyControlProSensorDescription, ...] = (
         native_unit_of_measurement=UnitOfPower.WATT,
         device_class=SensorDeviceClass.POWER,
         icon="mdi:solar-power",
+        value_fn=lambda data: data.solar_w,
     ),
     EnergyControlProSensorDescription(
         key="load_w",
@@ -39,6 +51,7 @@ SENSOR_DESCRIPTIONS: tuple[EnergyControlProSensorDescription, ...] = (
         native_unit_of_measurement=UnitOfPower.WATT,
         device_class=SensorDeviceClass.POWER,
         icon="mdi:home-lightning-bolt",
+        value_fn=lambda data: data.load_w,
     ),
     EnergyControlProSensorDescription(
         key="surplus_w",
@@ -46,6 +59,7 @@ SENSOR_DESCRIPTIONS: tuple[EnergyControlProSensorDescription, ...] = (
         native_unit_of_measurement=UnitOfPower.WATT,
         device_class=SensorDeviceClass.POWER,
         icon="mdi:transmission-tower-export",
+        value_fn=lambda data: data.surplus_w,
     ),
     EnergyControlProSensorDescription(
         key="grid_import_w",
@@ -53,6 +67,7 @@ SENSOR_DESCRIPTIONS: tuple[EnergyControlProSensorDescription, ...] = (
         native_unit_of_measurement=UnitOfPower.WATT,
         device_class=SensorDeviceClass.POWER,
         icon="mdi:transmission-tower-import",
+        value_fn=lambda data: data.grid_import_w,
     ),
     EnergyControlProSensorDescription(
         key="grid_export_w",
@@ -60,11 +75,21 @@ SENSOR_DESCRIPTIONS: tuple[EnergyControlProSensorDescription, ...] = (
         native_unit_of_measurement=UnitOfPower.WATT,
         device_class=SensorDeviceClass.POWER,
         icon="mdi:transmission-tower-export",
+        value_fn=lambda data: data.grid_export_w,
+    ),
+    EnergyControlProSensorDescription(
+        key="load_forecast_w",
+        name="Load Forecast",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        icon="mdi:home-clock",
+        value_fn=lambda data: data.load_forecast_w,
     ),
     EnergyControlProSensorDescription(
         key="energy_state",
         name="Energy State",
         icon="mdi:flash",
+        value_fn=lambda data: data.energy_state,
     ),
     EnergyControlProSensorDescription(
         key="export_duration_min",
@@ -73,6 +98,7 @@ SENSOR_DESCRIPTIONS: tuple[EnergyControlProSensorDescription, ...] = (
         device_class=SensorDeviceClass.DURATION,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:timer-outline",
+        value_fn=lambda data: data.export_duration_min,
     ),
     EnergyControlProSensorDescription(
         key="import_duration_min",
@@ -81,14 +107,58 @@ SENSOR_DESCRIPTIONS: tuple[EnergyControlProSensorDescription, ...] = (
         device_class=SensorDeviceClass.DURATION,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:timer-outline",
+        value_fn=lambda data: data.import_duration_min,
     ),
     EnergyControlProSensorDescription(
         key="last_action",
         name="Energy Control Pro Last Action",
         icon="mdi:clipboard-text-clock-outline",
+        value_fn=lambda data: data.last_action,
     ),
 )
 
+THERMAL_SENSOR_DESCRIPTION = EnergyControlProSensorDescription(
+    key="thermal_stored_kwh",
+    name="Thermal Stored Energy",
+    native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+    device_class=SensorDeviceClass.ENERGY_STORAGE,
+    state_class=SensorStateClass.MEASUREMENT,
+    icon="mdi:water-boiler",
+    value_fn=lambda data: data.thermal_stored_kwh,
+)
+
+SHADOW_SENSOR_DESCRIPTIONS: tuple[EnergyControlProSensorDescription, ...] = tuple(
+    description
+    for strategy in STRATEGIES
+    for description in (
+        EnergyControlProSensorDescription(
+            key=f"shadow_{strategy}_import_kwh",
+            name=f"Shadow {strategy} Grid Import",
+            native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+            device_class=SensorDeviceClass.ENERGY,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            icon="mdi:transmission-tower-import",
+            value_fn=lambda data, key=f"shadow_{strategy}_import_kwh": data.shadow.get(key),
+        ),
+        EnergyControlProSensorDescription(
+            key=f"shadow_{strategy}_export_kwh",
+            name=f"Shadow {strategy} Grid Export",
+            native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+            device_class=SensorDeviceClass.ENERGY,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            icon="mdi:transmission-tower-export",
+            value_fn=lambda data, key=f"shadow_{strategy}_export_kwh": data.shadow.get(key),
+        ),
+        EnergyControlProSensorDescription(
+            key=f"shadow_{strategy}_actions",
+            name=f"Shadow {strategy} Actions",
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            icon="mdi:counter",
+            value_fn=lambda data, key=f"shadow_{strategy}_actions": data.shadow.get(key),
+        ),
+    )
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -98,20 +168,28 @@ async def async_setup_entry(
     """Set up Energy Control Pro sensors from a config entry."""
     coordinator: EnergyControlProCoordinator = hass.data[DOMAIN][entry.entry_id]
 
+    descriptions = SENSOR_DESCRIPTIONS
+    if entry.options.get(CONF_SHADOW_MODE, entry.data.get(CONF_SHADOW_MODE, DEFAULT_SHADOW_MODE)):
+        descriptions += SHADOW_SENSOR_DESCRIPTIONS
+    if entry.options.get(CONF_THERMAL_LOAD_ENTITY, entry.data.get(CONF_THERMAL_LOAD_ENTITY)):
+        descriptions += (THERMAL_SENSOR_DESCRIPTION,)
+
     async_add_entities(
         EnergyControlProSensor(coordinator, entry, description)
-        for description in SENSOR_DESCRIPTIONS
+        for description in descriptions
     )
 
 
-class EnergyControlProSensor(
-    CoordinatorEntity[EnergyControlProCoordinator],
-    SensorEntity,
-):
-    """Representation of an Energy Control Pro sensor."""
+class EnergyControlProSensor(EnergyControlProEntity, RestoreSensor):
+    """Representation of an Energy Control Pro sensor.
+
+    Until the first live data arrives the last known value is restored and
+    flagged with a ``stale`` attribute.
+    """
 
     entity_description: EnergyControlProSensorDescription
     _attr_has_entity_name = True
+
     def __init__(
         self,
         coordinator: EnergyControlProCoordinator,
@@ -121,9 +199,29 @@ class EnergyControlProSensor(
         """Initialize sensor entity."""
         super().__init__(coordinator)
         self.entity_description = description
+        self._data_key = description.key
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._restored_value: int | float | str | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last known value while no live data is available."""
+        await super().async_added_to_hass()
+        if self.coordinator.data is None and (last := await self.async_get_last_sensor_data()):
+            self._restored_value = last.native_value  # type: ignore[assignment]
 
     @property
-    def native_value(self) -> int | str | None:
+    def native_value(self) -> int | float | str | None:
         """Return the current sensor value."""
-        return self.coordinator.data.get(self.entity_description.key)
+        if self.coordinator.data is None:
+            return self._restored_value
+        return self.entity_description.value_fn(self.coordinator.data)
+
+    @property
+    def available(self) -> bool:
+        """Keep showing the restored value while the first refresh is retried."""
+        return self.coordinator.data is None or super().available
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Flag restored values until live data arrives."""
+        return {"stale": True} if self.coordinator.data is None else None
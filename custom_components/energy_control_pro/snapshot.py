@@ -0,0 +1,92 @@
+"""Immutable per-cycle snapshot of the values published by the coordinator."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields, replace
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class CycleSnapshot:
+    """Values of one update cycle, built once and read by alerts, engine and entities."""
+
+    solar_w: int
+    load_w: int
+    battery_w: int
+    surplus_w: int
+    grid_import_w: int
+    grid_export_w: int
+    energy_state: str
+    import_duration_min: int
+    export_duration_min: int
+    optimization_enabled: bool
+    strategy: str
+    last_action: str
+    load_forecast_w: int | None = None
+    battery_soc_pct: float | None = None
+    forecast_surplus_w: int | None = None
+    import_price: float | None = None
+    cheapest_import_price: float | None = None
+    mean_import_price: float | None = None
+    export_price: float | None = None
+    thermal_stored_kwh: float | None = None
+    # Import/export durations of the balance the load rules see, which counts
+    # battery charge above the SOC target as surplus and discharge below it as
+    # import; equal to the grid durations without a battery.
+    engine_import_duration_min: int = 0
+    engine_export_duration_min: int = 0
+    # Shadow-mode metrics keyed by sensor key (``shadow_<strategy>_<metric>``).
+    shadow: Mapping[str, float] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a flat dict view for diagnostics."""
+        data = {name: getattr(self, name) for name in SNAPSHOT_FIELDS}
+        data.update(self.shadow)
+        return data
+
+
+SNAPSHOT_FIELDS: tuple[str, ...] = tuple(
+    item.name for item in fields(CycleSnapshot) if item.name != "shadow"
+)
+POWER_FIELDS = frozenset(name for name in SNAPSHOT_FIELDS if name.endswith("_w"))
+
+
+def diff_snapshots(
+    previous: CycleSnapshot | None,
+    current: CycleSnapshot,
+    *,
+    deadband_w: int,
+) -> tuple[CycleSnapshot, frozenset[str]]:
+    """Return the snapshot to publish and the keys whose published value changed.
+
+    Power fields keep their previous value while the new one is within
+    ``deadband_w``, unless they move to or away from zero. Without a previous
+    snapshot every key counts as changed.
+    """
+    if previous is None:
+        return current, frozenset(SNAPSHOT_FIELDS) | frozenset(current.shadow)
+    changed: set[str] = set()
+    held: dict[str, int] = {}
+    for name in SNAPSHOT_FIELDS:
+        old = getattr(previous, name)
+        value = getattr(current, name)
+        if value == old:
+            continue
+        if (
+            name in POWER_FIELDS
+            and value is not None
+            and old is not None
+            and (value == 0) == (old == 0)
+            and abs(value - old) < deadband_w
+        ):
+            held[name] = old
+            continue
+        changed.add(name)
+    if current.shadow != previous.shadow:
+        changed.update(
+            key
+            for key in current.shadow.keys() | previous.shadow.keys()
+            if current.shadow.get(key) != previous.shadow.get(key)
+        )
+    return (replace(current, **held) if held else current), frozenset(changed)
@@ -6,10 +6,10 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import EnergyControlProCoordinator
+from .entity import EnergyControlProEntity
 
 
 async def async_setup_entry(
@@ -22,15 +22,13 @@ async def async_setup_entry(
     async_add_entities([EnergyControlProOptimizationSwitch(coordinator, entry)])
 
 
-class EnergyControlProOptimizationSwitch(
-    CoordinatorEntity[EnergyControlProCoordinator],
-    SwitchEntity,
-):
+class EnergyControlProOptimizationSwitch(EnergyControlProEntity, SwitchEntity):
     """Global optimization switch."""
 
     _attr_has_entity_name = True
     _attr_name = "Energy Control Pro Optimization"
     _attr_icon = "mdi:tune-variant"
+    _data_key = "optimization_enabled"
 
     def __init__(self, coordinator: EnergyControlProCoordinator, entry: ConfigEntry) -> None:
         super().__init__(coordinator)
@@ -38,7 +36,7 @@ class EnergyControlProOptimizationSwitch(
 
     @property
     def is_on(self) -> bool:
-        return bool(self.coordinator.data.get("optimization_enabled", False))
+        return self.coordinator.optimization_enabled
 
     async def async_turn_on(self, **kwargs) -> None:  # noqa: ANN003
         await self.coordinator.async_set_optimization_enabled(True)
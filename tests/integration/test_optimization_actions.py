@@ -10,15 +10,20 @@ pytest.importorskip("pytest_homeassistant_custom_component")
 pytest.importorskip("homeassistant")
 pytestmark = pytest.mark.integration
 
+from custom_components.energy_control_pro import coordinator as coordinator_module
 from custom_components.energy_control_pro.coordinator import EnergyControlProCoordinator
+from custom_components.energy_control_pro.optimization.arbiter import LoadArbiter
 from custom_components.energy_control_pro.const import (
+    CONF_BATTERY_SOC_TARGET_PCT,
     CONF_DURATION_THRESHOLD_MIN,
     CONF_EXPORT_THRESHOLD_W,
     CONF_IMPORT_THRESHOLD_W,
+    CONF_LOAD_1_DEADLINE,
     CONF_LOAD_1_ENTITY,
     CONF_LOAD_1_MIN_ON_TIME_MIN,
     CONF_LOAD_1_MIN_SURPLUS_W,
     CONF_LOAD_1_PRIORITY,
+    CONF_LOAD_1_REQUIRED_RUNTIME_MIN,
     CONF_OPTIMIZATION_ENABLED,
     CONF_PROFILE,
     CONF_SIMULATION,
@@ -50,6 +55,7 @@ async def test_optimization_turns_on_load_when_exporting_stable(hass) -> None:
                 CONF_LOAD_1_PRIORITY: 1,
             },
             data={},
+            entry_id="test_entry",
         ),
     )
     coordinator._simulate_values = lambda profile, now: {  # type: ignore[method-assign]
@@ -59,7 +65,7 @@ async def test_optimization_turns_on_load_when_exporting_stable(hass) -> None:
         "grid_import_w": 0,
         "grid_export_w": 2000,
     }
-    coordinator._export_start = datetime.now() - timedelta(minutes=2)
+    coordinator._engine_export_start = datetime.now() - timedelta(minutes=2)
 
     await coordinator._async_update_data()
 
@@ -93,6 +99,7 @@ async def test_optimization_turns_off_load_when_importing_stable(hass) -> None:
                 CONF_LOAD_1_PRIORITY: 1,
             },
             data={},
+            entry_id="test_entry",
         ),
     )
     coordinator._simulate_values = lambda profile, now: {  # type: ignore[method-assign]
@@ -102,7 +109,7 @@ async def test_optimization_turns_off_load_when_importing_stable(hass) -> None:
         "grid_import_w": 1500,
         "grid_export_w": 0,
     }
-    coordinator._import_start = datetime.now() - timedelta(minutes=2)
+    coordinator._engine_import_start = datetime.now() - timedelta(minutes=2)
     coordinator._load_last_on["switch.test_load_1"] = datetime.now() - timedelta(minutes=3)
 
     await coordinator._async_update_data()
@@ -137,6 +144,7 @@ async def test_optimization_off_does_not_call_services(hass) -> None:  # type: i
                 CONF_LOAD_1_PRIORITY: 1,
             },
             data={},
+            entry_id="test_entry",
         ),
     )
     coordinator._simulate_values = lambda profile, now: {  # type: ignore[method-assign]
@@ -146,7 +154,7 @@ async def test_optimization_off_does_not_call_services(hass) -> None:  # type: i
         "grid_import_w": 0,
         "grid_export_w": 2200,
     }
-    coordinator._export_start = datetime.now() - timedelta(minutes=2)
+    coordinator._engine_export_start = datetime.now() - timedelta(minutes=2)
 
     await coordinator._async_update_data()
 
@@ -177,6 +185,7 @@ async def test_restart_does_not_trigger_immediate_action_without_conditions(hass
             CONF_LOAD_1_PRIORITY: 1,
         },
         data={},
+        entry_id="test_entry",
     )
 
     first = EnergyControlProCoordinator(hass, entry)
@@ -204,3 +213,118 @@ async def test_restart_does_not_trigger_immediate_action_without_conditions(hass
         if call.args and call.args[0] == "homeassistant"
     ]
     assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_battery_charge_above_soc_target_counts_as_stable_export(hass, monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    async_call = AsyncMock()
+    monkeypatch.setattr(type(hass.services), "async_call", async_call)
+    hass.states.async_set("switch.test_load_1", "off")
+    clock = [datetime(2026, 6, 1, 12, 0, 0)]
+
+    class _Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):  # type: ignore[no-untyped-def,override]
+            return clock[0]
+
+    monkeypatch.setattr(coordinator_module, "datetime", _Clock)
+
+    coordinator = EnergyControlProCoordinator(
+        hass,
+        SimpleNamespace(
+            options={
+                CONF_SIMULATION: True,
+                CONF_PROFILE: PROFILE_SUNNY_DAY,
+                CONF_OPTIMIZATION_ENABLED: True,
+                CONF_STRATEGY: STRATEGY_MAXIMIZE_SELF_CONSUMPTION,
+                CONF_IMPORT_THRESHOLD_W: 800,
+                CONF_EXPORT_THRESHOLD_W: 5000,
+                CONF_DURATION_THRESHOLD_MIN: 1,
+                CONF_BATTERY_SOC_TARGET_PCT: 90,
+                CONF_LOAD_1_ENTITY: "switch.test_load_1",
+                CONF_LOAD_1_MIN_SURPLUS_W: 1500,
+                CONF_LOAD_1_MIN_ON_TIME_MIN: 5,
+                CONF_LOAD_1_PRIORITY: 1,
+            },
+            data={},
+            entry_id="test_entry",
+        ),
+    )
+    # The full battery absorbs all surplus: the grid is balanced.
+    coordinator._simulate_values = lambda profile, now: {  # type: ignore[method-assign]
+        "solar_w": 3000,
+        "load_w": 1000,
+        "battery_w": 2000,
+        "battery_soc_pct": 95.0,
+        "surplus_w": 0,
+        "grid_import_w": 0,
+        "grid_export_w": 0,
+    }
+
+    await coordinator._async_update_data()
+    clock[0] += timedelta(minutes=2)
+    data = await coordinator._async_update_data()
+
+    assert (data.energy_state, data.export_duration_min) == ("balanced", 0)
+    assert data.engine_export_duration_min == 2
+    async_call.assert_any_call(
+        "homeassistant",
+        "turn_on",
+        {"entity_id": "switch.test_load_1"},
+        blocking=False,
+    )
+
+
+@pytest.mark.asyncio
+async def test_shared_load_is_forced_on_for_its_deadline_without_pooled_surplus(hass, monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    async_call = AsyncMock()
+    monkeypatch.setattr(type(hass.services), "async_call", async_call)
+    hass.states.async_set("switch.test_load_1", "off")
+    clock = [datetime(2026, 6, 1, 20, 0, 0)]
+
+    class _Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):  # type: ignore[no-untyped-def,override]
+            return clock[0]
+
+    monkeypatch.setattr(coordinator_module, "datetime", _Clock)
+
+    coordinator = EnergyControlProCoordinator(
+        hass,
+        SimpleNamespace(
+            options={
+                CONF_SIMULATION: True,
+                CONF_PROFILE: PROFILE_SUNNY_DAY,
+                CONF_OPTIMIZATION_ENABLED: True,
+                CONF_STRATEGY: STRATEGY_MAXIMIZE_SELF_CONSUMPTION,
+                CONF_EXPORT_THRESHOLD_W: 5000,
+                CONF_LOAD_1_ENTITY: "switch.test_load_1",
+                CONF_LOAD_1_MIN_SURPLUS_W: 2000,
+                CONF_LOAD_1_REQUIRED_RUNTIME_MIN: 90,
+                CONF_LOAD_1_DEADLINE: "21:00:00",
+            },
+            data={},
+            entry_id="test_entry",
+        ),
+    )
+    # Evening: no surplus here, and the other entry sharing the load imports.
+    coordinator._simulate_values = lambda profile, now: {  # type: ignore[method-assign]
+        "solar_w": 0,
+        "load_w": 500,
+        "surplus_w": -500,
+        "grid_import_w": 500,
+        "grid_export_w": 0,
+    }
+    arbiter = LoadArbiter(settle_s=30)
+    coordinator.async_attach_arbiter(arbiter)
+    arbiter.register("other_entry", ["switch.test_load_1"])
+    arbiter.offer("other_entry", -1000)
+
+    await coordinator._async_update_data()
+
+    async_call.assert_any_call(
+        "homeassistant",
+        "turn_on",
+        {"entity_id": "switch.test_load_1"},
+        blocking=False,
+    )
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+pytest.importorskip("homeassistant")
+pytestmark = pytest.mark.integration
+
+from homeassistant.core import State
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    mock_restore_cache_with_extra_data,
+)
+
+from custom_components.energy_control_pro.const import (
+    CONF_LOAD_POWER_ENTITY,
+    CONF_SIMULATION,
+    CONF_SOLAR_POWER_ENTITY,
+    DOMAIN,
+)
+
+
+@pytest.mark.asyncio
+async def test_setup_does_not_wait_for_unready_inputs(hass, enable_custom_integrations) -> None:  # type: ignore[no-untyped-def]
+    mock_restore_cache_with_extra_data(
+        hass,
+        [(State("sensor.solar_power", "2500"), {"native_value": 2500, "native_unit_of_measurement": "W"})],
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        options={
+            CONF_SIMULATION: False,
+            CONF_SOLAR_POWER_ENTITY: "sensor.inverter_power",
+            CONF_LOAD_POWER_ENTITY: "sensor.house_power",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    # The input entities do not exist yet; setup must still succeed.
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert "setup_s" in coordinator.startup_timings
+
+    await hass.async_block_till_done()
+    assert coordinator.data is None
+    state = hass.states.get("sensor.solar_power")
+    assert state is not None
+    assert state.state == "2500"
+    assert state.attributes.get("stale") is True
+
+    await hass.config_entries.async_unload(entry.entry_id)
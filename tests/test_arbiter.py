@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from custom_components.energy_control_pro.optimization.arbiter import LoadArbiter
+
+NOW = datetime(2026, 2, 15, 12, 0, 0)
+
+
+def _arbiter() -> LoadArbiter:
+    arbiter = LoadArbiter(settle_s=30)
+    arbiter.register("inverter_a", ["switch.boiler", "switch.pool_pump"])
+    arbiter.register("inverter_b", ["switch.boiler", "switch.heater"])
+    return arbiter
+
+
+def test_first_entry_controls_shared_entity_until_unloaded() -> None:
+    arbiter = _arbiter()
+
+    assert arbiter.is_shared("switch.boiler")
+    assert arbiter.controls("inverter_a", "switch.boiler")
+    assert not arbiter.controls("inverter_b", "switch.boiler")
+    assert arbiter.controls("inverter_b", "switch.heater")
+    assert arbiter.controls("inverter_b", "switch.unknown")
+
+    arbiter.unregister("inverter_a")
+    assert arbiter.controls("inverter_b", "switch.boiler")
+    assert not arbiter.is_shared("switch.boiler")
+
+
+def test_unshared_loads_skip_the_pool() -> None:
+    arbiter = _arbiter()
+    arbiter.offer("inverter_a", -500)
+
+    assert arbiter.reserve("inverter_a", "switch.pool_pump", 2000, now=NOW)
+    assert not arbiter.reserve("inverter_b", "switch.boiler", 100, now=NOW)
+
+
+def test_reservation_prevents_double_spending_pooled_surplus() -> None:
+    arbiter = _arbiter()
+    arbiter.register("inverter_b", ["switch.pool_pump"])
+    arbiter.offer("inverter_a", 1500)
+    arbiter.offer("inverter_b", 1000)
+
+    assert arbiter.available_w("switch.boiler", now=NOW) == 2500
+    assert arbiter.reserve("inverter_a", "switch.boiler", 2000, now=NOW)
+    # Readings do not include the boiler yet; only 500 W is left in the pool.
+    assert not arbiter.reserve("inverter_a", "switch.pool_pump", 1000, now=NOW + timedelta(seconds=10))
+    # Once the reservation settles, the offers themselves reflect the running boiler.
+    arbiter.offer("inverter_a", 0)
+    arbiter.offer("inverter_b", 1000)
+    assert arbiter.reserve("inverter_a", "switch.pool_pump", 1000, now=NOW + timedelta(seconds=30))
+
+
+def test_importing_entry_blocks_shared_start() -> None:
+    arbiter = _arbiter()
+    arbiter.offer("inverter_a", 1500)
+    arbiter.offer("inverter_b", -800)
+
+    assert not arbiter.reserve("inverter_a", "switch.boiler", 1200, now=NOW)
+    assert arbiter.as_dict() == {"switch.boiler": {"controller": "inverter_a", "entries": 2}}
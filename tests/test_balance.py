@@ -23,3 +23,20 @@ def test_calculate_balance_balanced_case() -> None:
     assert result["surplus_w"] == 0
     assert result["grid_import_w"] == 0
     assert result["grid_export_w"] == 0
+
+
+def test_calculate_balance_battery_charging_absorbs_surplus() -> None:
+    result = calculate_balance(solar_w=4200, load_w=1800, battery_w=2000)
+
+    assert result["battery_w"] == 2000
+    assert result["surplus_w"] == 400
+    assert result["grid_import_w"] == 0
+    assert result["grid_export_w"] == 400
+
+
+def test_calculate_balance_battery_discharging_covers_load() -> None:
+    result = calculate_balance(solar_w=500, load_w=2300, battery_w=-1500)
+
+    assert result["surplus_w"] == -300
+    assert result["grid_import_w"] == 300
+    assert result["grid_export_w"] == 0
@@ -0,0 +1,60 @@
+import pytest
+
+from custom_components.energy_control_pro.optimization.constraints import (
+    ConstraintGroup,
+    ConstraintIndex,
+    parse_constraint_groups,
+)
+
+
+def test_parse_capacity_and_exclusive_groups() -> None:
+    groups = parse_constraint_groups(
+        """
+        # garage circuit
+        3600W: switch.ev, switch.boiler, switch.ev
+        exclusive: switch.dryer, switch.dishwasher
+        """
+    )
+
+    assert groups == [
+        ConstraintGroup(("switch.ev", "switch.boiler"), max_power_w=3600),
+        ConstraintGroup(("switch.dryer", "switch.dishwasher"), max_running=1),
+    ]
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["3600 switch.ev, switch.boiler", "3600: switch.ev", "abc: switch.ev, switch.boiler", "0: switch.a, switch.b"],
+)
+def test_parse_rejects_malformed_lines(text: str) -> None:
+    with pytest.raises(ValueError):
+        parse_constraint_groups(text)
+
+
+def test_index_blocks_loads_over_circuit_capacity_or_exclusive() -> None:
+    index = ConstraintIndex(
+        [
+            ConstraintGroup(("switch.ev", "switch.boiler"), max_power_w=3600),
+            ConstraintGroup(("switch.dryer", "switch.dishwasher"), max_running=1),
+        ]
+    )
+
+    blocked = index.blocked(
+        {"switch.ev": 2000, "switch.dryer": 2500},
+        {"switch.boiler": 2000, "switch.dishwasher": 1800, "switch.pump": 500},
+    )
+
+    assert blocked == {"switch.boiler", "switch.dishwasher"}
+
+
+def test_index_accounts_for_loads_started_in_the_same_cycle() -> None:
+    index = ConstraintIndex([ConstraintGroup(("switch.a", "switch.b", "switch.c"), max_power_w=3000)])
+    usage = index.usage({})
+
+    assert index.fits("switch.a", 1500, usage)
+    index.add("switch.a", 1500, usage)
+    assert index.fits("switch.b", 1500, usage)
+    index.add("switch.b", 1500, usage)
+    assert not index.fits("switch.c", 100, usage)
+    assert index.headroom_w("switch.c", usage) == 0
+    assert index.headroom_w("switch.unrelated", usage) is None
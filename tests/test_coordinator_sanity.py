@@ -1,13 +1,45 @@
 from __future__ import annotations
 
+import asyncio
+from datetime import datetime, timedelta
 from types import SimpleNamespace
 
 import pytest
 
 pytest.importorskip("homeassistant")
 
+from custom_components.energy_control_pro.optimization import forecast as forecast_module
+from custom_components.energy_control_pro import coordinator as coordinator_module
 from custom_components.energy_control_pro.coordinator import EnergyControlProCoordinator
-from custom_components.energy_control_pro.const import CONF_PROFILE, CONF_SIMULATION, PROFILE_SUNNY_DAY
+from custom_components.energy_control_pro.sensor import EnergyControlProSensor
+from custom_components.energy_control_pro.snapshot import CycleSnapshot
+from custom_components.energy_control_pro.optimization.arbiter import LoadArbiter
+from custom_components.energy_control_pro.optimization.eligibility import EligibilityQueue
+from custom_components.energy_control_pro.optimization.engine import EngineAction, LoadConfig
+from custom_components.energy_control_pro.optimization.load_profile import LoadProfile
+from custom_components.energy_control_pro.const import (
+    CONF_BATTERY_POWER_ENTITY,
+    CONF_BATTERY_SOC_ENTITY,
+    CONF_CURTAILMENT_ENTITY,
+    CONF_EXPORT_LIMIT_ENABLED,
+    CONF_EXPORT_LIMIT_W,
+    CONF_EXPORT_PRICE_ENTITY,
+    CONF_IMPORT_LIMIT_W,
+    CONF_IMPORT_PRICE_ENTITY,
+    CONF_LOAD_1_COOLDOWN_MIN,
+    CONF_LOAD_1_ENTITY,
+    CONF_LOAD_1_MIN_SURPLUS_W,
+    CONF_LOAD_2_ENTITY,
+    CONF_LOAD_2_MIN_SURPLUS_W,
+    CONF_LOAD_POWER_ENTITY,
+    CONF_PROFILE,
+    CONF_SIMULATION,
+    CONF_SOLAR_FORECAST_ENTITY,
+    CONF_SOLAR_POWER_ENTITY,
+    CONF_THERMAL_LOAD_ENTITY,
+    DEFAULT_FLAP_SWITCHES,
+    PROFILE_SUNNY_DAY,
+)
 
 
 class _DummyServices:
@@ -15,36 +47,491 @@ class _DummyServices:
         return None
 
 
+class _RecordingStore:
+    def __init__(self) -> None:
+        self.saves: list[dict] = []
+
+    def async_delay_save(self, data_func, delay):  # noqa: ANN001, ANN201
+        self.saves.append(data_func())
+
+
+def _coordinator(options, *, states=None, services=None, **overrides):  # type: ignore[no-untyped-def]
+    """Build a coordinator on a stub hass, then override the given attributes.
+
+    The stub hass has no event loop, so learned data is saved to recording stores.
+    """
+    hass = SimpleNamespace(
+        services=services if services is not None else _DummyServices(),
+        states=SimpleNamespace(get=(states if states is not None else {}).get),
+    )
+    coordinator = EnergyControlProCoordinator(
+        hass,  # type: ignore[arg-type]
+        SimpleNamespace(options=options, data={}, entry_id="test_entry"),  # type: ignore[arg-type]
+    )
+    coordinator._power_store = _RecordingStore()
+    coordinator._profile_store = _RecordingStore()
+    for name, value in overrides.items():
+        setattr(coordinator, name, value)
+    return coordinator
+
+
 @pytest.mark.asyncio
 async def test_async_update_data_returns_expected_keys_in_simulation_mode() -> None:
-    coordinator = EnergyControlProCoordinator.__new__(EnergyControlProCoordinator)
-    coordinator._entry = SimpleNamespace(  # type: ignore[attr-defined]
-        options={CONF_SIMULATION: True, CONF_PROFILE: PROFILE_SUNNY_DAY},
-        data={},
-    )
-    coordinator._import_start = None  # type: ignore[attr-defined]
-    coordinator._export_start = None  # type: ignore[attr-defined]
-    coordinator._import_alert_sent = False  # type: ignore[attr-defined]
-    coordinator._export_alert_sent = False  # type: ignore[attr-defined]
-    coordinator._load_last_on = {}  # type: ignore[attr-defined]
-    coordinator._load_last_off = {}  # type: ignore[attr-defined]
-    coordinator._optimization_enabled = False  # type: ignore[attr-defined]
-    coordinator._strategy = "maximize_self_consumption"  # type: ignore[attr-defined]
-    coordinator._last_action = "No actions yet"  # type: ignore[attr-defined]
-    coordinator.hass = SimpleNamespace(services=_DummyServices())  # type: ignore[attr-defined]
+    coordinator = _coordinator({CONF_SIMULATION: True, CONF_PROFILE: PROFILE_SUNNY_DAY})
 
     data = await coordinator._async_update_data()
 
-    assert set(data.keys()) == {
-        "solar_w",
-        "load_w",
-        "surplus_w",
-        "grid_import_w",
-        "grid_export_w",
-        "energy_state",
-        "import_duration_min",
-        "export_duration_min",
-        "optimization_enabled",
-        "strategy",
-        "last_action",
+    assert isinstance(data, CycleSnapshot)
+    assert data.surplus_w == data.solar_w - data.load_w - data.battery_w
+    assert data.energy_state in ("importing", "exporting", "balanced")
+    assert data.optimization_enabled is False
+    assert data.strategy == "maximize_self_consumption"
+    assert data.last_action == "No actions yet"
+    assert data.load_forecast_w == data.load_w
+    assert data.forecast_surplus_w is None
+    assert data.import_price is None
+    assert data.shadow == {}
+    assert coordinator.changed_keys == frozenset(data.as_dict())
+
+
+def test_entity_writes_state_only_when_its_value_changes() -> None:
+    sensor = EnergyControlProSensor.__new__(EnergyControlProSensor)
+    sensor.coordinator = SimpleNamespace(  # type: ignore[assignment]
+        last_update_success=True,
+        changed_keys=frozenset({"surplus_w"}),
+        data=object(),
+    )
+    sensor.coordinator.data_changed = lambda key: key in sensor.coordinator.changed_keys  # type: ignore[attr-defined]
+    sensor._data_key = "energy_state"  # type: ignore[attr-defined]
+    writes: list[bool] = []
+    sensor.async_write_ha_state = lambda: writes.append(True)  # type: ignore[method-assign]
+
+    sensor._handle_coordinator_update()  # first update after being added: availability is new
+    sensor._handle_coordinator_update()
+    sensor.coordinator.changed_keys = frozenset({"energy_state"})  # type: ignore[attr-defined]
+    sensor._handle_coordinator_update()
+    sensor.coordinator.last_update_success = False  # type: ignore[attr-defined]
+    sensor.coordinator.changed_keys = frozenset()  # type: ignore[attr-defined]
+    sensor._handle_coordinator_update()
+
+    assert len(writes) == 3
+
+
+class _RecordingServices:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str, dict]] = []
+
+    async def async_call(self, domain, service, data, blocking=False):  # noqa: ANN001, ANN201
+        self.calls.append((domain, service, data))
+
+
+@pytest.mark.asyncio
+async def test_fast_peak_check_sheds_load_above_import_cap() -> None:
+    states = {
+        "sensor.solar": SimpleNamespace(state="0", attributes={}),
+        "sensor.load": SimpleNamespace(state="9000", attributes={}),
+        "switch.boiler": SimpleNamespace(state="on", attributes={}),
+        "switch.heater": SimpleNamespace(state="on", attributes={}),
+    }
+    services = _RecordingServices()
+    coordinator = _coordinator(
+        {
+            CONF_SIMULATION: False,
+            CONF_SOLAR_POWER_ENTITY: "sensor.solar",
+            CONF_LOAD_POWER_ENTITY: "sensor.load",
+            CONF_IMPORT_LIMIT_W: 7000,
+            CONF_LOAD_1_ENTITY: "switch.heater",
+            CONF_LOAD_1_MIN_SURPLUS_W: 2000,
+            CONF_LOAD_2_ENTITY: "switch.boiler",
+            CONF_LOAD_2_MIN_SURPLUS_W: 2000,
+        },
+        states=states,
+        services=services,
+    )
+
+    await coordinator._async_fast_limit_check()
+
+    assert services.calls == [("homeassistant", "turn_off", {"entity_id": "switch.boiler"})]
+    assert coordinator._last_action.startswith("Peak shaving")
+    trace = coordinator._trace.as_list()
+    assert [(entry["source"], entry["action"]["entity_id"]) for entry in trace] == [
+        ("grid_limits", "switch.boiler")
+    ]
+
+    # The relay has not reported OFF yet and the meter still includes the
+    # boiler: neither is the command sent again nor is the heater shed as well.
+    await coordinator._async_fast_limit_check()
+    assert len(services.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_limit_check_turns_on_load_and_curtails_above_export_cap() -> None:
+    states = {
+        "sensor.solar": SimpleNamespace(state="6000", attributes={}),
+        "sensor.load": SimpleNamespace(state="500", attributes={}),
+        "switch.boiler": SimpleNamespace(state="off", attributes={}),
+        "input_boolean.curtail": SimpleNamespace(state="off", attributes={}),
+    }
+    services = _RecordingServices()
+    coordinator = _coordinator(
+        {
+            CONF_SIMULATION: False,
+            CONF_SOLAR_POWER_ENTITY: "sensor.solar",
+            CONF_LOAD_POWER_ENTITY: "sensor.load",
+            CONF_EXPORT_LIMIT_ENABLED: True,
+            CONF_EXPORT_LIMIT_W: 0,
+            CONF_CURTAILMENT_ENTITY: "input_boolean.curtail",
+            CONF_LOAD_1_ENTITY: "switch.boiler",
+            CONF_LOAD_1_MIN_SURPLUS_W: 2000,
+        },
+        states=states,
+        services=services,
+    )
+
+    await coordinator._async_fast_limit_check()
+
+    assert services.calls == [
+        ("homeassistant", "turn_on", {"entity_id": "switch.boiler"}),
+        ("homeassistant", "turn_on", {"entity_id": "input_boolean.curtail"}),
+    ]
+    assert coordinator._last_action.startswith("Export limit")
+
+
+@pytest.mark.asyncio
+async def test_power_updates_during_a_fast_check_are_coalesced() -> None:
+    coordinator = _coordinator({}, _optimization_enabled=True)
+    tasks: list[asyncio.Future] = []
+
+    def _create_task(target):  # type: ignore[no-untyped-def]
+        tasks.append(asyncio.ensure_future(target))
+
+    coordinator.hass.async_create_task = _create_task  # type: ignore[attr-defined]
+    release = asyncio.Event()
+    running: list[int] = []
+    active = 0
+
+    async def _check() -> None:
+        nonlocal active
+        active += 1
+        running.append(active)
+        await release.wait()
+        active -= 1
+
+    coordinator._async_fast_limit_check = _check  # type: ignore[method-assign]
+
+    for _ in range(5):
+        coordinator._handle_power_change(None)  # type: ignore[arg-type]
+        await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*tasks)
+
+    # One check for the first update and one more for the four that arrived meanwhile.
+    assert len(tasks) == 1
+    assert running == [1, 1]
+    coordinator._handle_power_change(None)  # type: ignore[arg-type]
+    assert len(tasks) == 2
+    await tasks[-1]
+
+
+@pytest.mark.asyncio
+async def test_fast_export_check_counts_pending_on_load_as_absorbed() -> None:
+    states = {
+        "sensor.solar": SimpleNamespace(state="3000", attributes={}),
+        "sensor.load": SimpleNamespace(state="1500", attributes={}),
+        "switch.boiler": SimpleNamespace(state="off", attributes={}),
+        "switch.heater": SimpleNamespace(state="off", attributes={}),
+        "input_boolean.curtail": SimpleNamespace(state="off", attributes={}),
+    }
+    services = _RecordingServices()
+    coordinator = _coordinator(
+        {
+            CONF_SIMULATION: False,
+            CONF_SOLAR_POWER_ENTITY: "sensor.solar",
+            CONF_LOAD_POWER_ENTITY: "sensor.load",
+            CONF_EXPORT_LIMIT_ENABLED: True,
+            CONF_EXPORT_LIMIT_W: 0,
+            CONF_CURTAILMENT_ENTITY: "input_boolean.curtail",
+            CONF_LOAD_1_ENTITY: "switch.boiler",
+            CONF_LOAD_1_MIN_SURPLUS_W: 2000,
+            CONF_LOAD_2_ENTITY: "switch.heater",
+            CONF_LOAD_2_MIN_SURPLUS_W: 1000,
+        },
+        states=states,
+        services=services,
+    )
+
+    await coordinator._async_fast_limit_check()
+    assert services.calls == [("homeassistant", "turn_on", {"entity_id": "switch.boiler"})]
+
+    # The meter still shows 1500 W export while the boiler starts: neither the
+    # heater nor curtailment is added for export the boiler will absorb.
+    await coordinator._async_fast_limit_check()
+    assert len(services.calls) == 1
+
+    # Once the boiler draws, remaining export is absorbed as usual.
+    states["switch.boiler"] = SimpleNamespace(state="on", attributes={})
+    states["sensor.load"] = SimpleNamespace(state="2000", attributes={})
+    await coordinator._async_fast_limit_check()
+    assert services.calls[1:] == [("homeassistant", "turn_on", {"entity_id": "switch.heater"})]
+
+
+@pytest.mark.asyncio
+async def test_fast_export_check_uses_flap_extended_cooldown() -> None:
+    states = {
+        "sensor.solar": SimpleNamespace(state="6000", attributes={}),
+        "sensor.load": SimpleNamespace(state="500", attributes={}),
+        "switch.boiler": SimpleNamespace(state="off", attributes={}),
+    }
+    services = _RecordingServices()
+    now = datetime.now()
+    coordinator = _coordinator(
+        {
+            CONF_SIMULATION: False,
+            CONF_SOLAR_POWER_ENTITY: "sensor.solar",
+            CONF_LOAD_POWER_ENTITY: "sensor.load",
+            CONF_EXPORT_LIMIT_ENABLED: True,
+            CONF_EXPORT_LIMIT_W: 0,
+            CONF_LOAD_1_ENTITY: "switch.boiler",
+            CONF_LOAD_1_MIN_SURPLUS_W: 2000,
+            CONF_LOAD_1_COOLDOWN_MIN: 10,
+        },
+        states=states,
+        services=services,
+        # Past the configured 10 minute cooldown, but not the doubled one.
+        _load_last_off={"switch.boiler": now - timedelta(minutes=15)},
+    )
+    tracker = coordinator._flap_tracker("switch.boiler")
+    for _ in range(DEFAULT_FLAP_SWITCHES):
+        tracker.record_switch(now)
+
+    await coordinator._async_fast_limit_check()
+
+    assert services.calls == []
+
+
+@pytest.mark.asyncio
+async def test_shared_load_reserves_the_power_the_cycle_decided_with() -> None:
+    services = _RecordingServices()
+    arbiter = LoadArbiter(settle_s=30)
+    arbiter.register("test_entry", ["switch.boiler"])
+    arbiter.register("other_entry", ["switch.boiler"])
+    arbiter.offer("test_entry", 1000)
+    arbiter.offer("other_entry", 500)
+    # Options still say 2000 W; the cycle decided with the learned 1200 W.
+    coordinator = _coordinator(
+        {CONF_LOAD_1_ENTITY: "switch.boiler", CONF_LOAD_1_MIN_SURPLUS_W: 2000},
+        services=services,
+        _arbiter=arbiter,
+    )
+    now = datetime(2026, 2, 15, 12, 0, 0)
+
+    await coordinator._async_execute_action(
+        EngineAction(action="turn_on", entity_id="switch.boiler", reason="surplus"),
+        now=now,
+        reserve_from=[
+            LoadConfig("switch.boiler", min_surplus_w=1200, min_on_time_min=5, cooldown_min=5, priority=1)
+        ],
+    )
+
+    assert services.calls == [("homeassistant", "turn_on", {"entity_id": "switch.boiler"})]
+    assert arbiter.available_w("switch.boiler", now=now) == 300
+
+
+def test_timer_heap_is_only_updated_when_a_load_switches() -> None:
+    states = {"switch.boiler": SimpleNamespace(state="off", attributes={})}
+    scheduled: list[str] = []
+
+    class _CountingQueue(EligibilityQueue):
+        def schedule(self, entity_id, eligible_at, *, now):  # type: ignore[no-untyped-def]
+            scheduled.append(entity_id)
+            super().schedule(entity_id, eligible_at, now=now)
+
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    coordinator = _coordinator(
+        {CONF_LOAD_1_ENTITY: "switch.boiler", CONF_LOAD_1_COOLDOWN_MIN: 10},
+        states=states,
+        _load_last_off={"switch.boiler": now},
+        _eligibility=_CountingQueue(),
+    )
+
+    for offset_s in range(0, 600, 10):
+        runtimes = coordinator._build_load_runtimes(
+            coordinator._adapted_load_configs(now), now=now + timedelta(seconds=offset_s)
+        )
+    assert scheduled == ["switch.boiler"]
+    assert runtimes["switch.boiler"].timer_expired is False
+
+    states["switch.boiler"] = SimpleNamespace(state="on", attributes={})
+    coordinator._load_last_on["switch.boiler"] = now + timedelta(minutes=10)
+    for offset_s in range(600, 700, 10):
+        coordinator._build_load_runtimes(
+            coordinator._adapted_load_configs(now), now=now + timedelta(seconds=offset_s)
+        )
+    assert scheduled == ["switch.boiler", "switch.boiler"]
+
+
+def test_unavailable_battery_counts_as_idle_instead_of_failing_the_cycle(caplog) -> None:  # type: ignore[no-untyped-def]
+    states = {
+        "sensor.solar": SimpleNamespace(state="3000", attributes={}),
+        "sensor.load": SimpleNamespace(state="1000", attributes={}),
+        "sensor.battery": SimpleNamespace(state="unavailable", attributes={}),
+        "sensor.battery_soc": SimpleNamespace(state="unknown", attributes={}),
     }
+    coordinator = _coordinator(
+        {
+            CONF_SIMULATION: False,
+            CONF_SOLAR_POWER_ENTITY: "sensor.solar",
+            CONF_LOAD_POWER_ENTITY: "sensor.load",
+            CONF_BATTERY_POWER_ENTITY: "sensor.battery",
+            CONF_BATTERY_SOC_ENTITY: "sensor.battery_soc",
+        },
+        states=states,
+    )
+
+    for _ in range(2):
+        data = coordinator._real_values_from_entities()
+        assert data["battery_w"] == 0
+        assert data["grid_export_w"] == 2000
+        assert "battery_soc_pct" not in data
+    # Logged once per entity, not once per cycle.
+    assert caplog.text.count("Ignoring battery input") == 2
+
+    states["sensor.battery"] = SimpleNamespace(state="500", attributes={})
+    states["sensor.battery_soc"] = SimpleNamespace(state="80", attributes={})
+    data = coordinator._real_values_from_entities()
+    assert (data["battery_w"], data["battery_soc_pct"]) == (500, 80.0)
+
+
+def test_forecast_is_parsed_once_per_entity_update(monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    parse_calls = []
+    real_parse = forecast_module.parse_forecast_attributes
+
+    def _counting_parse(attributes):  # type: ignore[no-untyped-def]
+        parse_calls.append(attributes)
+        return real_parse(attributes)
+
+    monkeypatch.setattr(forecast_module, "parse_forecast_attributes", _counting_parse)
+    forecast_state = SimpleNamespace(
+        state="ok",
+        last_updated=now,
+        attributes={
+            "forecast": [
+                {"datetime": now.isoformat(), "power_w": 3000},
+                {"datetime": (now + timedelta(hours=1)).isoformat(), "power_w": 3000},
+            ]
+        },
+    )
+    coordinator = _coordinator(
+        {CONF_SOLAR_FORECAST_ENTITY: "sensor.solar_forecast"},
+        states={"sensor.solar_forecast": forecast_state},
+    )
+
+    assert coordinator._forecast_surplus_w(1000, now=now) == 2000
+    assert coordinator._forecast_surplus_w(1200, now=now + timedelta(seconds=10)) == 1800
+    assert len(parse_calls) == 1
+
+    forecast_state.last_updated = now + timedelta(minutes=30)
+    coordinator._forecast_surplus_w(1000, now=now + timedelta(seconds=20))
+    assert len(parse_calls) == 2
+
+
+def test_price_data_uses_schedule_and_falls_back_to_state() -> None:
+    now = datetime(2026, 2, 15, 2, 0, 0)
+    import_state = SimpleNamespace(
+        state="0.30",
+        last_updated=now,
+        attributes={
+            "raw_today": [
+                {"start": (now + timedelta(hours=hour)).isoformat(), "value": value}
+                for hour, value in enumerate((0.30, 0.10, 0.20))
+            ]
+        },
+    )
+    export_state = SimpleNamespace(state="0.07", last_updated=now, attributes={})
+    coordinator = _coordinator(
+        {
+            CONF_IMPORT_PRICE_ENTITY: "sensor.import_price",
+            CONF_EXPORT_PRICE_ENTITY: "sensor.export_price",
+        },
+        states={"sensor.import_price": import_state, "sensor.export_price": export_state},
+    )
+
+    prices = coordinator._price_data(now=now)
+    assert prices["import_price"] == pytest.approx(0.30)
+    assert prices["cheapest_import_price"] == pytest.approx(0.10)
+    assert prices["mean_import_price"] == pytest.approx(0.20)
+    assert prices["export_price"] == pytest.approx(0.07)
+
+    # Past the end of the schedule only the current state price is known.
+    later = coordinator._price_data(now=now + timedelta(hours=5))
+    assert later["import_price"] == later["cheapest_import_price"] == pytest.approx(0.30)
+
+
+def test_thermal_stored_energy_reads_a_zero_degree_tank() -> None:
+    state = SimpleNamespace(state="heat", attributes={"temperature": 60, "current_temperature": 0.0})
+    coordinator = _coordinator(
+        {CONF_THERMAL_LOAD_ENTITY: "water_heater.tank"}, states={"water_heater.tank": state}
+    )
+
+    # 0.0 is a reading, not a missing one: the tank holds nothing above normal.
+    assert coordinator._thermal_stored_kwh() == 0.0
+    state.attributes = {"temperature": 60}
+    assert coordinator._thermal_stored_kwh() == 2.33
+
+
+def test_load_power_is_learned_from_single_transition_and_saved() -> None:
+    states = {"switch.heater": SimpleNamespace(state="off", attributes={})}
+    coordinator = _coordinator(
+        {CONF_LOAD_1_ENTITY: "switch.heater", CONF_LOAD_1_MIN_SURPLUS_W: 1200}, states=states
+    )
+
+    coordinator._learn_load_power(500)
+    states["switch.heater"].state = "on"
+    coordinator._learn_load_power(2500)
+    states["switch.heater"].state = "off"
+    coordinator._learn_load_power(600)
+
+    assert len(coordinator._power_store.saves) == 2
+    assert coordinator._load_configs()[0].min_surplus_w == 1950
+
+
+def test_load_profile_is_saved_once_per_slot() -> None:
+    coordinator = _coordinator({})
+    now = datetime(2026, 2, 16, 19, 0, 0)
+
+    for offset_s in range(0, 20 * 60, 10):
+        coordinator._learn_load_profile(now + timedelta(seconds=offset_s), 800)
+
+    # 120 samples over two 15-minute slots: one delayed save per slot.
+    saves = coordinator._profile_store.saves
+    assert len(saves) == 2
+    assert LoadProfile.from_dict(saves[-1]).slot_mean(now) == 800
+
+
+@pytest.mark.asyncio
+async def test_failed_deferrable_planning_keeps_previous_plans(monkeypatch, caplog) -> None:  # type: ignore[no-untyped-def]
+    def _fail(**kwargs):  # type: ignore[no-untyped-def]
+        raise ValueError("bad forecast")
+
+    async def _run_in_executor(func):  # type: ignore[no-untyped-def]
+        return func()
+
+    monkeypatch.setattr(coordinator_module, "plan_deferrable_loads", _fail)
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    previous = {"switch.dishwasher": SimpleNamespace(slot_starts=[])}
+    coordinator = _coordinator(
+        {},
+        hass=SimpleNamespace(async_add_executor_job=_run_in_executor),
+        _forecast=SimpleNamespace(average_w=lambda start, minutes: 0.0),
+        _forecast_updated=now,
+        _deferrable_plans=previous,
+    )
+
+    for _ in range(2):
+        await coordinator._async_replan_deferrable([], {"switch.dishwasher": 60.0}, 500, now=now)
+
+    assert coordinator._deferrable_plans is previous
+    assert coordinator._planner.stats() == {"runs": 2, "deadline_misses": 2, "late_results": 0}
+    # Retried every cycle, but logged once until planning recovers.
+    assert caplog.text.count("Deferrable planning failed") == 1
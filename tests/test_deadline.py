@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from custom_components.energy_control_pro.optimization.deadline import DeadlineRunner
+
+
+def _job(result: str, delay_s: float, started: list[str]):  # type: ignore[no-untyped-def]
+    async def _start() -> str:
+        started.append(result)
+        await asyncio.sleep(delay_s)
+        return result
+
+    return _start
+
+
+@pytest.mark.asyncio
+async def test_job_within_deadline_returns_result() -> None:
+    runner = DeadlineRunner()
+    started: list[str] = []
+
+    assert await runner.run(_job("plan", 0, started), deadline_s=1) == (True, "plan")
+    assert not runner.busy
+    assert runner.stats() == {"runs": 1, "deadline_misses": 0, "late_results": 0}
+
+
+@pytest.mark.asyncio
+async def test_missed_job_is_adopted_later_without_starting_new_work() -> None:
+    runner = DeadlineRunner()
+    started: list[str] = []
+
+    assert await runner.run(_job("slow", 0.05, started), deadline_s=0.01) == (False, None)
+    assert runner.busy
+    # The next cycle waits for the pending job instead of queueing another one.
+    assert await runner.run(_job("fresh", 0, started), deadline_s=1) == (True, "slow")
+    assert started == ["slow"]
+    assert await runner.run(_job("fresh", 0, started), deadline_s=1) == (True, "fresh")
+    assert runner.stats() == {"runs": 2, "deadline_misses": 1, "late_results": 1}
+
+
+@pytest.mark.asyncio
+async def test_job_errors_are_raised_once() -> None:
+    runner = DeadlineRunner()
+
+    async def _fail() -> None:
+        raise ValueError("bad plan")
+
+    with pytest.raises(ValueError):
+        await runner.run(_fail, deadline_s=1)
+    assert not runner.busy
+    assert runner.stats() == {"runs": 1, "deadline_misses": 1, "late_results": 0}
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from custom_components.energy_control_pro.optimization.eligibility import EligibilityQueue
+from custom_components.energy_control_pro.optimization.engine import (
+    LoadConfig,
+    LoadRuntime,
+    decide_turn_on,
+    timer_expires_at,
+)
+
+NOW = datetime(2026, 2, 15, 12, 0, 0)
+HEATER = LoadConfig("switch.heater", min_surplus_w=1000, min_on_time_min=5, cooldown_min=10, priority=1)
+
+
+def test_timer_expires_at_follows_current_state() -> None:
+    off = LoadRuntime(is_on=False, last_on=NOW - timedelta(minutes=30), last_off=NOW)
+    on = LoadRuntime(is_on=True, last_on=NOW, last_off=None)
+
+    assert timer_expires_at(HEATER, off) == NOW + timedelta(minutes=10)
+    assert timer_expires_at(HEATER, on) == NOW + timedelta(minutes=5)
+    assert timer_expires_at(HEATER, LoadRuntime(is_on=False, last_on=None, last_off=None)) is None
+
+
+def test_queue_expires_timers_in_order() -> None:
+    queue = EligibilityQueue()
+    queue.schedule("switch.a", NOW + timedelta(minutes=10), now=NOW)
+    queue.schedule("switch.b", NOW + timedelta(minutes=5), now=NOW)
+    queue.schedule("switch.c", None, now=NOW)
+
+    assert queue.next_at() == NOW + timedelta(minutes=5)
+    assert not queue.is_eligible("switch.a")
+    assert queue.is_eligible("switch.c")
+    assert queue.expire(NOW + timedelta(minutes=5)) == ["switch.b"]
+    assert queue.is_eligible("switch.b")
+    assert queue.next_at() == NOW + timedelta(minutes=10)
+
+
+def test_rescheduled_timer_replaces_the_old_instant() -> None:
+    queue = EligibilityQueue()
+    queue.schedule("switch.a", NOW + timedelta(minutes=5), now=NOW)
+    queue.schedule("switch.a", NOW + timedelta(minutes=20), now=NOW)
+
+    assert queue.next_at() == NOW + timedelta(minutes=20)
+    assert queue.expire(NOW + timedelta(minutes=10)) == []
+    assert not queue.is_eligible("switch.a")
+
+    queue.schedule("switch.a", NOW - timedelta(minutes=1), now=NOW)
+    assert queue.is_eligible("switch.a")
+    assert queue.next_at() is None
+
+
+def test_precomputed_timer_flag_is_used_by_the_engine() -> None:
+    # A cooldown that has not passed by timestamps, but the caller already expired it.
+    runtime = LoadRuntime(is_on=False, last_on=None, last_off=NOW, timer_expired=True)
+
+    action = decide_turn_on(
+        now=NOW,
+        surplus_w=1500,
+        export_duration_min=15,
+        min_surplus_duration_min=10,
+        loads=[HEATER],
+        runtimes={HEATER.entity_id: runtime},
+    )
+
+    assert action is not None
+    assert action.entity_id == "switch.heater"
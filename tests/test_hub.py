@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.energy_control_pro import hub as hub_module
+from custom_components.energy_control_pro.coordinator import EnergyControlProCoordinator
+from custom_components.energy_control_pro.hub import EnergyControlProHub
+from custom_components.energy_control_pro.optimization.arbiter import LoadArbiter
+from custom_components.energy_control_pro.optimization.power_learning import LoadPowerLearner
+
+ENTRIES = 50
+SLICES = 5
+
+
+class _CountingStates:
+    def __init__(self) -> None:
+        self.reads = 0
+
+    def get(self, entity_id: str) -> SimpleNamespace:
+        self.reads += 1
+        return SimpleNamespace(entity_id=entity_id, state="100")
+
+
+class _FakeCoordinator:
+    def __init__(self, site: int) -> None:
+        self.site = site
+        self.refreshes = 0
+        self.seen: set[str] = set()
+
+    def input_entity_ids(self) -> set[str]:
+        # Every site shares the tariff entity.
+        return {f"sensor.site_{self.site}_solar", f"sensor.site_{self.site}_load", "sensor.import_price"}
+
+    async def async_refresh_with_states(self, states) -> None:  # type: ignore[no-untyped-def]
+        self.refreshes += 1
+        self.seen.update(states)
+
+
+@pytest.fixture
+def timers(monkeypatch) -> list:  # type: ignore[no-untyped-def]
+    started: list = []
+
+    def _track(hass, action, interval, **kwargs):  # type: ignore[no-untyped-def]
+        timer = SimpleNamespace(interval=interval, cancelled=False)
+        started.append(timer)
+
+        def _cancel() -> None:
+            timer.cancelled = True
+
+        return _cancel
+
+    monkeypatch.setattr(hub_module, "async_track_time_interval", _track)
+    return started
+
+
+@pytest.mark.asyncio
+async def test_fifty_entries_share_one_timer_and_spread_refreshes(timers) -> None:  # type: ignore[no-untyped-def]
+    states = _CountingStates()
+    hub = EnergyControlProHub(SimpleNamespace(states=states), slices=SLICES)  # type: ignore[arg-type]
+    members = [_FakeCoordinator(site) for site in range(ENTRIES)]
+    for member in members:
+        hub.async_register(member)  # type: ignore[arg-type]
+
+    refreshes_per_tick = []
+    for _ in range(SLICES):
+        before = sum(member.refreshes for member in members)
+        await hub._async_tick()
+        refreshes_per_tick.append(sum(member.refreshes for member in members) - before)
+
+    assert len(timers) == 1
+    assert timers[0].interval.total_seconds() == 2
+    # Every entry refreshed once per interval, in equal batches instead of one burst.
+    assert [member.refreshes for member in members] == [1] * ENTRIES
+    assert refreshes_per_tick == [ENTRIES // SLICES] * SLICES
+    # The shared tariff entity is read once per sub-tick, not once per entry.
+    assert states.reads == 2 * ENTRIES + SLICES
+    assert hub.stats == [SLICES, ENTRIES, 2 * ENTRIES + SLICES]
+    assert members[0].seen >= members[0].input_entity_ids()
+
+
+@pytest.mark.asyncio
+async def test_unregister_stops_timer_with_last_entry(timers) -> None:  # type: ignore[no-untyped-def]
+    hub = EnergyControlProHub(SimpleNamespace(states=_CountingStates()), slices=SLICES)  # type: ignore[arg-type]
+    first, second = _FakeCoordinator(0), _FakeCoordinator(1)
+    unregister_first = hub.async_register(first)  # type: ignore[arg-type]
+    unregister_second = hub.async_register(second)  # type: ignore[arg-type]
+
+    unregister_first()
+    for _ in range(SLICES):
+        await hub._async_tick()
+    assert (first.refreshes, second.refreshes) == (0, 1)
+    assert not timers[0].cancelled
+
+    unregister_second()
+    assert timers[0].cancelled
+    assert len(hub) == 0
+
+
+def test_coordinator_reads_inputs_from_hub_states() -> None:
+    coordinator = EnergyControlProCoordinator.__new__(EnergyControlProCoordinator)
+    coordinator._entry = SimpleNamespace(  # type: ignore[attr-defined]
+        options={
+            "solar_power_entity": "sensor.solar",
+            "load_power_entity": "sensor.load",
+            "load_1_entity": "switch.boiler",
+            "import_price_entity": " ",
+        },
+        data={},
+    )
+    coordinator.hass = SimpleNamespace(states=SimpleNamespace(get=lambda entity_id: "live"))  # type: ignore[attr-defined]
+    coordinator._tick_states = {"sensor.solar": "tick"}  # type: ignore[attr-defined]
+
+    assert coordinator.input_entity_ids() == {"sensor.solar", "sensor.load", "switch.boiler"}
+    assert coordinator._state("sensor.solar") == "tick"
+    assert coordinator._state("sensor.load") == "live"
+
+
+def test_coordinator_leaves_loads_controlled_by_another_entry() -> None:
+    coordinator = EnergyControlProCoordinator.__new__(EnergyControlProCoordinator)
+    coordinator._entry = SimpleNamespace(  # type: ignore[attr-defined]
+        entry_id="inverter_b",
+        options={"load_1_entity": "switch.boiler", "load_2_entity": "switch.heater"},
+        data={},
+    )
+    coordinator._power_learner = LoadPowerLearner()  # type: ignore[attr-defined]
+    coordinator._arbiter = None  # type: ignore[attr-defined]
+    arbiter = LoadArbiter(settle_s=30)
+    arbiter.register("inverter_a", ["switch.boiler"])
+
+    coordinator.async_attach_arbiter(arbiter)
+
+    assert [load.entity_id for load in coordinator._load_configs()] == ["switch.heater"]
+    arbiter.unregister("inverter_a")
+    assert [load.entity_id for load in coordinator._load_configs()] == ["switch.boiler", "switch.heater"]
+
+
+@pytest.mark.asyncio
+async def test_fast_check_during_a_hub_tick_reads_live_state() -> None:
+    live = {
+        "sensor.solar": SimpleNamespace(state="1000", attributes={}),
+        "sensor.load": SimpleNamespace(state="500", attributes={}),
+    }
+    coordinator = EnergyControlProCoordinator(
+        SimpleNamespace(states=SimpleNamespace(get=live.get)),  # type: ignore[arg-type]
+        SimpleNamespace(  # type: ignore[arg-type]
+            options={
+                "simulation": False,
+                "solar_power_entity": "sensor.solar",
+                "load_power_entity": "sensor.load",
+            },
+            data={},
+            entry_id="test_entry",
+        ),
+    )
+    coordinator._learn_load_profile = lambda now, load_w: None  # type: ignore[method-assign]
+    coordinator._started = True  # type: ignore[attr-defined]
+    seen: list[int] = []
+
+    async def _alerts(snapshot) -> None:  # type: ignore[no-untyped-def]
+        # The meter reports a new value while the tick is awaiting service calls.
+        live["sensor.solar"] = SimpleNamespace(state="6000", attributes={})
+        seen.append(int(coordinator._real_values_from_entities()["solar_w"]))
+
+    coordinator._async_process_alerts = _alerts  # type: ignore[method-assign]
+
+    await coordinator.async_refresh_with_states(dict(live))
+
+    assert coordinator.data.solar_w == 1000
+    assert seen == [6000]
+
+
+@pytest.mark.asyncio
+async def test_hub_ticks_wait_for_the_first_refresh() -> None:
+    coordinator = EnergyControlProCoordinator(
+        SimpleNamespace(states=SimpleNamespace(get={}.get)),  # type: ignore[arg-type]
+        SimpleNamespace(options={}, data={}, entry_id="test_entry"),  # type: ignore[arg-type]
+    )
+    loaded = asyncio.Event()
+    refreshes: list[bool] = []
+
+    async def _load_learning() -> None:
+        await loaded.wait()
+
+    async def _refresh() -> None:
+        refreshes.append(coordinator._tick_states is not None)  # type: ignore[attr-defined]
+
+    coordinator.async_load_learning = _load_learning  # type: ignore[method-assign]
+    coordinator.async_refresh = _refresh  # type: ignore[method-assign]
+    start = asyncio.ensure_future(coordinator.async_start())
+    await asyncio.sleep(0)
+
+    # A hub tick while the first refresh is still loading does not start a second cycle.
+    await coordinator.async_refresh_with_states({})
+    assert refreshes == []
+
+    loaded.set()
+    await start
+    await coordinator.async_refresh_with_states({})
+    assert refreshes == [False, True]
@@ -0,0 +1,61 @@
+"""Import-time audit of the runtime path (``python -X importtime``)."""
+
+from __future__ import annotations
+
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+ROOT = Path(__file__).resolve().parents[1]
+PACKAGE = "custom_components.energy_control_pro"
+RUNTIME_MODULES = (f"{PACKAGE}.sensor", f"{PACKAGE}.switch", f"{PACKAGE}.select")
+# Loaded on demand: the config flow by Home Assistant, the rest on first use.
+LAZY_MODULES = {
+    f"{PACKAGE}.config_flow",
+    f"{PACKAGE}.optimization.forecast",
+    f"{PACKAGE}.optimization.shadow",
+    f"{PACKAGE}.optimization.tariff",
+}
+# Generous bound on the integration's own modules; typical is well below 50 ms.
+BUDGET_US = 250_000
+
+
+def _import_times(modules: tuple[str, ...]) -> dict[str, int]:
+    """Return self import time in µs per module imported for ``modules``."""
+    # Home Assistant is imported first so only the integration's cost is attributed.
+    code = "import homeassistant.helpers.update_coordinator\n" + "".join(
+        f"import {module}\n" for module in modules
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _cumulative, name = line.removeprefix("import time:").split("|")
+        if self_us.strip().isdigit():
+            times[name.strip()] = int(self_us)
+    return times
+
+
+def test_runtime_path_does_not_import_lazy_modules() -> None:
+    times = _import_times(RUNTIME_MODULES)
+
+    assert f"{PACKAGE}.coordinator" in times
+    assert not LAZY_MODULES & times.keys()
+
+
+def test_runtime_path_import_time_within_budget() -> None:
+    times = _import_times(RUNTIME_MODULES)
+
+    own_us = sum(us for name, us in times.items() if name.startswith(PACKAGE))
+    assert own_us < BUDGET_US, sorted(times.items(), key=lambda item: -item[1])[:10]
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.energy_control_pro.optimization.load_profile import (
+    SLOTS_PER_DAY,
+    LoadProfile,
+    slot_index,
+)
+
+
+def test_slot_index_uses_weekday_and_quarter_hour() -> None:
+    monday = datetime(2026, 2, 16, 0, 0, 0)
+    assert slot_index(monday) == 0
+    assert slot_index(monday + timedelta(minutes=14, seconds=59)) == 0
+    assert slot_index(monday + timedelta(minutes=15)) == 1
+    assert slot_index(monday + timedelta(days=1, hours=7, minutes=30)) == SLOTS_PER_DAY + 30
+
+
+def test_update_learns_running_mean_per_slot() -> None:
+    profile = LoadProfile()
+    moment = datetime(2026, 2, 16, 19, 0, 0)
+
+    profile.update(moment, 1000)
+    profile.update(moment + timedelta(seconds=10), 2000)
+
+    assert profile.slot_mean(moment) == pytest.approx(1500)
+    assert profile.slot_mean(moment + timedelta(days=1)) is None
+
+
+def test_update_decays_old_samples_after_window() -> None:
+    profile = LoadProfile(window_samples=4)
+    moment = datetime(2026, 2, 16, 19, 0, 0)
+    for _ in range(4):
+        profile.update(moment, 1000)
+
+    profile.update(moment, 3000)
+
+    assert profile.slot_mean(moment) == pytest.approx(1500)
+
+
+def test_forecast_weights_slots_by_overlap_and_skips_unknown() -> None:
+    profile = LoadProfile()
+    start = datetime(2026, 2, 16, 18, 50, 0)
+    profile.update(start, 1000)
+    profile.update(start + timedelta(minutes=10), 2000)
+
+    # 10 min at 1000 W, 15 min at 2000 W, 5 min without samples.
+    assert profile.forecast_w(start, 30) == pytest.approx(1600)
+    assert profile.forecast_w(start + timedelta(hours=3), 30) is None
+
+
+def test_profile_round_trips_through_storage_form() -> None:
+    profile = LoadProfile()
+    moment = datetime(2026, 2, 16, 19, 0, 0)
+    profile.update(moment, 1234.56)
+
+    restored = LoadProfile.from_dict(profile.as_dict())
+
+    assert restored.slot_mean(moment) == pytest.approx(1234.6)
+    assert restored.slot_mean(moment + timedelta(minutes=15)) is None
+    assert LoadProfile.from_dict({"mean": [1.0], "count": [1]}).slot_mean(moment) is None
+    assert LoadProfile.from_dict(None).slot_mean(moment) is None
+
+
+def test_copy_is_not_changed_by_later_updates() -> None:
+    profile = LoadProfile()
+    moment = datetime(2026, 2, 16, 19, 0, 0)
+    profile.update(moment, 1000)
+
+    snapshot = profile.copy()
+    profile.update(moment, 3000)
+
+    assert snapshot.slot_mean(moment) == pytest.approx(1000)
+    assert profile.slot_mean(moment) == pytest.approx(2000)
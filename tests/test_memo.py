@@ -0,0 +1,106 @@
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+from custom_components.energy_control_pro.optimization.engine import EngineAction, LoadConfig, LoadRuntime
+from custom_components.energy_control_pro.optimization.memo import DecisionMemo
+from custom_components.energy_control_pro.optimization.strategies import (
+    Strategy,
+    StrategyContext,
+    get_strategy,
+)
+
+NOW = datetime(2026, 2, 15, 12, 0, 0)
+HEATER = LoadConfig("switch.heater", min_surplus_w=1000, min_on_time_min=5, cooldown_min=10, priority=1)
+
+
+def _context(**overrides) -> StrategyContext:  # type: ignore[no-untyped-def]
+    kwargs = {
+        "now": NOW,
+        "surplus_w": 420,
+        "grid_import_w": 0,
+        "export_duration_min": 12,
+        "import_duration_min": 0,
+        "import_threshold_w": 800,
+        "duration_threshold_min": 10,
+        "loads": [HEATER],
+        "runtimes": {HEATER.entity_id: LoadRuntime(is_on=False, last_on=None, last_off=None)},
+    }
+    kwargs.update(overrides)
+    return StrategyContext(**kwargs)
+
+
+def _counting_strategy() -> tuple[Strategy, list[StrategyContext]]:
+    seen: list[StrategyContext] = []
+    inner = get_strategy("maximize_self_consumption")
+
+    def decide(context: StrategyContext) -> EngineAction | None:
+        seen.append(context)
+        return inner.decide(context)
+
+    return Strategy("counting", decide), seen
+
+
+def test_unchanged_inputs_reuse_the_decision() -> None:
+    memo = DecisionMemo()
+    strategy, seen = _counting_strategy()
+
+    # Timer state precomputed by the coordinator's eligibility queue.
+    idle = {HEATER.entity_id: LoadRuntime(is_on=False, last_on=None, last_off=None, timer_expired=True)}
+    for offset_s in range(0, 60, 10):
+        context = _context(
+            now=NOW + timedelta(seconds=offset_s), surplus_w=410 + offset_s // 10, runtimes=idle
+        )
+        assert memo.decide(strategy, context) is None
+
+    assert len(seen) == 1
+    assert memo.stats() == {"hits": 5, "misses": 1, "hit_rate": 0.833}
+
+
+def test_threshold_crossings_invalidate_the_memo() -> None:
+    memo = DecisionMemo()
+    strategy, seen = _counting_strategy()
+
+    memo.decide(strategy, _context(surplus_w=990))
+    # The load's power is now covered.
+    action = memo.decide(strategy, _context(surplus_w=1010))
+
+    assert action is not None
+    assert action.action == "turn_on"
+    assert len(seen) == 2
+
+
+def test_timer_expiry_invalidates_the_memo() -> None:
+    memo = DecisionMemo()
+    strategy, seen = _counting_strategy()
+    cooling = LoadRuntime(is_on=False, last_on=None, last_off=NOW - timedelta(minutes=5))
+    context = _context(surplus_w=1500, runtimes={HEATER.entity_id: cooling})
+
+    assert memo.decide(strategy, context) is None
+    action = memo.decide(strategy, replace(context, now=NOW + timedelta(minutes=5)))
+
+    assert action is not None
+    assert len(seen) == 2
+
+
+def test_small_changes_across_a_decision_boundary_invalidate_the_memo() -> None:
+    memo = DecisionMemo()
+    balanced = get_strategy("balanced")
+
+    # 710 W and 730 W would share a 50 W bucket; the balanced score turns
+    # positive at 719 W, so the surplus itself is part of the key.
+    assert memo.decide(balanced, _context(surplus_w=710)) is None
+    action = memo.decide(balanced, _context(surplus_w=730))
+    assert action is not None
+    assert action.action == "turn_on"
+
+    # Import above the threshold is only shed early once the forecast reaches
+    # minus the threshold; -799 W and -800 W fall on either side of it.
+    running = {HEATER.entity_id: LoadRuntime(is_on=True, last_on=NOW - timedelta(hours=1), last_off=None)}
+    importing = _context(
+        surplus_w=-900, grid_import_w=900, export_duration_min=0, runtimes=running
+    )
+    strategy = get_strategy("maximize_self_consumption")
+    assert memo.decide(strategy, replace(importing, forecast_surplus_w=-799)) is None
+    action = memo.decide(strategy, replace(importing, forecast_surplus_w=-800))
+    assert action is not None
+    assert action.action == "turn_off"
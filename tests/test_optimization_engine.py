@@ -1,10 +1,26 @@
 from datetime import datetime, timedelta
 
+from custom_components.energy_control_pro.optimization.constraints import ConstraintGroup, ConstraintIndex
 from custom_components.energy_control_pro.optimization.engine import (
+    ContinuousLoadConfig,
+    ContinuousLoadRuntime,
     LoadConfig,
     LoadRuntime,
+    PendingAction,
+    ThermalLoadConfig,
+    ThermalLoadRuntime,
+    battery_adjusted_power,
+    decide_balanced,
+    decide_continuous_setpoint,
+    decide_cost,
+    decide_export_limit,
+    decide_peak_shaving,
+    decide_thermal_setpoint,
     decide_turn_off,
     decide_turn_on,
+    pending_power_w,
+    resolve_pending,
+    thermal_stored_kwh,
 )
 
 
@@ -172,3 +188,604 @@ def test_priority_turns_on_highest_priority_first() -> None:
     )
     assert action is not None
     assert action.entity_id == "switch.load_1"
+
+
+def test_battery_below_soc_target_keeps_charge_power() -> None:
+    surplus_w, grid_import_w = battery_adjusted_power(
+        surplus_w=200,
+        grid_import_w=0,
+        battery_w=2500,
+        battery_soc_pct=40,
+        soc_target_pct=90,
+    )
+    assert (surplus_w, grid_import_w) == (200, 0)
+
+
+def test_battery_above_soc_target_offers_charge_power_to_loads() -> None:
+    surplus_w, grid_import_w = battery_adjusted_power(
+        surplus_w=200,
+        grid_import_w=0,
+        battery_w=2500,
+        battery_soc_pct=95,
+        soc_target_pct=90,
+    )
+    assert (surplus_w, grid_import_w) == (2700, 0)
+
+
+def test_battery_discharge_below_soc_target_counts_as_import() -> None:
+    surplus_w, grid_import_w = battery_adjusted_power(
+        surplus_w=0,
+        grid_import_w=0,
+        battery_w=-1200,
+        battery_soc_pct=30,
+        soc_target_pct=90,
+    )
+    assert (surplus_w, grid_import_w) == (0, 1200)
+
+
+def test_battery_without_soc_uses_grid_values() -> None:
+    assert battery_adjusted_power(
+        surplus_w=300,
+        grid_import_w=0,
+        battery_w=1500,
+        battery_soc_pct=None,
+        soc_target_pct=90,
+    ) == (300, 0)
+
+
+EV_CHARGER = ContinuousLoadConfig(
+    "number.ev_charger_power",
+    min_power_w=1400,
+    max_power_w=7400,
+    step_w=230,
+    deadband_w=300,
+    rate_limit_s=60,
+)
+
+
+def test_continuous_load_tracks_surplus_in_steps() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    action = decide_continuous_setpoint(
+        now=now,
+        surplus_w=1000,
+        load=EV_CHARGER,
+        runtime=ContinuousLoadRuntime(setpoint_w=2300, last_change=now - timedelta(minutes=5)),
+    )
+    assert action is not None
+    assert action.action == "set_power"
+    assert action.value == 3220
+
+
+def test_continuous_load_skips_changes_inside_deadband() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    action = decide_continuous_setpoint(
+        now=now,
+        surplus_w=250,
+        load=EV_CHARGER,
+        runtime=ContinuousLoadRuntime(setpoint_w=2300, last_change=now - timedelta(minutes=5)),
+    )
+    assert action is None
+
+
+def test_continuous_load_respects_rate_limit() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    action = decide_continuous_setpoint(
+        now=now,
+        surplus_w=3000,
+        load=EV_CHARGER,
+        runtime=ContinuousLoadRuntime(setpoint_w=2300, last_change=now - timedelta(seconds=20)),
+    )
+    assert action is None
+
+
+def test_continuous_load_stops_below_min_power() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    action = decide_continuous_setpoint(
+        now=now,
+        surplus_w=-1500,
+        load=EV_CHARGER,
+        runtime=ContinuousLoadRuntime(setpoint_w=2300, last_change=None),
+    )
+    assert action is not None
+    assert action.value == 0
+
+
+WATER_HEATER = ThermalLoadConfig(
+    "water_heater.boiler",
+    normal_temp_c=50,
+    boost_temp_c=60,
+    power_w=2000,
+    volume_l=200,
+    rate_limit_s=900,
+)
+
+
+def test_thermal_load_boosts_when_surplus_covers_heater() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    runtime = ThermalLoadRuntime(target_temp_c=50.0, current_temp_c=48.0, last_change=None)
+
+    action = decide_thermal_setpoint(now=now, surplus_w=2500, load=WATER_HEATER, runtime=runtime)
+    assert action is not None
+    assert action.action == "set_temperature"
+    assert action.value == 60
+    assert decide_thermal_setpoint(now=now, surplus_w=1500, load=WATER_HEATER, runtime=runtime) is None
+
+
+def test_thermal_load_keeps_boost_until_import() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    runtime = ThermalLoadRuntime(
+        target_temp_c=60.0, current_temp_c=55.0, last_change=now - timedelta(minutes=30)
+    )
+
+    # The heater's own draw is already part of the measured surplus.
+    assert decide_thermal_setpoint(now=now, surplus_w=100, load=WATER_HEATER, runtime=runtime) is None
+    action = decide_thermal_setpoint(now=now, surplus_w=-400, load=WATER_HEATER, runtime=runtime)
+    assert action is not None
+    assert action.value == 50
+
+
+def test_thermal_load_without_reported_target_uses_last_sent_setpoint() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    runtime = ThermalLoadRuntime(
+        target_temp_c=None, current_temp_c=55.0, last_change=now - timedelta(minutes=30), last_sent_c=60
+    )
+
+    # The boost already sent is not repeated every rate-limit period.
+    assert decide_thermal_setpoint(now=now, surplus_w=100, load=WATER_HEATER, runtime=runtime) is None
+    action = decide_thermal_setpoint(now=now, surplus_w=-400, load=WATER_HEATER, runtime=runtime)
+    assert action is not None
+    assert action.value == 50
+
+
+def test_thermal_load_respects_rate_limit() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    runtime = ThermalLoadRuntime(
+        target_temp_c=60.0, current_temp_c=55.0, last_change=now - timedelta(minutes=5)
+    )
+
+    assert decide_thermal_setpoint(now=now, surplus_w=-3000, load=WATER_HEATER, runtime=runtime) is None
+
+
+def test_thermal_stored_energy_above_normal_temperature() -> None:
+    assert thermal_stored_kwh(volume_l=200, current_temp_c=60.0, normal_temp_c=50) == 2.326
+    assert thermal_stored_kwh(volume_l=200, current_temp_c=45.0, normal_temp_c=50) == 0.0
+
+
+def test_peak_shaving_sheds_multiple_loads_immediately() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    loads = [
+        LoadConfig("switch.load_1", min_surplus_w=2000, min_on_time_min=30, cooldown_min=5, priority=1),
+        LoadConfig("switch.load_2", min_surplus_w=1500, min_on_time_min=30, cooldown_min=5, priority=2),
+        LoadConfig("switch.load_3", min_surplus_w=1000, min_on_time_min=30, cooldown_min=5, priority=3),
+    ]
+    runtimes = {
+        entity_id: LoadRuntime(is_on=True, last_on=now - timedelta(minutes=5), last_off=None)
+        for entity_id in ("switch.load_1", "switch.load_2", "switch.load_3")
+    }
+
+    actions = decide_peak_shaving(
+        now=now,
+        grid_import_w=9200,
+        import_limit_w=7000,
+        safety_min_on_s=60,
+        loads=loads,
+        runtimes=runtimes,
+    )
+
+    assert [action.entity_id for action in actions] == ["switch.load_3", "switch.load_2"]
+    assert all(action.action == "turn_off" for action in actions)
+
+
+def test_peak_shaving_honors_safety_min_on() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    loads = [
+        LoadConfig("switch.heat_pump", min_surplus_w=2000, min_on_time_min=10, cooldown_min=5, priority=3),
+        LoadConfig("switch.boiler", min_surplus_w=2000, min_on_time_min=10, cooldown_min=5, priority=1),
+    ]
+    runtimes = {
+        "switch.heat_pump": LoadRuntime(is_on=True, last_on=now - timedelta(seconds=20), last_off=None),
+        "switch.boiler": LoadRuntime(is_on=True, last_on=now - timedelta(minutes=5), last_off=None),
+    }
+
+    actions = decide_peak_shaving(
+        now=now,
+        grid_import_w=8000,
+        import_limit_w=7000,
+        safety_min_on_s=120,
+        loads=loads,
+        runtimes=runtimes,
+    )
+
+    assert [action.entity_id for action in actions] == ["switch.boiler"]
+
+
+def test_peak_shaving_reduces_continuous_load_first() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    loads = [LoadConfig("switch.load_1", min_surplus_w=1000, min_on_time_min=5, cooldown_min=5, priority=1)]
+    runtimes = {"switch.load_1": LoadRuntime(is_on=True, last_on=None, last_off=None)}
+
+    actions = decide_peak_shaving(
+        now=now,
+        grid_import_w=7500,
+        import_limit_w=7000,
+        safety_min_on_s=60,
+        loads=loads,
+        runtimes=runtimes,
+        continuous=(EV_CHARGER, ContinuousLoadRuntime(setpoint_w=4600, last_change=now)),
+    )
+
+    assert len(actions) == 1
+    assert actions[0].action == "set_power"
+    assert actions[0].value == 3910
+
+
+def test_peak_shaving_counts_pending_off_loads_as_shed() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    loads = [
+        LoadConfig("switch.load_1", min_surplus_w=2000, min_on_time_min=30, cooldown_min=5, priority=1),
+        LoadConfig("switch.load_2", min_surplus_w=2500, min_on_time_min=30, cooldown_min=5, priority=2),
+    ]
+    # load_2 was shed last cycle; the meter still includes its draw.
+    pending = {"switch.load_2": PendingAction(target_on=False, issued_at=now - timedelta(seconds=5))}
+    runtimes = {
+        "switch.load_1": LoadRuntime(is_on=True, last_on=now - timedelta(minutes=5), last_off=None),
+        "switch.load_2": LoadRuntime(is_on=False, last_on=now - timedelta(minutes=5), last_off=None),
+    }
+    kwargs = {
+        "now": now,
+        "import_limit_w": 7000,
+        "safety_min_on_s": 60,
+        "loads": loads,
+        "runtimes": runtimes,
+        "pending_off_w": pending_power_w(loads=loads, pending=pending, target_on=False),
+    }
+
+    assert kwargs["pending_off_w"] == 2500
+    assert decide_peak_shaving(grid_import_w=9200, **kwargs) == []
+    # Only import beyond what the pending command removes sheds another load.
+    actions = decide_peak_shaving(grid_import_w=9700, **kwargs)
+    assert [action.entity_id for action in actions] == ["switch.load_1"]
+
+
+def test_peak_shaving_idle_below_cap() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    assert decide_peak_shaving(
+        now=now,
+        grid_import_w=6900,
+        import_limit_w=7000,
+        safety_min_on_s=60,
+        loads=[],
+        runtimes={},
+    ) == []
+
+
+def test_export_limit_raises_continuous_load_without_waiting() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    actions = decide_export_limit(
+        now=now,
+        grid_export_w=900,
+        export_limit_w=0,
+        release_hysteresis_w=200,
+        loads=[],
+        runtimes={},
+        continuous=(EV_CHARGER, ContinuousLoadRuntime(setpoint_w=2300, last_change=now)),
+    )
+    assert len(actions) == 1
+    assert actions[0].action == "set_power"
+    assert actions[0].value == 3220
+
+
+def test_export_limit_respects_cooldown_and_requests_curtailment() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    loads = [LoadConfig("switch.load_a", min_surplus_w=800, min_on_time_min=5, cooldown_min=20, priority=1)]
+    runtimes = {
+        "switch.load_a": LoadRuntime(is_on=False, last_on=None, last_off=now - timedelta(minutes=5)),
+    }
+    actions = decide_export_limit(
+        now=now,
+        grid_export_w=5000,
+        export_limit_w=3000,
+        release_hysteresis_w=200,
+        loads=loads,
+        runtimes=runtimes,
+        curtailment_entity_id="switch.inverter_limit",
+    )
+    assert [(action.action, action.entity_id) for action in actions] == [
+        ("curtail", "switch.inverter_limit"),
+    ]
+
+
+def test_export_limit_releases_curtailment_below_hysteresis() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    kwargs = {
+        "now": now,
+        "export_limit_w": 3000,
+        "release_hysteresis_w": 200,
+        "loads": [],
+        "runtimes": {},
+        "curtailment_entity_id": "switch.inverter_limit",
+        "curtailed": True,
+    }
+    assert decide_export_limit(grid_export_w=2900, **kwargs) == []
+    actions = decide_export_limit(grid_export_w=2500, **kwargs)
+    assert [action.action for action in actions] == ["release"]
+
+
+def test_export_limit_releases_curtailment_with_cap_below_hysteresis() -> None:
+    for export_limit_w in (0, 150):
+        kwargs = {
+            "now": datetime(2026, 2, 15, 12, 0, 0),
+            "export_limit_w": export_limit_w,
+            "release_hysteresis_w": 200,
+            "loads": [],
+            "runtimes": {},
+            "curtailment_entity_id": "switch.inverter_limit",
+            "curtailed": True,
+        }
+        # Export alone can never fall 200 W under a zero or small cap.
+        for grid_export_w in (0, 50, 150):
+            if grid_export_w <= export_limit_w:
+                assert decide_export_limit(grid_export_w=grid_export_w, **kwargs) == []
+        # Importing means the curtailed inverter no longer covers the load.
+        actions = decide_export_limit(grid_export_w=0, grid_import_w=250, **kwargs)
+        assert [action.action for action in actions] == ["release"]
+
+
+def test_forecast_starts_load_before_duration_threshold() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    loads = [LoadConfig("switch.load_a", min_surplus_w=800, min_on_time_min=5, cooldown_min=5, priority=1)]
+    runtimes = {"switch.load_a": LoadRuntime(is_on=False, last_on=None, last_off=None)}
+
+    action = decide_turn_on(
+        now=now,
+        surplus_w=1500,
+        export_duration_min=2,
+        min_surplus_duration_min=10,
+        loads=loads,
+        runtimes=runtimes,
+        forecast_surplus_w=1400,
+    )
+
+    assert action is not None
+    assert "forecast" in action.reason
+
+
+def test_forecast_drop_blocks_turn_on() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    loads = [LoadConfig("switch.load_a", min_surplus_w=800, min_on_time_min=5, cooldown_min=5, priority=1)]
+    runtimes = {"switch.load_a": LoadRuntime(is_on=False, last_on=None, last_off=None)}
+
+    action = decide_turn_on(
+        now=now,
+        surplus_w=1500,
+        export_duration_min=15,
+        min_surplus_duration_min=10,
+        loads=loads,
+        runtimes=runtimes,
+        forecast_surplus_w=200,
+    )
+
+    assert action is None
+
+
+def test_forecast_of_persistent_import_turns_off_early() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    loads = [LoadConfig("switch.load_a", min_surplus_w=800, min_on_time_min=5, cooldown_min=5, priority=1)]
+    runtimes = {
+        "switch.load_a": LoadRuntime(is_on=True, last_on=now - timedelta(minutes=10), last_off=None),
+    }
+    kwargs = {
+        "now": now,
+        "grid_import_w": 1200,
+        "import_duration_min": 1,
+        "import_threshold_w": 800,
+        "duration_threshold_min": 10,
+        "loads": loads,
+        "runtimes": runtimes,
+    }
+
+    assert decide_turn_off(**kwargs, forecast_surplus_w=300) is None
+    action = decide_turn_off(**kwargs, forecast_surplus_w=-1500)
+    assert action is not None
+    assert action.entity_id == "switch.load_a"
+
+
+def _cost_kwargs(**overrides):
+    kwargs = {
+        "now": datetime(2026, 2, 15, 3, 0, 0),
+        "surplus_w": 0,
+        "grid_import_w": 0,
+        "export_duration_min": 0,
+        "import_duration_min": 0,
+        "import_threshold_w": 800,
+        "duration_threshold_min": 10,
+        "import_price": 0.30,
+        "export_price": 0.08,
+        "cheapest_import_price": 0.30,
+        "mean_import_price": 0.30,
+        "loads": [
+            LoadConfig("switch.load_a", min_surplus_w=1000, min_on_time_min=5, cooldown_min=5, priority=1),
+            LoadConfig("switch.load_b", min_surplus_w=2000, min_on_time_min=5, cooldown_min=5, priority=2),
+        ],
+        "runtimes": {
+            "switch.load_a": LoadRuntime(is_on=False, last_on=None, last_off=None),
+            "switch.load_b": LoadRuntime(is_on=False, last_on=None, last_off=None),
+        },
+    }
+    kwargs.update(overrides)
+    return kwargs
+
+
+def test_cost_starts_load_in_cheapest_price_slot_without_surplus() -> None:
+    action = decide_cost(
+        **_cost_kwargs(import_price=0.12, cheapest_import_price=0.12, mean_import_price=0.28)
+    )
+
+    assert action is not None
+    assert action.action == "turn_on"
+    assert action.entity_id == "switch.load_a"
+    assert "cheapest import price" in action.reason
+
+
+def test_cost_flat_tariff_only_uses_stable_surplus() -> None:
+    assert decide_cost(**_cost_kwargs(surplus_w=1500, export_duration_min=3)) is None
+
+    action = decide_cost(**_cost_kwargs(surplus_w=1500, export_duration_min=12))
+    assert action is not None
+    assert action.entity_id == "switch.load_a"
+
+
+def test_cost_keeps_exporting_when_feed_in_beats_cheaper_import_later() -> None:
+    action = decide_cost(
+        **_cost_kwargs(
+            surplus_w=2500,
+            export_duration_min=12,
+            export_price=0.15,
+            cheapest_import_price=0.10,
+            mean_import_price=0.25,
+        )
+    )
+
+    assert action is None
+
+
+def test_cost_sheds_lowest_priority_load_importing_at_high_price() -> None:
+    now = datetime(2026, 2, 15, 18, 0, 0)
+    runtimes = {
+        "switch.load_a": LoadRuntime(is_on=True, last_on=now - timedelta(minutes=30), last_off=None),
+        "switch.load_b": LoadRuntime(is_on=True, last_on=now - timedelta(minutes=30), last_off=None),
+    }
+    high = _cost_kwargs(
+        now=now,
+        grid_import_w=1800,
+        import_duration_min=12,
+        import_price=0.45,
+        cheapest_import_price=0.12,
+        mean_import_price=0.28,
+        runtimes=runtimes,
+    )
+
+    action = decide_cost(**high)
+    assert action is not None
+    assert action.action == "turn_off"
+    assert action.entity_id == "switch.load_b"
+
+    assert decide_cost(**{**high, "import_price": 0.20}) is None
+
+
+def test_cost_flat_tariff_sheds_by_import_rules() -> None:
+    now = datetime(2026, 2, 15, 18, 0, 0)
+    runtimes = {
+        "switch.load_a": LoadRuntime(is_on=True, last_on=now - timedelta(minutes=30), last_off=None),
+        "switch.load_b": LoadRuntime(is_on=True, last_on=now - timedelta(minutes=30), last_off=None),
+    }
+    flat = _cost_kwargs(now=now, grid_import_w=3000, import_duration_min=60, runtimes=runtimes)
+
+    action = decide_cost(**flat)
+    assert action is not None
+    assert action.action == "turn_off"
+    assert action.entity_id == "switch.load_b"
+    assert decide_cost(**{**flat, "import_duration_min": 3}) is None
+
+
+def _balanced_kwargs(**overrides):
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    kwargs = {
+        "now": now,
+        "surplus_w": 0,
+        "grid_import_w": 0,
+        "export_duration_min": 0,
+        "import_duration_min": 0,
+        "import_threshold_w": 800,
+        "duration_threshold_min": 10,
+        "loads": [
+            LoadConfig("switch.heater", min_surplus_w=2000, min_on_time_min=5, cooldown_min=5, priority=1),
+            LoadConfig("switch.pump", min_surplus_w=700, min_on_time_min=5, cooldown_min=5, priority=2),
+        ],
+        "runtimes": {
+            "switch.heater": LoadRuntime(is_on=False, last_on=None, last_off=None),
+            "switch.pump": LoadRuntime(is_on=False, last_on=None, last_off=None),
+        },
+        "import_weight": 1.0,
+        "export_weight": 0.6,
+        "switch_penalty_w": 150,
+    }
+    kwargs.update(overrides)
+    return kwargs
+
+
+def test_balanced_prefers_load_that_fits_the_surplus_over_priority() -> None:
+    # Heater: 0.6*1000 - 1.0*1000 - 150 < 0; pump: 0.6*700 - 150 > 0.
+    action = decide_balanced(**_balanced_kwargs(surplus_w=1000, export_duration_min=12))
+
+    assert action is not None
+    assert action.action == "turn_on"
+    assert action.entity_id == "switch.pump"
+
+
+def test_balanced_picks_best_score_across_turn_on_and_turn_off() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    runtimes = {
+        "switch.heater": LoadRuntime(is_on=True, last_on=now - timedelta(minutes=30), last_off=None),
+        "switch.pump": LoadRuntime(is_on=False, last_on=None, last_off=None),
+    }
+
+    action = decide_balanced(
+        **_balanced_kwargs(
+            grid_import_w=1900, import_duration_min=12, export_duration_min=12, runtimes=runtimes
+        )
+    )
+
+    assert action is not None
+    assert action.action == "turn_off"
+    assert action.entity_id == "switch.heater"
+
+
+def test_balanced_does_nothing_when_switch_wear_outweighs_gain() -> None:
+    action = decide_balanced(
+        **_balanced_kwargs(surplus_w=200, export_duration_min=12, switch_penalty_w=150)
+    )
+
+    assert action is None
+
+
+def test_pending_action_reports_target_state_until_confirmed_or_timed_out() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    pending = PendingAction(target_on=True, issued_at=now)
+
+    assert resolve_pending(now=now + timedelta(seconds=10), is_on=False, pending=pending, timeout_s=30) == (
+        True,
+        True,
+    )
+    assert resolve_pending(now=now + timedelta(seconds=10), is_on=True, pending=pending, timeout_s=30) == (
+        True,
+        False,
+    )
+    assert resolve_pending(now=now + timedelta(seconds=30), is_on=False, pending=pending, timeout_s=30) == (
+        False,
+        False,
+    )
+    assert resolve_pending(now=now, is_on=False, pending=None, timeout_s=30) == (False, False)
+
+
+def test_export_limit_respects_shared_circuit_capacity() -> None:
+    now = datetime(2026, 2, 15, 12, 0, 0)
+    loads = [
+        LoadConfig("switch.ev", min_surplus_w=2000, min_on_time_min=5, cooldown_min=5, priority=1),
+        LoadConfig("switch.boiler", min_surplus_w=2000, min_on_time_min=5, cooldown_min=5, priority=2),
+        LoadConfig("switch.pump", min_surplus_w=800, min_on_time_min=5, cooldown_min=5, priority=3),
+    ]
+    runtimes = {load.entity_id: LoadRuntime(is_on=False, last_on=None, last_off=None) for load in loads}
+
+    actions = decide_export_limit(
+        now=now,
+        grid_export_w=5000,
+        export_limit_w=0,
+        release_hysteresis_w=200,
+        loads=loads,
+        runtimes=runtimes,
+        constraints=ConstraintIndex([ConstraintGroup(("switch.ev", "switch.boiler"), max_power_w=3600)]),
+        running_w={},
+    )
+
+    assert [action.entity_id for action in actions] == ["switch.ev", "switch.pump"]
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from custom_components.energy_control_pro.optimization.engine import LoadConfig
+from custom_components.energy_control_pro.optimization.oscillation import FlapTracker, adapt_load
+
+NOW = datetime(2026, 2, 15, 12, 0, 0)
+
+
+def _tracker() -> FlapTracker:
+    return FlapTracker(max_switches=4, window_s=3600, decay_s=1800, max_level=2)
+
+
+def test_switches_within_window_are_detected_as_flapping() -> None:
+    tracker = _tracker()
+
+    results = [tracker.record_switch(NOW + timedelta(minutes=10 * index)) for index in range(4)]
+
+    assert results == [False, False, False, True]
+    assert tracker.flaps == 1
+    assert tracker.multiplier(NOW + timedelta(minutes=30)) == 2
+
+
+def test_slow_switching_is_not_flapping() -> None:
+    tracker = _tracker()
+
+    results = [tracker.record_switch(NOW + timedelta(minutes=25 * index)) for index in range(6)]
+
+    assert not any(results)
+    assert tracker.multiplier(NOW + timedelta(hours=3)) == 1
+
+
+def test_backoff_is_capped_and_decays_back_to_configured_timing() -> None:
+    tracker = _tracker()
+    moment = NOW
+    for _ in range(3):
+        for _ in range(4):
+            moment += timedelta(minutes=1)
+            tracker.record_switch(moment)
+
+    assert tracker.flaps == 3
+    assert tracker.multiplier(moment) == 4
+    assert tracker.multiplier(moment + timedelta(minutes=30)) == 2
+    assert tracker.multiplier(moment + timedelta(minutes=60)) == 1
+
+
+def test_adapt_load_stretches_cooldown_and_min_on_time() -> None:
+    load = LoadConfig("switch.heater", min_surplus_w=1000, min_on_time_min=5, cooldown_min=10, priority=1)
+
+    assert adapt_load(load, 1) is load
+    adapted = adapt_load(load, 4)
+    assert (adapted.min_on_time_min, adapted.cooldown_min) == (20, 40)
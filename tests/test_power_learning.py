@@ -0,0 +1,48 @@
+import pytest
+
+from custom_components.energy_control_pro.optimization.power_learning import (
+    LoadPowerLearner,
+    PowerEstimate,
+)
+
+
+def test_estimate_converges_and_clips_outliers() -> None:
+    estimate = PowerEstimate()
+    for sample_w in (2000, 2100, 1950, 2050, 2000):
+        estimate.update(sample_w)
+    settled_w = estimate.estimate_w
+
+    # A kettle switching on during the transition: one 4 kW step.
+    estimate.update(4000)
+
+    assert settled_w == pytest.approx(2020, abs=30)
+    assert estimate.estimate_w - settled_w < 200
+
+
+def test_learner_uses_transitions_in_both_directions() -> None:
+    learner = LoadPowerLearner()
+
+    assert learner.observe_transition("switch.heater", turned_on=True, load_before_w=600, load_after_w=2600)
+    assert learner.estimate_w("switch.heater") is None
+    assert learner.observe_transition("switch.heater", turned_on=False, load_before_w=2500, load_after_w=500)
+    assert learner.estimate_w("switch.heater") == 2000
+
+
+def test_learner_ignores_noise_and_negative_steps() -> None:
+    learner = LoadPowerLearner()
+
+    assert not learner.observe_transition("switch.heater", turned_on=True, load_before_w=600, load_after_w=620)
+    assert not learner.observe_transition("switch.heater", turned_on=True, load_before_w=900, load_after_w=500)
+    assert learner.as_dict() == {}
+
+
+def test_learner_round_trips_through_storage_dict() -> None:
+    learner = LoadPowerLearner()
+    learner.observe("switch.heater", 1800)
+    learner.observe("switch.heater", 1800)
+
+    restored = LoadPowerLearner.from_dict({**learner.as_dict(), "switch.broken": {"samples": "x"}})
+
+    assert restored.estimate_w("switch.heater") == 1800
+    assert restored.estimate_w("switch.broken") is None
+    assert LoadPowerLearner.from_dict(None).as_dict() == {}
@@ -43,6 +43,7 @@ def test_validate_real_mode_entities_accepts_kw_units() -> None:
 @pytest.mark.asyncio
 async def test_read_power_w_converts_kw_to_w() -> None:
     coordinator = EnergyControlProCoordinator.__new__(EnergyControlProCoordinator)
+    coordinator._tick_states = None  # type: ignore[attr-defined]
     coordinator.hass = _fake_hass_with_states(  # type: ignore[attr-defined]
         {
             "sensor.solar_kw": SimpleNamespace(
@@ -53,3 +54,20 @@ async def test_read_power_w_converts_kw_to_w() -> None:
     )
 
     assert coordinator._read_power_w("sensor.solar_kw") == 1750
+
+
+@pytest.mark.asyncio
+async def test_read_power_w_keeps_sign_for_battery() -> None:
+    coordinator = EnergyControlProCoordinator.__new__(EnergyControlProCoordinator)
+    coordinator._tick_states = None  # type: ignore[attr-defined]
+    coordinator.hass = _fake_hass_with_states(  # type: ignore[attr-defined]
+        {
+            "sensor.battery_w": SimpleNamespace(
+                state="-850",
+                attributes={ATTR_UNIT_OF_MEASUREMENT: UnitOfPower.WATT},
+            )
+        }
+    )
+
+    assert coordinator._read_power_w("sensor.battery_w", signed=True) == -850
+    assert coordinator._read_power_w("sensor.battery_w") == 0
@@ -0,0 +1,168 @@
+from datetime import datetime, time, timedelta
+
+from custom_components.energy_control_pro.optimization.engine import LoadConfig, LoadRuntime
+from custom_components.energy_control_pro.optimization.scheduler import (
+    DeferrablePlan,
+    decide_deferrable,
+    must_run,
+    next_deadline,
+    parse_deadline,
+    plan_deferrable_loads,
+)
+
+NOW = datetime(2026, 2, 15, 10, 0, 0)
+DISHWASHER = LoadConfig(
+    "switch.dishwasher",
+    min_surplus_w=1500,
+    min_on_time_min=5,
+    cooldown_min=5,
+    priority=1,
+    required_runtime_min=30,
+    deadline=time(14, 0),
+)
+POOL_PUMP = LoadConfig(
+    "switch.pool_pump",
+    min_surplus_w=1000,
+    min_on_time_min=5,
+    cooldown_min=5,
+    priority=2,
+    required_runtime_min=15,
+    deadline=time(14, 0),
+)
+
+
+def _midday_peak(start: datetime) -> float:
+    # Best surplus at 12:00, falling off by 500 W per slot.
+    return 3000 - 500 * abs((start - NOW.replace(hour=12)).total_seconds() / 900)
+
+
+def test_parse_deadline_and_next_occurrence() -> None:
+    assert parse_deadline("21:30:00") == time(21, 30)
+    assert parse_deadline("") is None
+    assert parse_deadline("not a time") is None
+    assert next_deadline(NOW, time(14, 0)) == NOW.replace(hour=14)
+    assert next_deadline(NOW, time(9, 0)) == NOW.replace(hour=9) + timedelta(days=1)
+
+
+def test_must_run_when_remaining_runtime_meets_deadline() -> None:
+    deadline_at = NOW.replace(hour=14)
+    assert not must_run(now=NOW, deadline_at=deadline_at, remaining_min=30, margin_min=15)
+    assert must_run(
+        now=deadline_at - timedelta(minutes=45), deadline_at=deadline_at, remaining_min=30, margin_min=15
+    )
+    assert not must_run(
+        now=deadline_at - timedelta(minutes=5), deadline_at=deadline_at, remaining_min=0, margin_min=15
+    )
+
+
+def test_plan_picks_best_slots_and_reserves_power_between_loads() -> None:
+    plans = plan_deferrable_loads(
+        now=NOW,
+        loads=[POOL_PUMP, DISHWASHER],
+        remaining_min={"switch.dishwasher": 30, "switch.pool_pump": 15},
+        slot_surplus_w=_midday_peak,
+        existing={},
+        dirty={"switch.dishwasher", "switch.pool_pump"},
+        time_budget_s=5,
+    )
+
+    dishwasher = plans["switch.dishwasher"]
+    assert dishwasher.complete
+    assert len(dishwasher.slot_starts) == 2
+    assert NOW.replace(hour=12) in dishwasher.slot_starts
+    # 12:00 is taken by the dishwasher (3000 - 1500 W left), so the pump moves next to it.
+    assert plans["switch.pool_pump"].slot_starts[0] != NOW.replace(hour=12)
+
+
+def test_plan_keeps_clean_plans_and_drops_past_slots() -> None:
+    kept = DeferrablePlan(
+        "switch.pool_pump",
+        deadline_at=NOW.replace(hour=14),
+        slot_starts=(NOW - timedelta(minutes=30), NOW.replace(hour=13)),
+        complete=True,
+    )
+    plans = plan_deferrable_loads(
+        now=NOW,
+        loads=[POOL_PUMP, DISHWASHER],
+        remaining_min={"switch.dishwasher": 30, "switch.pool_pump": 15},
+        slot_surplus_w=_midday_peak,
+        existing={"switch.pool_pump": kept},
+        dirty={"switch.dishwasher"},
+        time_budget_s=5,
+    )
+
+    assert plans["switch.pool_pump"].slot_starts == (NOW.replace(hour=13),)
+    assert plans["switch.dishwasher"].complete
+
+
+def test_plan_leaves_loads_unplanned_when_time_budget_is_spent() -> None:
+    plans = plan_deferrable_loads(
+        now=NOW,
+        loads=[DISHWASHER],
+        remaining_min={"switch.dishwasher": 30},
+        slot_surplus_w=_midday_peak,
+        existing={},
+        dirty={"switch.dishwasher"},
+        time_budget_s=-1,
+    )
+
+    assert plans["switch.dishwasher"].slot_starts == ()
+    assert not plans["switch.dishwasher"].complete
+
+
+def test_decide_deferrable_forces_load_before_deadline_and_protects_it() -> None:
+    now = NOW.replace(hour=13, minute=20)
+    runtimes = {
+        "switch.dishwasher": LoadRuntime(is_on=False, last_on=None, last_off=now - timedelta(minutes=1)),
+        "switch.pool_pump": LoadRuntime(is_on=True, last_on=now - timedelta(minutes=1), last_off=None),
+    }
+
+    action, protected = decide_deferrable(
+        now=now,
+        loads=[DISHWASHER, POOL_PUMP],
+        runtimes=runtimes,
+        remaining_min={"switch.dishwasher": 30, "switch.pool_pump": 25},
+        plans={},
+        margin_min=15,
+    )
+
+    assert action is not None
+    assert action.entity_id == "switch.dishwasher"
+    assert "deadline 14:00" in action.reason
+    assert action.forced
+    assert protected == {"switch.dishwasher", "switch.pool_pump"}
+
+
+def test_decide_deferrable_starts_in_planned_slot_and_skips_without_headroom() -> None:
+    now = NOW.replace(hour=12, minute=5)
+    runtimes = {"switch.dishwasher": LoadRuntime(is_on=False, last_on=None, last_off=None)}
+    plan = DeferrablePlan(
+        "switch.dishwasher",
+        deadline_at=NOW.replace(hour=14),
+        slot_starts=(NOW.replace(hour=12),),
+        complete=True,
+    )
+
+    action, _ = decide_deferrable(
+        now=now,
+        loads=[DISHWASHER],
+        runtimes=runtimes,
+        remaining_min={"switch.dishwasher": 15},
+        plans={"switch.dishwasher": plan},
+        margin_min=15,
+    )
+    assert action is not None
+    assert "planned slot" in action.reason
+    assert not action.forced
+
+    forced_now = NOW.replace(hour=13, minute=40)
+    action, _ = decide_deferrable(
+        now=forced_now,
+        loads=[DISHWASHER],
+        runtimes=runtimes,
+        remaining_min={"switch.dishwasher": 15},
+        plans={},
+        margin_min=15,
+        headroom_w=500,
+    )
+    assert action is None
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.energy_control_pro.const import (
+    STRATEGY_AVOID_GRID_IMPORT,
+    STRATEGY_MAXIMIZE_SELF_CONSUMPTION,
+)
+from custom_components.energy_control_pro.optimization.engine import LoadConfig, LoadRuntime
+from custom_components.energy_control_pro.optimization.shadow import ShadowEvaluator
+from custom_components.energy_control_pro.optimization.strategies import (
+    StrategyContext,
+    get_strategy,
+)
+
+NOW = datetime(2026, 2, 15, 12, 0, 0)
+LOADS = [LoadConfig("switch.heater", min_surplus_w=1000, min_on_time_min=5, cooldown_min=5, priority=1)]
+STRATEGIES = [get_strategy(STRATEGY_MAXIMIZE_SELF_CONSUMPTION), get_strategy(STRATEGY_AVOID_GRID_IMPORT)]
+
+
+def _context(now: datetime, surplus_w: int, is_on: bool = False) -> StrategyContext:
+    return StrategyContext(
+        now=now,
+        surplus_w=surplus_w,
+        grid_import_w=max(0, -surplus_w),
+        export_duration_min=12,
+        import_duration_min=0,
+        import_threshold_w=800,
+        duration_threshold_min=10,
+        loads=LOADS,
+        runtimes={"switch.heater": LoadRuntime(is_on=is_on, last_on=None, last_off=None)},
+    )
+
+
+def _grid(grid_w: int) -> dict[str, int]:
+    return {"grid_import_w": max(0, -grid_w), "grid_export_w": max(0, grid_w)}
+
+
+def test_every_strategy_decides_but_only_active_one_is_returned_for_execution() -> None:
+    evaluator = ShadowEvaluator()
+
+    decisions = evaluator.evaluate(
+        context=_context(NOW, 1500),
+        strategies=STRATEGIES,
+        active=STRATEGY_AVOID_GRID_IMPORT,
+        **_grid(1500),
+    )
+
+    assert set(decisions) == {STRATEGY_MAXIMIZE_SELF_CONSUMPTION, STRATEGY_AVOID_GRID_IMPORT}
+    assert decisions[STRATEGY_AVOID_GRID_IMPORT].action == "turn_on"
+    assert evaluator.metrics()[STRATEGY_MAXIMIZE_SELF_CONSUMPTION]["actions"] == 1
+
+
+def test_inactive_strategy_accumulates_counterfactual_energy() -> None:
+    evaluator = ShadowEvaluator()
+    strategy = get_strategy(STRATEGY_MAXIMIZE_SELF_CONSUMPTION)
+
+    # Reality stays with another strategy (heater OFF); the shadow one turns it ON.
+    evaluator.evaluate(
+        context=_context(NOW, 1500),
+        strategies=[strategy],
+        active="inactive",
+        **_grid(1500),
+    )
+    decisions = evaluator.evaluate(
+        context=_context(NOW + timedelta(hours=1), 1500),
+        strategies=[strategy],
+        active="inactive",
+        **_grid(1500),
+    )
+
+    metrics = evaluator.metrics()[STRATEGY_MAXIMIZE_SELF_CONSUMPTION]
+    # One hour with the virtual heater absorbing 1000 W of the 1500 W surplus.
+    assert metrics["export_kwh"] == pytest.approx(0.5)
+    assert metrics["import_kwh"] == 0
+    assert metrics["diverged_loads"] == ["switch.heater"]
+    # The virtual heater is already ON, so the strategy does not switch it again.
+    assert decisions[STRATEGY_MAXIMIZE_SELF_CONSUMPTION] is None
+    assert metrics["actions"] == 1
+
+
+def test_divergence_is_dropped_once_reality_matches() -> None:
+    evaluator = ShadowEvaluator()
+    strategy = get_strategy(STRATEGY_MAXIMIZE_SELF_CONSUMPTION)
+
+    evaluator.evaluate(
+        context=_context(NOW, 1500),
+        strategies=[strategy],
+        active="inactive",
+        **_grid(1500),
+    )
+    evaluator.evaluate(
+        context=_context(NOW + timedelta(minutes=1), 500, is_on=True),
+        strategies=[strategy],
+        active="inactive",
+        **_grid(500),
+    )
+
+    assert evaluator.metrics()[STRATEGY_MAXIMIZE_SELF_CONSUMPTION]["diverged_loads"] == []
+
+
+def test_counterfactual_energy_uses_grid_flow_not_battery_adjusted_surplus() -> None:
+    evaluator = ShadowEvaluator()
+    strategy = get_strategy(STRATEGY_MAXIMIZE_SELF_CONSUMPTION)
+
+    # 1500 W counts as surplus because the battery is charging, but only 500 W is exported.
+    for hours in (0, 1):
+        evaluator.evaluate(
+            context=_context(NOW + timedelta(hours=hours), 1500),
+            strategies=[strategy],
+            active="inactive",
+            **_grid(500),
+        )
+
+    metrics = evaluator.metrics()[STRATEGY_MAXIMIZE_SELF_CONSUMPTION]
+    # The virtual 1000 W heater would have turned the 500 W export into 500 W of import.
+    assert metrics["import_kwh"] == pytest.approx(0.5)
+    assert metrics["export_kwh"] == 0
+
+
+def test_time_of_cycles_that_were_not_evaluated_is_not_attributed() -> None:
+    evaluator = ShadowEvaluator()
+    strategy = get_strategy(STRATEGY_MAXIMIZE_SELF_CONSUMPTION)
+
+    evaluator.evaluate(context=_context(NOW, 1500), strategies=[strategy], active="inactive", **_grid(1500))
+    evaluator.end_cycle(NOW)
+    # A grid-limit cycle half an hour later skips the strategies.
+    evaluator.end_cycle(NOW + timedelta(minutes=30))
+    evaluator.evaluate(
+        context=_context(NOW + timedelta(hours=1), 1500),
+        strategies=[strategy],
+        active="inactive",
+        **_grid(1500),
+    )
+
+    assert evaluator.metrics()[STRATEGY_MAXIMIZE_SELF_CONSUMPTION]["export_kwh"] == pytest.approx(0.25)
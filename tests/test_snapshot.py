@@ -0,0 +1,60 @@
+from dataclasses import FrozenInstanceError, replace
+
+import pytest
+
+from custom_components.energy_control_pro.snapshot import CycleSnapshot, diff_snapshots
+
+BASE = CycleSnapshot(
+    solar_w=3000,
+    load_w=1800,
+    battery_w=0,
+    surplus_w=1200,
+    grid_import_w=10,
+    grid_export_w=1200,
+    energy_state="exporting",
+    import_duration_min=0,
+    export_duration_min=4,
+    optimization_enabled=True,
+    strategy="maximize_self_consumption",
+    last_action="No actions yet",
+)
+
+
+def test_snapshot_is_immutable_and_slotted() -> None:
+    with pytest.raises(FrozenInstanceError):
+        BASE.surplus_w = 0  # type: ignore[misc]
+    assert not hasattr(BASE, "__dict__")
+
+
+def test_dict_view_flattens_shadow_metrics() -> None:
+    data = replace(BASE, shadow={"shadow_balanced_actions": 3}).as_dict()
+
+    assert data["surplus_w"] == 1200
+    assert data["shadow_balanced_actions"] == 3
+    assert data["import_price"] is None
+
+
+def test_first_snapshot_changes_every_key() -> None:
+    published, changed = diff_snapshots(None, BASE, deadband_w=25)
+
+    assert published is BASE
+    assert changed == frozenset(BASE.as_dict())
+
+
+def test_power_values_are_held_within_deadband() -> None:
+    current = replace(BASE, surplus_w=1215, grid_import_w=0, last_action="Turned ON switch.boiler")
+
+    published, changed = diff_snapshots(BASE, current, deadband_w=25)
+
+    assert published.surplus_w == 1200
+    assert published.grid_import_w == 0
+    assert changed == {"grid_import_w", "last_action"}
+
+
+def test_changed_shadow_metrics_are_reported_per_key() -> None:
+    previous = replace(BASE, shadow={"shadow_balanced_actions": 1, "shadow_balanced_import_kwh": 0.5})
+    current = replace(BASE, shadow={"shadow_balanced_actions": 2, "shadow_balanced_import_kwh": 0.5})
+
+    _, changed = diff_snapshots(previous, current, deadband_w=25)
+
+    assert changed == {"shadow_balanced_actions"}
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.energy_control_pro.optimization.forecast import (
+    SolarForecast,
+    parse_forecast_attributes,
+)
+
+START = datetime(2026, 2, 15, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def test_power_at_interpolates_between_points() -> None:
+    forecast = SolarForecast(
+        [
+            (START.timestamp(), 1000),
+            ((START + timedelta(minutes=30)).timestamp(), 3000),
+        ]
+    )
+
+    assert forecast.power_at((START + timedelta(minutes=15)).timestamp()) == pytest.approx(2000)
+    assert forecast.power_at((START - timedelta(hours=1)).timestamp()) == 1000
+    assert forecast.power_at((START + timedelta(hours=1)).timestamp()) == 3000
+
+
+def test_average_w_over_window() -> None:
+    forecast = SolarForecast(
+        [
+            ((START + timedelta(minutes=30)).timestamp(), 0),
+            (START.timestamp(), 4000),
+            ((START + timedelta(minutes=60)).timestamp(), 0),
+        ]
+    )
+
+    assert forecast.average_w(START.timestamp(), 30) == pytest.approx(2000)
+    assert forecast.average_w(START.timestamp(), 60) == pytest.approx(1000)
+    assert forecast.average_w((START + timedelta(minutes=15)).timestamp(), 0) == pytest.approx(2000)
+
+
+def test_parse_solcast_detailed_forecast_in_kw() -> None:
+    forecast = parse_forecast_attributes(
+        {
+            "detailedForecast": [
+                {"period_start": START.isoformat(), "pv_estimate": 2.5},
+                {"period_start": (START + timedelta(minutes=30)).isoformat(), "pv_estimate": 1.5},
+            ]
+        }
+    )
+
+    assert forecast is not None
+    assert len(forecast) == 2
+    assert forecast.power_at(START.timestamp()) == pytest.approx(2500)
+
+
+def test_parse_watts_mapping() -> None:
+    forecast = parse_forecast_attributes(
+        {"watts": {START.isoformat(): 1800, (START + timedelta(hours=1)).isoformat(): 600}}
+    )
+
+    assert forecast is not None
+    assert forecast.power_at((START + timedelta(minutes=30)).timestamp()) == pytest.approx(1200)
+
+
+def test_parse_without_forecast_attributes_returns_none() -> None:
+    assert parse_forecast_attributes({"unit_of_measurement": "W"}) is None
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+from custom_components.energy_control_pro.const import (
+    STRATEGIES,
+    STRATEGY_AVOID_GRID_IMPORT,
+    STRATEGY_MAXIMIZE_SELF_CONSUMPTION,
+    STRATEGY_MINIMIZE_COST,
+)
+from custom_components.energy_control_pro.optimization.engine import (
+    EngineAction,
+    LoadConfig,
+    LoadRuntime,
+)
+from custom_components.energy_control_pro.optimization.strategies import (
+    STRATEGY_REGISTRY,
+    Strategy,
+    StrategyContext,
+    get_strategy,
+    register_strategy,
+)
+
+NOW = datetime(2026, 2, 15, 12, 0, 0)
+
+
+def _context(**overrides) -> StrategyContext:  # type: ignore[no-untyped-def]
+    kwargs = {
+        "now": NOW,
+        "surplus_w": 1500,
+        "grid_import_w": 1000,
+        "export_duration_min": 12,
+        "import_duration_min": 12,
+        "import_threshold_w": 800,
+        "duration_threshold_min": 10,
+        "loads": [
+            LoadConfig("switch.load_on", min_surplus_w=800, min_on_time_min=5, cooldown_min=5, priority=2),
+            LoadConfig("switch.load_off", min_surplus_w=900, min_on_time_min=5, cooldown_min=5, priority=1),
+        ],
+        "runtimes": {
+            "switch.load_on": LoadRuntime(is_on=True, last_on=None, last_off=None),
+            "switch.load_off": LoadRuntime(is_on=False, last_on=None, last_off=None),
+        },
+    }
+    kwargs.update(overrides)
+    return StrategyContext(**kwargs)
+
+
+def test_every_selectable_strategy_is_registered() -> None:
+    assert set(STRATEGIES) <= set(STRATEGY_REGISTRY)
+
+
+def test_strategy_order_decides_between_turn_on_and_turn_off() -> None:
+    context = _context()
+
+    assert get_strategy(STRATEGY_MAXIMIZE_SELF_CONSUMPTION).decide(context).action == "turn_on"
+    assert get_strategy(STRATEGY_AVOID_GRID_IMPORT).decide(context).action == "turn_off"
+
+
+def test_unknown_strategy_and_cost_without_prices_fall_back_to_self_consumption() -> None:
+    context = _context()
+    expected = get_strategy(STRATEGY_MAXIMIZE_SELF_CONSUMPTION).decide(context)
+
+    assert get_strategy("does_not_exist").decide(context) == expected
+    assert get_strategy(STRATEGY_MINIMIZE_COST).decide(context) == expected
+
+
+def test_cost_with_current_price_only_sheds_like_self_consumption() -> None:
+    # A price entity without a schedule yields cheapest == mean == current price.
+    context = _context(
+        surplus_w=-3000,
+        grid_import_w=3000,
+        export_duration_min=0,
+        import_duration_min=60,
+        import_price=0.30,
+        cheapest_import_price=0.30,
+        mean_import_price=0.30,
+    )
+
+    action = get_strategy(STRATEGY_MINIMIZE_COST).decide(context)
+    assert action == get_strategy(STRATEGY_MAXIMIZE_SELF_CONSUMPTION).decide(context)
+    assert action is not None
+    assert action.action == "turn_off"
+
+
+def test_registered_strategy_is_pluggable() -> None:
+    def _never(context: StrategyContext) -> EngineAction | None:
+        return None
+
+    register_strategy(Strategy("test_never", _never))
+    try:
+        assert get_strategy("test_never").decide(_context()) is None
+    finally:
+        STRATEGY_REGISTRY.pop("test_never")
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.energy_control_pro.optimization.tariff import (
+    PriceTimeline,
+    build_price_timeline,
+    parse_price_attributes,
+)
+
+START = datetime(2026, 2, 15, 0, 0, 0, tzinfo=timezone.utc)
+
+
+def _hour(hours: float) -> float:
+    return (START + timedelta(hours=hours)).timestamp()
+
+
+def test_timeline_precomputes_cheapest_and_mean_ahead() -> None:
+    timeline = PriceTimeline(START.timestamp(), [0.30, 0.10, 0.20, 0.40], lookahead_slots=2)
+
+    assert len(timeline) == 4
+    assert timeline.price_at(_hour(0.3)) == pytest.approx(0.10)
+    assert timeline.cheapest_ahead(START.timestamp()) == pytest.approx(0.10)
+    assert timeline.cheapest_ahead(_hour(0.5)) == pytest.approx(0.20)
+    assert timeline.mean_ahead(_hour(0.5)) == pytest.approx(0.30)
+    # The last slot only averages what is left.
+    assert timeline.mean_ahead(_hour(0.75)) == pytest.approx(0.40)
+    assert timeline.price_at(_hour(-1)) is None
+    assert timeline.price_at(_hour(1)) is None
+
+
+def test_build_resamples_hourly_intervals_to_slots() -> None:
+    timeline = build_price_timeline(
+        [(_hour(1), None, 0.25), (_hour(0), _hour(1), 0.35)],
+        lookahead_slots=8,
+    )
+
+    assert timeline is not None
+    assert len(timeline) == 8
+    assert timeline.price_at(_hour(0.9)) == pytest.approx(0.35)
+    assert timeline.price_at(_hour(1.5)) == pytest.approx(0.25)
+    assert timeline.cheapest_ahead(_hour(0)) == pytest.approx(0.25)
+    assert build_price_timeline([], lookahead_slots=8) is None
+
+
+def test_parse_merges_today_and_tomorrow_schedules() -> None:
+    timeline = parse_price_attributes(
+        {
+            "raw_today": [
+                {"start": START.isoformat(), "end": (START + timedelta(hours=1)).isoformat(), "value": 0.3},
+            ],
+            "raw_tomorrow": [
+                {
+                    "start": (START + timedelta(hours=1)).isoformat(),
+                    "end": (START + timedelta(hours=2)).isoformat(),
+                    "value": 0.1,
+                },
+                {"start": "not a time", "value": 0.5},
+            ],
+        },
+        lookahead_slots=48,
+    )
+
+    assert timeline is not None
+    assert timeline.price_at(_hour(0.5)) == pytest.approx(0.3)
+    assert timeline.price_at(_hour(1.5)) == pytest.approx(0.1)
+    assert timeline.cheapest_ahead(_hour(0)) == pytest.approx(0.1)
+
+
+def test_parse_tibber_prices_and_missing_schedule() -> None:
+    timeline = parse_price_attributes(
+        {"prices": [{"startsAt": START.isoformat(), "total": "0.22"}]},
+        lookahead_slots=4,
+    )
+
+    assert timeline is not None
+    assert timeline.price_at(_hour(0.5)) == pytest.approx(0.22)
+    assert parse_price_attributes({"unit_of_measurement": "EUR/kWh"}, lookahead_slots=4) is None
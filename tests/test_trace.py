@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from custom_components.energy_control_pro.optimization.engine import EngineAction, LoadConfig, LoadRuntime
+from custom_components.energy_control_pro.optimization.strategies import StrategyContext
+from custom_components.energy_control_pro.optimization.trace import DecisionTrace, explain_candidates
+
+NOW = datetime(2026, 2, 15, 14, 2, 0)
+LOADS = [
+    LoadConfig("switch.heater", min_surplus_w=1000, min_on_time_min=10, cooldown_min=10, priority=1),
+    LoadConfig("switch.boiler", min_surplus_w=2000, min_on_time_min=10, cooldown_min=10, priority=2),
+    LoadConfig("switch.pump", min_surplus_w=500, min_on_time_min=10, cooldown_min=10, priority=3),
+    LoadConfig("switch.fan", min_surplus_w=200, min_on_time_min=10, cooldown_min=10, priority=4),
+]
+RUNTIMES = {
+    "switch.heater": LoadRuntime(is_on=True, last_on=NOW - timedelta(minutes=30), last_off=None),
+    "switch.boiler": LoadRuntime(is_on=False, last_on=None, last_off=None),
+    "switch.pump": LoadRuntime(is_on=False, last_on=None, last_off=NOW - timedelta(minutes=2)),
+    "switch.fan": LoadRuntime(is_on=True, last_on=NOW - timedelta(minutes=1), last_off=None),
+}
+
+
+def _context(surplus_w: int) -> StrategyContext:
+    return StrategyContext(
+        now=NOW,
+        surplus_w=surplus_w,
+        grid_import_w=max(0, -surplus_w),
+        export_duration_min=0,
+        import_duration_min=12,
+        import_threshold_w=800,
+        duration_threshold_min=10,
+        loads=LOADS,
+        runtimes=RUNTIMES,
+    )
+
+
+def test_candidates_report_why_each_load_could_not_switch() -> None:
+    assert explain_candidates(now=NOW, surplus_w=1500, loads=LOADS, runtimes=RUNTIMES) == {
+        "switch.heater": "can_turn_off",
+        "switch.boiler": "surplus",
+        "switch.pump": "cooldown",
+        "switch.fan": "min_on_time",
+    }
+
+
+def test_ring_buffer_keeps_latest_entries_oldest_first() -> None:
+    trace = DecisionTrace(3)
+    for minute in range(5):
+        trace.record(NOW + timedelta(minutes=minute), "strategy", None)
+
+    entries = trace.as_list()
+    assert len(trace) == 3
+    assert [entry["at"] for entry in entries] == [
+        (NOW + timedelta(minutes=minute)).isoformat() for minute in (2, 3, 4)
+    ]
+
+
+def test_entry_explains_inputs_candidates_and_action() -> None:
+    trace = DecisionTrace(10)
+    inputs = SimpleNamespace(surplus_w=-900, grid_import_w=900, export_duration_min=0, import_duration_min=12)
+    action = EngineAction("turn_off", "switch.heater", "import 900W for 12 min")
+
+    trace.record(NOW, "strategy", action, inputs=inputs, strategy="maximize_self_consumption", context=_context(-900))
+
+    (entry,) = trace.as_list()
+    assert entry["at"] == "2026-02-15T14:02:00"
+    assert entry["strategy"] == "maximize_self_consumption"
+    assert entry["inputs"]["grid_import_w"] == 900
+    assert entry["inputs"]["forecast_surplus_w"] is None
+    assert entry["candidates"]["switch.heater"] == "can_turn_off"
+    assert entry["action"] == {
+        "action": "turn_off",
+        "entity_id": "switch.heater",
+        "reason": "import 900W for 12 min",
+    }